@@ -1 +1,4 @@
 from .segment_anyting import SegmentAnything2
+from .feature_cache import FeatureCache
+from .mask_output import MaskOutput
+from .mask_delta import MaskDelta, MaskDeltaTracker
@@ -0,0 +1,274 @@
+import os
+import json
+import queue
+import hashlib
+import threading
+
+from typing import List, Optional, Tuple
+
+import torch
+import numpy as np
+
+FEATURE_FILE_EXTENSION = ".npy"
+# part of the model key, caches written in another layout are not read
+FEATURE_CACHE_FORMAT = 2
+
+
+class FeatureCache:
+    def __init__(
+        self,
+        cache_dir: str,
+        model_path: str,
+        model_config: str,
+        max_bytes: int,
+        write_queue_size: int = 8,
+        blocking_writes: bool = False,
+    ) -> None:
+        """On-disk cache of SAM2 image encoder (backbone) outputs shared by all sessions.
+        Features are stored per (model, video, frame) as flat `.npy` files in the dtype
+        of the model outputs, so they are restored exactly (bfloat16 is stored as its raw
+        16 bits). Files are memory-mapped on read, tensors on the CPU stay backed by the
+        file. Least recently used frames are evicted when the cache grows beyond
+        `max_bytes`.
+
+        Args:
+            cache_dir (str): root directory of the cache
+            model_path (str): checkpoint path of the model
+            model_config (str): config path of the model
+            max_bytes (int): size bound of the whole cache directory
+            write_queue_size (int, optional): max number of pending writes. Defaults to 8.
+            blocking_writes (bool, optional): wait for the writer if the write queue is full,
+                otherwise new writes are dropped. Defaults to False.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.blocking_writes = blocking_writes
+        self.model_key = self.get_model_key(model_path, model_config)
+        self.model_dir = os.path.join(cache_dir, self.model_key)
+        os.makedirs(self.model_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._meta: Optional[dict] = self._read_meta()
+        self._pos_enc: Optional[List[torch.Tensor]] = self._read_pos_enc()
+        self._size = self._scan_size()
+
+        self._write_queue: "queue.Queue[Tuple[str, int, dict]]" = queue.Queue(
+            maxsize=write_queue_size
+        )
+        self._writer = threading.Thread(
+            target=self._writer_fn, name="FeatureCacheWriter", daemon=True
+        )
+        self._writer.start()
+
+    @staticmethod
+    def get_model_key(model_path: str, model_config: str) -> str:
+        """Hash of the checkpoint file (path, size, mtime) and the model config"""
+        stat = os.stat(model_path) if os.path.exists(model_path) else None
+        identity = f"{os.path.abspath(model_path)}:{model_config}:{FEATURE_CACHE_FORMAT}"
+        if stat is not None:
+            identity += f":{stat.st_size}:{int(stat.st_mtime)}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def get_video_key(video_dir: str) -> str:
+        return hashlib.sha1(os.path.abspath(video_dir).encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.model_dir, "meta.json")
+
+    @property
+    def pos_enc_path(self) -> str:
+        return os.path.join(self.model_dir, "pos_enc" + FEATURE_FILE_EXTENSION)
+
+    def get_frame_path(self, video_key: str, frame_idx: int) -> str:
+        return os.path.join(
+            self.model_dir, video_key, f"{str(frame_idx).zfill(8)}{FEATURE_FILE_EXTENSION}"
+        )
+
+    def contains(self, video_key: str, frame_idx: int) -> bool:
+        return self._meta is not None and os.path.exists(
+            self.get_frame_path(video_key, frame_idx)
+        )
+
+    def load(
+        self, video_key: str, frame_idx: int, device: torch.device
+    ) -> Optional[dict]:
+        """Loads backbone outputs of a frame
+
+        Args:
+            video_key (str): video key
+            frame_idx (int): frame index
+            device (torch.device): device of the returned tensors
+
+        Returns:
+            Optional[dict]: backbone outputs as returned by `forward_image`, None if not cached
+        """
+        if self._meta is None or self._pos_enc is None:
+            return None
+        frame_path = self.get_frame_path(video_key, frame_idx)
+        try:
+            # copy-on-write mapping, writable for torch without copying the file
+            flat = np.load(frame_path, mmap_mode="c")
+            # mark as recently used for the eviction
+            os.utime(frame_path)
+        except (OSError, ValueError):
+            return None
+
+        dtype = getattr(torch, self._meta["dtype"])
+        backbone_fpn = self._unflatten(flat, self._meta["fpn_shapes"], device, dtype)
+        return {
+            "vision_features": backbone_fpn[-1],
+            "vision_pos_enc": [p.to(device) for p in self._pos_enc],
+            "backbone_fpn": backbone_fpn,
+        }
+
+    def store(self, video_key: str, frame_idx: int, backbone_out: dict) -> None:
+        """Queues backbone outputs of a frame to be written in the background.
+        Dropped if the writer is behind, unless writes are blocking.
+        """
+        try:
+            self._write_queue.put(
+                (video_key, frame_idx, backbone_out), block=self.blocking_writes
+            )
+        except queue.Full:
+            pass
+
+    def flush(self) -> None:
+        """Blocks until all pending writes are done"""
+        self._write_queue.join()
+
+    def _writer_fn(self) -> None:
+        while True:
+            video_key, frame_idx, backbone_out = self._write_queue.get()
+            try:
+                self._write(video_key, frame_idx, backbone_out)
+            except Exception:
+                # cache is best effort, frame is encoded again on next access
+                pass
+            finally:
+                self._write_queue.task_done()
+
+    def _write(self, video_key: str, frame_idx: int, backbone_out: dict) -> None:
+        dtype = backbone_out["backbone_fpn"][0].dtype
+        backbone_fpn = [self._to_numpy(t, dtype) for t in backbone_out["backbone_fpn"]]
+        if self._meta is None:
+            with self._lock:
+                if self._meta is None:
+                    pos_enc_dtype = backbone_out["vision_pos_enc"][0].dtype
+                    pos_enc = [
+                        self._to_numpy(t, pos_enc_dtype) for t in backbone_out["vision_pos_enc"]
+                    ]
+                    self._atomic_save(
+                        self.pos_enc_path, np.concatenate([p.ravel() for p in pos_enc])
+                    )
+                    meta = {
+                        "dtype": str(dtype).replace("torch.", ""),
+                        "fpn_shapes": [list(t.shape) for t in backbone_fpn],
+                        "pos_enc_dtype": str(pos_enc_dtype).replace("torch.", ""),
+                        "pos_enc_shapes": [list(p.shape) for p in pos_enc],
+                    }
+                    tmp_path = self.meta_path + ".tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump(meta, f)
+                    os.replace(tmp_path, self.meta_path)
+                    self._meta = meta
+                    self._pos_enc = self._read_pos_enc()
+
+        frame_path = self.get_frame_path(video_key, frame_idx)
+        os.makedirs(os.path.dirname(frame_path), exist_ok=True)
+        flat = np.concatenate([t.ravel() for t in backbone_fpn])
+        self._atomic_save(frame_path, flat)
+
+        with self._lock:
+            self._size += flat.nbytes
+            if self._size > self.max_bytes:
+                self._evict()
+
+    @staticmethod
+    def _atomic_save(path: str, array: np.ndarray) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _to_numpy(tensor: torch.Tensor, dtype: torch.dtype) -> np.ndarray:
+        tensor = tensor.detach().to(dtype=dtype).cpu()
+        if dtype == torch.bfloat16:
+            # numpy has no bfloat16, the bits are stored as int16
+            return tensor.view(torch.int16).numpy()
+        return tensor.numpy()
+
+    @staticmethod
+    def _unflatten(
+        flat: np.ndarray,
+        shapes: List[List[int]],
+        device: torch.device,
+        dtype: torch.dtype,
+    ) -> List[torch.Tensor]:
+        tensors = []
+        offset = 0
+        for shape in shapes:
+            size = int(np.prod(shape))
+            # views of the mapped file, copied only when moved to another device
+            tensor = torch.from_numpy(flat[offset : offset + size].reshape(shape))
+            if dtype == torch.bfloat16:
+                tensor = tensor.view(torch.bfloat16)
+            tensors.append(tensor.to(device=device))
+            offset += size
+        return tensors
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_pos_enc(self) -> Optional[List[torch.Tensor]]:
+        if self._meta is None:
+            return None
+        try:
+            flat = np.load(self.pos_enc_path)
+        except (OSError, ValueError):
+            return None
+        return self._unflatten(
+            flat,
+            self._meta["pos_enc_shapes"],
+            torch.device("cpu"),
+            getattr(torch, self._meta["pos_enc_dtype"]),
+        )
+
+    def _list_frame_files(self) -> List[Tuple[float, int, str]]:
+        files = []
+        for root, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                if not file_name.endswith(FEATURE_FILE_EXTENSION):
+                    continue
+                path = os.path.join(root, file_name)
+                if path.endswith(os.sep + "pos_enc" + FEATURE_FILE_EXTENSION):
+                    continue
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._list_frame_files())
+
+    def _evict(self) -> None:
+        """Removes least recently used frames until the cache is 10% below its bound"""
+        files = sorted(self._list_frame_files())
+        self._size = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                continue
@@ -0,0 +1,177 @@
+import os
+import queue
+import threading
+
+from collections import OrderedDict
+from typing import List, Optional, Union
+
+import torch
+import numpy as np
+from PIL import Image
+
+IMAGE_EXTENSIONS = [".jpg", ".jpeg", ".JPG", ".JPEG"]
+
+# SAM2 image normalization constants (see sam2.utils.misc.load_video_frames)
+IMG_MEAN = (0.485, 0.456, 0.406)
+IMG_STD = (0.229, 0.224, 0.225)
+
+
+class LazyVideoFrameLoader:
+    def __init__(
+        self,
+        video_dir: str,
+        image_size: int,
+        window_size: int = 64,
+        read_ahead: int = 8,
+        offload_video_to_cpu: bool = True,
+        device: Union[torch.device, str] = "cuda",
+    ) -> None:
+        """Lazy frame source to be used in place of the SAM2 preloaded video tensor.
+        Frames are decoded only when they are requested by the predictor and kept in a
+        bounded LRU window. After each access, the next `read_ahead` frames in the
+        access direction are decoded in the background.
+
+        Args:
+            video_dir (str): frames directory (frames named as <frame_number>.jpg)
+            image_size (int): model input size
+            window_size (int, optional): max number of decoded frames kept in memory. Defaults to 64.
+            read_ahead (int, optional): number of frames decoded ahead of the cursor. Defaults to 8.
+            offload_video_to_cpu (bool, optional): keep decoded frames on cpu. Defaults to True.
+            device (Union[torch.device, str], optional): device used if frames are not offloaded. Defaults to "cuda".
+        """
+        self.video_dir = video_dir
+        self.image_size = image_size
+        self.window_size = max(int(window_size), 1)
+        # read-ahead frames must fit into the window with the current frame
+        self.read_ahead = max(min(int(read_ahead), self.window_size - 1), 0)
+        self.offload_video_to_cpu = offload_video_to_cpu
+        self.device = torch.device(device)
+
+        self.frame_paths: List[str] = self.list_frames(video_dir)
+        if len(self.frame_paths) == 0:
+            raise RuntimeError(f"no images found in {video_dir}")
+
+        self.img_mean = torch.tensor(IMG_MEAN, dtype=torch.float32)[:, None, None]
+        self.img_std = torch.tensor(IMG_STD, dtype=torch.float32)[:, None, None]
+
+        self._frames: "OrderedDict[int, torch.Tensor]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_idx: Optional[int] = None
+        self._direction: int = 1
+
+        self._read_ahead_queue: "queue.Queue[Optional[int]]" = queue.Queue()
+        self._read_ahead_thread: Optional[threading.Thread] = None
+        if self.read_ahead > 0:
+            self._read_ahead_thread = threading.Thread(
+                target=self._read_ahead_fn, name="FrameReadAhead", daemon=True
+            )
+            self._read_ahead_thread.start()
+
+        # video resolution is needed by the predictor before any frame is requested
+        with Image.open(self.frame_paths[0]) as img:
+            self.video_width, self.video_height = img.size
+
+    @staticmethod
+    def list_frames(video_dir: str) -> List[str]:
+        frame_names = [
+            p for p in os.listdir(video_dir) if os.path.splitext(p)[-1] in IMAGE_EXTENSIONS
+        ]
+        frame_names.sort(key=lambda p: int(os.path.splitext(p)[0]))
+        return [os.path.join(video_dir, p) for p in frame_names]
+
+    def __len__(self) -> int:
+        return len(self.frame_paths)
+
+    def __getitem__(self, index: int) -> torch.Tensor:
+        if index < 0 or index >= len(self):
+            raise IndexError(f"Frame index out of range: {index}")
+
+        with self._lock:
+            if self._last_idx is not None and index != self._last_idx:
+                self._direction = 1 if index > self._last_idx else -1
+            self._last_idx = index
+            frame = self._frames.get(index)
+            if frame is not None:
+                self._frames.move_to_end(index)
+
+        if frame is None:
+            frame = self._load_frame(index)
+            self._store_frame(index, frame)
+
+        self._schedule_read_ahead(index)
+        return frame
+
+    @property
+    def cached_frame_count(self) -> int:
+        return len(self._frames)
+
+    def close(self) -> None:
+        """Stops read-ahead thread and releases decoded frames"""
+        if self._read_ahead_thread is not None:
+            self._read_ahead_queue.put(None)
+            self._read_ahead_thread.join(timeout=1.0)
+            self._read_ahead_thread = None
+        with self._lock:
+            self._frames.clear()
+
+    def _load_frame(self, index: int) -> torch.Tensor:
+        """Decodes, resizes and normalizes a single frame the same way SAM2 does
+
+        Args:
+            index (int): frame index
+
+        Returns:
+            torch.Tensor: normalized frame [3, image_size, image_size]
+        """
+        with Image.open(self.frame_paths[index]) as img:
+            img_np = np.array(
+                img.convert("RGB").resize((self.image_size, self.image_size))
+            )
+        frame = torch.from_numpy(img_np).permute(2, 0, 1).float() / 255.0
+        frame -= self.img_mean
+        frame /= self.img_std
+        if not self.offload_video_to_cpu:
+            frame = frame.to(self.device, non_blocking=True)
+        return frame
+
+    def _store_frame(self, index: int, frame: torch.Tensor) -> None:
+        with self._lock:
+            self._frames[index] = frame
+            self._frames.move_to_end(index)
+            while len(self._frames) > self.window_size:
+                self._frames.popitem(last=False)
+
+    def _schedule_read_ahead(self, index: int) -> None:
+        if self._read_ahead_thread is None:
+            return
+        with self._lock:
+            direction = self._direction
+            targets = [
+                index + direction * step
+                for step in range(1, self.read_ahead + 1)
+                if 0 <= index + direction * step < len(self)
+                and (index + direction * step) not in self._frames
+            ]
+        for target in targets:
+            self._read_ahead_queue.put(target)
+
+    def _read_ahead_fn(self) -> None:
+        while True:
+            index = self._read_ahead_queue.get()
+            if index is None:
+                return
+            with self._lock:
+                # skip frames already decoded or left behind by the cursor
+                if index in self._frames or not self._is_ahead(index):
+                    continue
+            try:
+                self._store_frame(index, self._load_frame(index))
+            except Exception:
+                # frame will be loaded again on access and raise there
+                continue
+
+    def _is_ahead(self, index: int) -> bool:
+        if self._last_idx is None:
+            return True
+        distance = (index - self._last_idx) * self._direction
+        return 0 < distance <= self.read_ahead
@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional, Union
+
+import torch
+import numpy as np
+
+from .mask_output import MaskOutput
+
+
+class MaskDelta:
+    def __init__(
+        self,
+        frame_idx: int,
+        changed: List[int],
+        appeared: List[str],
+        disappeared: List[str],
+        keyframe: bool,
+    ) -> None:
+        """Objects of a propagated frame to be sent in delta mode
+
+        Args:
+            frame_idx (int): frame index
+            changed (List[int]): indices of the objects whose geometry is sent
+            appeared (List[str]): object ids with a mask again (also in `changed`)
+            disappeared (List[str]): object ids whose mask became empty
+            keyframe (bool): all present objects are sent, consumers can resync
+        """
+        self.frame_idx = frame_idx
+        self.changed = changed
+        self.appeared = appeared
+        self.disappeared = disappeared
+        self.keyframe = keyframe
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "delta": True,
+            "keyframe": self.keyframe,
+            "appeared": self.appeared,
+            "disappeared": self.disappeared,
+        }
+
+
+class MaskDeltaTracker:
+    def __init__(
+        self,
+        iou_threshold: float = 0.95,
+        pixel_threshold: Optional[float] = 2.0,
+        keyframe_interval: int = 30,
+    ) -> None:
+        """Decides which objects of consecutive propagated frames changed enough to be sent.
+        Each object is compared with the mask last sent for it, so slow drifts add up and
+        are sent once they pass a threshold. Frames must be given in delivery order.
+
+        Args:
+            iou_threshold (float, optional): an object is sent when the IoU with its last
+                sent mask is below it. Defaults to 0.95.
+            pixel_threshold (Optional[float], optional): an object is sent when a bbox
+                edge moved more pixels than this, disabled if None. Defaults to 2.0.
+            keyframe_interval (int, optional): every n-th frame sends all objects, frames
+                that do not follow the previous one are keyframes too. Defaults to 30.
+        """
+        self.iou_threshold = iou_threshold
+        self.pixel_threshold = pixel_threshold
+        self.keyframe_interval = max(keyframe_interval, 1)
+
+        # last sent geometry of the objects with a non-empty mask
+        self._masks: Dict[str, torch.Tensor] = dict()
+        self._xyxy: Dict[str, np.ndarray] = dict()
+        self._last_frame_idx: Optional[int] = None
+        self._frames_since_keyframe = 0
+
+    def update(
+        self, frame_idx: int, object_ids: List[Union[int, str]], masks: MaskOutput
+    ) -> MaskDelta:
+        """Compares the frame with the last sent geometry and records what is sent
+
+        Args:
+            frame_idx (int): frame index
+            object_ids (List[Union[int, str]]): object ids of the masks
+            masks (MaskOutput): masks of the frame
+
+        Returns:
+            MaskDelta: objects to send and appeared/disappeared events
+        """
+        ids = [str(obj_id) for obj_id in object_ids]
+        empty = masks.empty()
+        xyxy = masks.xyxy()
+        present = [k for k in range(len(ids)) if not empty[k]]
+        present_ids = {ids[k] for k in present}
+
+        keyframe = (
+            self._last_frame_idx is None
+            or abs(frame_idx - self._last_frame_idx) != 1
+            or self._frames_since_keyframe + 1 >= self.keyframe_interval
+        )
+        appeared = [ids[k] for k in present if ids[k] not in self._masks]
+        disappeared = [obj_id for obj_id in self._masks if obj_id not in present_ids]
+
+        if keyframe:
+            changed = present
+        else:
+            changed = self._get_changed(ids, present, masks, xyxy)
+
+        for obj_id in disappeared:
+            self._masks.pop(obj_id)
+            self._xyxy.pop(obj_id)
+        for k in changed:
+            # cloned, a view would keep the whole frame on the device
+            self._masks[ids[k]] = masks.masks[k].clone()
+            self._xyxy[ids[k]] = xyxy[k]
+
+        self._last_frame_idx = frame_idx
+        self._frames_since_keyframe = 0 if keyframe else self._frames_since_keyframe + 1
+        return MaskDelta(
+            frame_idx=frame_idx,
+            changed=changed,
+            appeared=appeared,
+            disappeared=disappeared,
+            keyframe=keyframe,
+        )
+
+    def _get_changed(
+        self, ids: List[str], present: List[int], masks: MaskOutput, xyxy: np.ndarray
+    ) -> List[int]:
+        changed = set(k for k in present if ids[k] not in self._masks)
+        candidates = [k for k in present if k not in changed]
+        if self.pixel_threshold is not None:
+            for k in candidates:
+                if np.abs(xyxy[k] - self._xyxy[ids[k]]).max() > self.pixel_threshold:
+                    changed.add(k)
+            candidates = [k for k in candidates if k not in changed]
+        if candidates:
+            # IoU of all remaining objects in one reduction on the device
+            current = masks.masks[candidates]
+            previous = torch.stack([self._masks[ids[k]] for k in candidates])
+            intersection = (current & previous).flatten(1).sum(dim=1)
+            union = (current | previous).flatten(1).sum(dim=1)
+            iou = (intersection.float() / union.clamp(min=1).float()).cpu().numpy()
+            changed.update(k for k, value in zip(candidates, iou) if value < self.iou_threshold)
+        return sorted(changed)
@@ -0,0 +1,125 @@
+from typing import List, Optional, Tuple, Union, Iterator
+
+import torch
+import numpy as np
+import torch.nn.functional as F
+
+from utils import xyxy_from_occupancy
+
+
+class MaskOutput:
+    def __init__(self, masks: torch.Tensor) -> None:
+        """Boolean segmentation masks kept on the device they were predicted on.
+        Derived outputs (bboxes, areas, empty flags, downsampled masks) are computed on
+        the device and only their results are copied to the host. Full resolution masks
+        are copied on the first `numpy()` call.
+
+        Args:
+            masks (torch.Tensor): masks [NxHxW], non-boolean masks are thresholded at 0
+        """
+        if masks.dtype != torch.bool:
+            masks = masks > 0
+        self.masks = masks
+        self._numpy: Optional[np.ndarray] = None
+        # per-row and per-column occupancy [NxH], [NxW] on the host
+        self._occupancy: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_logits(cls, out_mask_logits: torch.Tensor) -> "MaskOutput":
+        """Thresholds SAM2 mask logits [Nx1xHxW]"""
+        return cls(out_mask_logits[:, 0] > 0.0)
+
+    @classmethod
+    def zeros(
+        cls, n: int, height: int, width: int, device: Union[torch.device, str] = "cpu"
+    ) -> "MaskOutput":
+        return cls(torch.zeros((n, height, width), dtype=torch.bool, device=device))
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return tuple(self.masks.shape)
+
+    @property
+    def device(self) -> torch.device:
+        return self.masks.device
+
+    def __len__(self) -> int:
+        return self.masks.shape[0]
+
+    def __getitem__(self, index: Union[int, slice, List[int]]) -> "MaskOutput":
+        """Selects masks by index, the result keeps the [NxHxW] shape"""
+        if isinstance(index, int):
+            index = [index]
+        selected = MaskOutput(self.masks[index])
+        if self._numpy is not None:
+            selected._numpy = self._numpy[index]
+        if self._occupancy is not None:
+            rows, cols = self._occupancy
+            selected._occupancy = (rows[index], cols[index])
+        return selected
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.numpy())
+
+    def numpy(self) -> np.ndarray:
+        """Full resolution boolean masks [NxHxW] on the host"""
+        if self._numpy is None:
+            self._numpy = self.masks.cpu().numpy()
+        return self._numpy
+
+    def xyxy(self, normalized: bool = False) -> np.ndarray:
+        """Bounding boxes of the masks, same output as `utils.mask_to_xyxy`
+
+        Args:
+            normalized (bool, optional): normalize coordinates by mask size. Defaults to False.
+
+        Returns:
+            np.ndarray: [Nx4] `(x_min, y_min, x_max, y_max)`, zeros for empty masks
+        """
+        if self._occupancy is None:
+            # reduced on the device, only the occupancy vectors are copied
+            self._occupancy = (
+                self.masks.any(dim=2).cpu().numpy(),
+                self.masks.any(dim=1).cpu().numpy(),
+            )
+        h, w = self.masks.shape[-2:]
+        return xyxy_from_occupancy(*self._occupancy, h, w, normalized)
+
+    def areas(self) -> np.ndarray:
+        """Foreground pixel count of each mask [N]"""
+        return self.masks.flatten(1).sum(dim=1).cpu().numpy()
+
+    def empty(self) -> np.ndarray:
+        """True for masks without any foreground pixel [N]"""
+        return (~self.masks.flatten(1).any(dim=1)).cpu().numpy()
+
+    def downsample(self, scale: float) -> np.ndarray:
+        """Nearest-neighbour resized masks copied to the host
+
+        Args:
+            scale (float): scale factor in (0, 1], sizes are rounded like `cv.resize`
+
+        Returns:
+            np.ndarray: boolean masks [Nxhxw] where h, w are the scaled mask sizes
+        """
+        if scale >= 1.0 or len(self) == 0:
+            return self.numpy()
+        h, w = self.masks.shape[-2:]
+        return self.resize(max(int(round(h * scale)), 1), max(int(round(w * scale)), 1))
+
+    def resize(self, height: int, width: int) -> np.ndarray:
+        """Nearest-neighbour resized masks copied to the host
+
+        Args:
+            height (int): target height
+            width (int): target width
+
+        Returns:
+            np.ndarray: boolean masks [N x height x width]
+        """
+        if (height, width) == tuple(self.masks.shape[-2:]):
+            return self.numpy()
+        resized = F.interpolate(
+            self.masks[:, None].to(torch.uint8), size=(height, width), mode="nearest"
+        )
+        return resized[:, 0].bool().cpu().numpy()
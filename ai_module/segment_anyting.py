@@ -3,8 +3,9 @@ import io
 import time
 import glob
 import base64
+import threading
 
-from typing import Union, Optional, List, Tuple, Generator
+from typing import Union, Optional, List, Tuple, Dict, Generator, Literal
 
 import torch
 import cv2 as cv
@@ -13,8 +14,93 @@ from PIL import Image
 from tqdm import tqdm
 
 from schemas import Point, PointPrompt
+from utils import as_uint8_mask
+from sam2 import sam2_video_predictor
 from sam2.build_sam import build_sam2_video_predictor
 from sam2.sam2_video_predictor import SAM2VideoPredictor
+from sam2.utils.misc import concat_points
+
+from .frame_loader import LazyVideoFrameLoader
+from .feature_cache import FeatureCache
+from .mask_output import MaskOutput
+
+# init_state of the predictor looks up `load_video_frames` from its module namespace,
+# swapping it is not thread safe so the swap is guarded
+_frame_loader_patch_lock = threading.Lock()
+
+# propagation direction -> reverse flags of the propagation passes
+PROPAGATION_DIRECTIONS = {
+    "forward": (False,),
+    "reverse": (True,),
+    "both": (False, True),
+}
+
+# inference state entries that hold the prompts and their outputs,
+#   the remaining entries (frames, cached features, constants) are not touched by prompts
+PROMPT_STATE_KEYS = (
+    "point_inputs_per_obj",
+    "mask_inputs_per_obj",
+    "output_dict",
+    "output_dict_per_obj",
+    "temp_output_dict_per_obj",
+    "consolidated_frame_inds",
+    "obj_id_to_idx",
+    "obj_idx_to_id",
+    "obj_ids",
+    "tracking_has_started",
+    "frames_already_tracked",
+)
+
+
+# inference state entry holding (FeatureCache, video_key) of the session
+FEATURE_CACHE_STATE_KEY = "feature_cache"
+# feature cache of the state being created by init_state (before the state is returned)
+_init_feature_cache = threading.local()
+
+
+def _install_feature_cache_hook(predictor: SAM2VideoPredictor) -> None:
+    """Wraps `_get_image_feature` of the predictor to read backbone outputs from the
+    feature cache of the inference state before running the image encoder and to store
+    newly encoded frames. States without a feature cache are not affected.
+    """
+    if getattr(predictor, "_feature_cache_hook_installed", False):
+        return
+    get_image_feature = predictor._get_image_feature
+
+    def _get_image_feature(inference_state, frame_idx, batch_size):
+        cache_ref = inference_state.get(FEATURE_CACHE_STATE_KEY) or getattr(
+            _init_feature_cache, "value", None
+        )
+        if cache_ref is None or frame_idx in inference_state["cached_features"]:
+            return get_image_feature(inference_state, frame_idx, batch_size)
+
+        cache, video_key = cache_ref
+        backbone_out = cache.load(video_key, frame_idx, device=inference_state["device"])
+        if backbone_out is not None:
+            # the image itself is not used by the callers, only the features
+            image = torch.zeros((1, 3, 1, 1), device=inference_state["device"])
+            inference_state["cached_features"] = {frame_idx: (image, backbone_out)}
+            return get_image_feature(inference_state, frame_idx, batch_size)
+
+        features = get_image_feature(inference_state, frame_idx, batch_size)
+        _, backbone_out = inference_state["cached_features"][frame_idx]
+        cache.store(video_key, frame_idx, backbone_out)
+        return features
+
+    predictor._get_image_feature = _get_image_feature
+    predictor._feature_cache_hook_installed = True
+
+
+def _copy_state_value(value):
+    if isinstance(value, torch.Tensor):
+        return value.clone()
+    if isinstance(value, dict):
+        return {k: _copy_state_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_state_value(v) for v in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
 
 
 class SegmentAnything2:
@@ -23,11 +109,20 @@ class SegmentAnything2:
         model_path: str,
         model_config: str,
         device: Union[torch.device, str] = "cuda",
+        frame_window_size: int = 64,
+        frame_read_ahead: int = 8,
+        predictor: Optional[SAM2VideoPredictor] = None,
+        feature_cache: Optional[FeatureCache] = None,
     ) -> None:
         """
         Params probably passed via a database table
         :param model_path: path to the model .pth file
         :param model_config: path to the model config .yaml file
+        :param frame_window_size: max number of decoded frames kept in memory per video
+        :param frame_read_ahead: number of frames decoded ahead of the prompt/propagation cursor
+        :param predictor: already built predictor of the same model to share the weights with,
+            the inference state stays private to this instance
+        :param feature_cache: on-disk image feature cache, frames found in the cache skip the image encoder
         """
         self.model_path = model_path
         self.model_config = model_config
@@ -42,21 +137,73 @@ class SegmentAnything2:
         # ----- default settings ----- #
         self.offload_video_to_cpu: bool = True
         self.async_loading_frames: bool = False
+        self.frame_window_size: int = frame_window_size
+        self.frame_read_ahead: int = frame_read_ahead
+
+        if predictor is None:
+            predictor = self.build_predictor(
+                model_path=self.model_path,
+                model_config=self.model_config,
+                device=self.device,
+            )
+        self.predictor: SAM2VideoPredictor = predictor
 
-        self.predictor = build_sam2_video_predictor(
-            config_file=self.model_config,
-            ckpt_path=self.model_path,
-            device=self.device.type,
+        self.feature_cache = feature_cache
+        if self.feature_cache is not None:
+            _install_feature_cache_hook(self.predictor)
+
+        self._inference_state: Optional[dict] = None
+        self._prompt_state_snapshot: Optional[dict] = None
+        self._frame_loader: Optional[LazyVideoFrameLoader] = None
+
+    @staticmethod
+    def build_predictor(
+        model_path: str, model_config: str, device: Union[torch.device, str] = "cuda"
+    ) -> SAM2VideoPredictor:
+        return build_sam2_video_predictor(
+            config_file=model_config,
+            ckpt_path=model_path,
+            device=torch.device(device).type,
             mode="eval",
             apply_postprocessing=True,
         )
 
-        self._inference_state: Optional[dict] = None
-
     def reset_state(self) -> None:
+        self._prompt_state_snapshot = None
         if self.inference_state is not None:
             self.predictor.reset_state(self.inference_state)
 
+    def snapshot_prompt_state(self) -> None:
+        """Stores the prompt-only part of the inference state (prompts and conditioning
+        frame outputs) to be restored after a propagation without replaying the prompts.
+        Should be called right before the propagation starts.
+        """
+        self._prompt_state_snapshot = {
+            key: _copy_state_value(self.inference_state[key])
+            for key in PROMPT_STATE_KEYS
+        }
+
+    def restore_prompt_state(self) -> bool:
+        """Restores the inference state to the last prompt-only snapshot, dropping all
+        propagation results. The snapshot is kept to be restored again.
+
+        Returns:
+            bool: True if a snapshot is restored, False if no snapshot exists
+        """
+        if self._prompt_state_snapshot is None:
+            return False
+        for key, value in self._prompt_state_snapshot.items():
+            self.inference_state[key] = _copy_state_value(value)
+        return True
+
+    def release_state(self) -> None:
+        """Drops the video state so the loaded model can serve another video"""
+        self.release_frames()
+        self._inference_state = None
+        self._prompt_state_snapshot = None
+        if self.device.type == "cuda":
+            torch.cuda.empty_cache()
+
     @property
     def inference_state(self) -> dict:
         if self._inference_state is not None:
@@ -68,10 +215,10 @@ class SegmentAnything2:
     def inference_state(self, state: dict):
         self._inference_state = state
 
-    # FIXME: Find a way to avoid loading the frames into memory
     def init_state(self, video_dir: str) -> Optional[dict]:
-        """Initialize the SAM2 model which includes
-        loading the frames into the memory.
+        """Initialize the SAM2 model state. Frames are not loaded into the memory
+        up front; they are decoded lazily through a bounded frame window
+        while the prompt or propagation cursor reaches them.
 
         Args:
             video_dir (str): frames directory
@@ -80,83 +227,352 @@ class SegmentAnything2:
             dict: state of the model
         """
         try:
-            self.inference_state = self.predictor.init_state(video_dir)
+            self.release_frames()
+            self._frame_loader = LazyVideoFrameLoader(
+                video_dir=video_dir,
+                image_size=self.predictor.image_size,
+                window_size=self.frame_window_size,
+                read_ahead=self.frame_read_ahead,
+                offload_video_to_cpu=self.offload_video_to_cpu,
+                device=self.device,
+            )
+            self.inference_state = self._init_state_with_loader(
+                video_dir, self._frame_loader
+            )
             self.predictor.reset_state(self.inference_state)
+            return self.inference_state
 
         except Exception as e:
             raise ValueError(f"Error initializing model: {e}. Object ID: {id(self)}")
 
+    def _init_state_with_loader(
+        self, video_dir: str, frame_loader: LazyVideoFrameLoader
+    ) -> dict:
+        """Runs predictor.init_state with the lazy frame loader instead of
+        the default `load_video_frames` which decodes the whole video.
+
+        Args:
+            video_dir (str): frames directory
+            frame_loader (LazyVideoFrameLoader): lazy frame source
+
+        Returns:
+            dict: state of the model
+        """
+
+        def _load_video_frames(*args, **kwargs):
+            return frame_loader, frame_loader.video_height, frame_loader.video_width
+
+        cache_ref = None
+        if self.feature_cache is not None:
+            cache_ref = (self.feature_cache, FeatureCache.get_video_key(video_dir))
+
+        with _frame_loader_patch_lock:
+            original_loader = sam2_video_predictor.load_video_frames
+            sam2_video_predictor.load_video_frames = _load_video_frames
+            # init_state encodes the first frame, let it hit the cache as well
+            _init_feature_cache.value = cache_ref
+            try:
+                inference_state = self.predictor.init_state(
+                    video_dir,
+                    offload_video_to_cpu=self.offload_video_to_cpu,
+                    async_loading_frames=False,
+                )
+            finally:
+                sam2_video_predictor.load_video_frames = original_loader
+                _init_feature_cache.value = None
+
+        if cache_ref is not None:
+            inference_state[FEATURE_CACHE_STATE_KEY] = cache_ref
+        return inference_state
+
+    @torch.inference_mode()
+    def encode_frame(self, frame_idx: int) -> bool:
+        """Runs the image encoder on a frame to fill the feature cache
+
+        Args:
+            frame_idx (int): frame index
+
+        Returns:
+            bool: False if the frame was already cached, True otherwise
+        """
+        cache_ref = self.inference_state.get(FEATURE_CACHE_STATE_KEY)
+        if cache_ref is not None and cache_ref[0].contains(cache_ref[1], frame_idx):
+            return False
+        with torch.autocast("cuda", dtype=torch.bfloat16):
+            self.predictor._get_image_feature(self.inference_state, frame_idx, 1)
+        return True
+
+    @property
+    def num_frames(self) -> int:
+        return self.inference_state["num_frames"]
+
+    def release_frames(self) -> None:
+        """Stops the frame loader of the current video and frees decoded frames"""
+        if self._frame_loader is not None:
+            self._frame_loader.close()
+            self._frame_loader = None
+
     def add_point_prompt(
         self,
         frame_idx: int,
         points: List[np.ndarray],
         labels: List[np.ndarray],
         object_ids: List[str | int],
-    ) -> Tuple[int, List[Union[int, str]], np.ndarray]:
+    ) -> Tuple[int, List[Union[int, str]], MaskOutput]:
         """Add point prompt to the model state
 
         Args:
             point_prompt (PointPrompt): point prompt
         Returns:
-            Tuple[List[Union[int, str]], np.ndarray]: object_ids and mask logits
+            Tuple[int, List[Union[int, str]], MaskOutput]: frame index, object ids and masks
             Mask logits are the shape of (N, 1, H, W) where N is the number of objects
         """
-        for point, label, obj_id in zip(
-            points, labels, object_ids
-        ):  # remember: each object needs to added seperately on a frame
-            with torch.autocast("cuda", dtype=torch.bfloat16):
+        with torch.autocast("cuda", dtype=torch.bfloat16):
+            if frame_idx in self.inference_state["frames_already_tracked"]:
+                # prompts on a tracked frame are conditioned on each object's own memory
                 out_frame_idx, out_obj_ids, out_mask_logits = (
-                    self.predictor.add_new_points_or_box(
-                        inference_state=self.inference_state,
+                    self._add_point_prompts_sequential(
                         frame_idx=frame_idx,
-                        points=point,
-                        labels=label,
-                        obj_id=obj_id,
-                        clear_old_points=True,
-                        normalize_coords=False,  # points expected to be normalized
+                        points=points,
+                        labels=labels,
+                        object_ids=object_ids,
                     )
                 )
-        return (
-            out_frame_idx,
-            out_obj_ids,
-            np.squeeze(
-                (out_mask_logits > 0)
-                .permute(0, 2, 3, 1)
-                .cpu()
-                .numpy()
-                .astype(np.int64),
-                axis=-1,
-            ),
+            else:
+                out_frame_idx, out_obj_ids, out_mask_logits = (
+                    self._add_point_prompts_batched(
+                        frame_idx=frame_idx,
+                        points=points,
+                        labels=labels,
+                        object_ids=object_ids,
+                    )
+                )
+        return out_frame_idx, out_obj_ids, MaskOutput.from_logits(out_mask_logits)
+
+    def _add_point_prompts_sequential(
+        self,
+        frame_idx: int,
+        points: List[np.ndarray],
+        labels: List[np.ndarray],
+        object_ids: List[str | int],
+    ) -> Tuple[int, List[Union[int, str]], torch.Tensor]:
+        for point, label, obj_id in zip(
+            points, labels, object_ids
+        ):  # remember: each object needs to added seperately on a frame
+            out_frame_idx, out_obj_ids, out_mask_logits = (
+                self.predictor.add_new_points_or_box(
+                    inference_state=self.inference_state,
+                    frame_idx=frame_idx,
+                    points=point,
+                    labels=label,
+                    obj_id=obj_id,
+                    clear_old_points=True,
+                    normalize_coords=False,  # points expected to be normalized
+                )
+            )
+        return out_frame_idx, out_obj_ids, out_mask_logits
+
+    @torch.inference_mode()
+    def _add_point_prompts_batched(
+        self,
+        frame_idx: int,
+        points: List[np.ndarray],
+        labels: List[np.ndarray],
+        object_ids: List[str | int],
+    ) -> Tuple[int, List[Union[int, str]], torch.Tensor]:
+        """Encodes and decodes the point prompts of all objects on a frame in a single
+        batched pass. Mirrors `add_new_points_or_box` for frames that are not tracked yet,
+        where the outputs do not depend on the memory of the objects.
+
+        Returns:
+            Tuple[int, List[Union[int, str]], torch.Tensor]: frame index, all object ids
+            and mask logits of all objects in video resolution (N, 1, H, W)
+        """
+        state = self.inference_state
+        predictor = self.predictor
+        device = state["device"]
+
+        obj_idxs: List[int] = []
+        point_inputs_list: List[dict] = []
+        prev_logits_list: List[Optional[torch.Tensor]] = []
+        for point, label, obj_id in zip(points, labels, object_ids):
+            obj_idx = predictor._obj_id_to_idx(state, obj_id)
+            point_tensor = torch.as_tensor(point, dtype=torch.float32).reshape(1, -1, 2)
+            label_tensor = torch.as_tensor(label, dtype=torch.int32).reshape(1, -1)
+            # points are normalized, scale them to the model input resolution
+            point_inputs = concat_points(
+                None,
+                (point_tensor * predictor.image_size).to(device),
+                label_tensor.to(device),
+            )
+            state["point_inputs_per_obj"][obj_idx][frame_idx] = point_inputs
+            state["mask_inputs_per_obj"][obj_idx].pop(frame_idx, None)
+
+            prev_out = state["temp_output_dict_per_obj"][obj_idx]["cond_frame_outputs"].get(
+                frame_idx
+            )
+            if prev_out is None:
+                prev_out = state["output_dict_per_obj"][obj_idx]["cond_frame_outputs"].get(
+                    frame_idx
+                )
+            prev_logits = None
+            if prev_out is not None and prev_out["pred_masks"] is not None:
+                prev_logits = torch.clamp(
+                    prev_out["pred_masks"].to(device, non_blocking=True), -32.0, 32.0
+                )
+
+            obj_idxs.append(obj_idx)
+            point_inputs_list.append(point_inputs)
+            prev_logits_list.append(prev_logits)
+
+        # objects are decoded in batches of the same point count and previous mask use:
+        # the previous mask is a batch-wide decoder input and the point count decides
+        # multimask output (`_use_multimask`), padding would change it for single clicks
+        groups: Dict[Tuple[bool, int], List[int]] = dict()
+        for i, (point_inputs, logits) in enumerate(zip(point_inputs_list, prev_logits_list)):
+            key = (logits is not None, point_inputs["point_labels"].size(1))
+            groups.setdefault(key, []).append(i)
+        for group in groups.values():
+            prev_logits = None
+            if prev_logits_list[group[0]] is not None:
+                prev_logits = torch.cat([prev_logits_list[i] for i in group], dim=0)  # type: ignore
+            current_out, _ = predictor._run_single_frame_inference(
+                inference_state=state,
+                # init conditioning frames are not conditioned on memory
+                output_dict={"cond_frame_outputs": {}, "non_cond_frame_outputs": {}},
+                frame_idx=frame_idx,
+                batch_size=len(group),
+                is_init_cond_frame=True,
+                point_inputs={
+                    name: torch.cat([point_inputs_list[i][name] for i in group], dim=0)
+                    for name in ("point_coords", "point_labels")
+                },
+                mask_inputs=None,
+                reverse=False,
+                run_mem_encoder=False,
+                prev_sam_mask_logits=prev_logits,
+            )
+            for batch_idx, i in enumerate(group):
+                state["temp_output_dict_per_obj"][obj_idxs[i]]["cond_frame_outputs"][
+                    frame_idx
+                ] = self._slice_output(current_out, batch_idx)
+
+        consolidated_out = predictor._consolidate_temp_output_across_obj(
+            state,
+            frame_idx,
+            is_cond=True,
+            run_mem_encoder=False,
+            consolidate_at_video_res=True,
+        )
+        _, video_res_masks = predictor._get_orig_video_res_output(
+            state, consolidated_out["pred_masks_video_res"]
         )
+        return frame_idx, state["obj_ids"], video_res_masks
+
+    @staticmethod
+    def _slice_output(output: dict, batch_idx: int) -> dict:
+        """Extracts the output of a single object from a batched frame output"""
+
+        def _slice(value):
+            if isinstance(value, torch.Tensor):
+                return value[batch_idx : batch_idx + 1]
+            if isinstance(value, list):
+                return [_slice(v) for v in value]
+            return value
+
+        return {key: _slice(value) for key, value in output.items()}
+
+    def get_frame_masks(
+        self, frame_idx: int, object_ids: Optional[List[Union[int, str]]] = None
+    ) -> Optional[Tuple[List[Union[int, str]], MaskOutput]]:
+        """Returns the masks already predicted for a frame without running the model
+
+        Args:
+            frame_idx (int): frame index
+            object_ids (Optional[List[Union[int, str]]], optional): objects to return,
+                all objects if None. Defaults to None.
+
+        Returns:
+            Optional[Tuple[List[Union[int, str]], MaskOutput]]: object ids and masks,
+            None if any of the objects has no output on the frame
+        """
+        state = self.inference_state
+        if object_ids is None:
+            object_ids = list(state["obj_ids"])
+        if not object_ids:
+            return None
+
+        pred_masks: List[torch.Tensor] = []
+        for obj_id in object_ids:
+            obj_idx = state["obj_id_to_idx"].get(obj_id)
+            if obj_idx is None:
+                return None
+            # prompts not consolidated yet are the most recent outputs
+            out = state["temp_output_dict_per_obj"][obj_idx]["cond_frame_outputs"].get(frame_idx)
+            if out is None:
+                out = state["output_dict_per_obj"][obj_idx]["cond_frame_outputs"].get(frame_idx)
+            if out is None:
+                out = state["output_dict_per_obj"][obj_idx]["non_cond_frame_outputs"].get(
+                    frame_idx
+                )
+            if out is None or out["pred_masks"] is None:
+                return None
+            pred_masks.append(out["pred_masks"])
+
+        with torch.inference_mode():
+            all_pred_masks = torch.cat(pred_masks, dim=0).to(
+                state["device"], non_blocking=True
+            )
+            _, video_res_masks = self.predictor._get_orig_video_res_output(
+                state, all_pred_masks
+            )
+        return object_ids, MaskOutput.from_logits(video_res_masks)
 
     def run_inference(
         self,
-    ) -> Generator[Tuple[int, List[Union[int, str]], np.ndarray], None, None]:
+        start_frame_idx: Optional[int] = None,
+        max_frame_num_to_track: Optional[int] = None,
+        direction: Literal["forward", "reverse", "both"] = "forward",
+    ) -> Generator[Tuple[int, List[Union[int, str]], MaskOutput], None, None]:
         """Run inference on the model state
 
+        Args:
+            start_frame_idx (Optional[int], optional): frame to start the propagation from,
+                defaults to the first prompted frame. Defaults to None.
+            max_frame_num_to_track (Optional[int], optional): max number of frames propagated
+                in each direction, defaults to the whole video. Defaults to None.
+            direction (Literal["forward", "reverse", "both"], optional): propagation direction,
+                "both" runs forward then reverse from the start frame. Defaults to "forward".
+
         Yields:
-            Generator[Tuple[List[Union[int, str]], np.ndarray], None, None]: object_ids and mask logits
+            Generator[Tuple[int, List[Union[int, str]], MaskOutput], None, None]: frame index, object ids and masks
             Mask logits are the shape of (N, 1, H, W) where N is the number of objects
         """
         # FIXME: On the second run call the reset state method -> hold an attribute if reset state called after video propagation
+        if direction not in PROPAGATION_DIRECTIONS:
+            raise ValueError(f"Invalid propagation direction: {direction}")
 
+        yielded_frames = set()
         with torch.autocast("cuda", dtype=torch.bfloat16):
-            for (
-                out_frame_idx,
-                out_obj_ids,
-                out_mask_logits,
-            ) in self.predictor.propagate_in_video(
-                inference_state=self.inference_state
-            ):
-                yield out_frame_idx, out_obj_ids, np.squeeze(
-                    (out_mask_logits > 0)
-                    .permute(0, 2, 3, 1)
-                    .cpu()
-                    .numpy()
-                    .astype(np.int64),
-                    axis=-1,
-                )
-                
+            for reverse in PROPAGATION_DIRECTIONS[direction]:
+                for (
+                    out_frame_idx,
+                    out_obj_ids,
+                    out_mask_logits,
+                ) in self.predictor.propagate_in_video(
+                    inference_state=self.inference_state,
+                    start_frame_idx=start_frame_idx,
+                    max_frame_num_to_track=max_frame_num_to_track,
+                    reverse=reverse,
+                ):
+                    # start frame is yielded by both directions
+                    if out_frame_idx in yielded_frames:
+                        continue
+                    yielded_frames.add(out_frame_idx)
+                    yield out_frame_idx, out_obj_ids, MaskOutput.from_logits(
+                        out_mask_logits
+                    )
+
     def remove_object(self, object_id: Union[int, str]) -> None:
         """Remove object from the model state
 
@@ -175,7 +591,7 @@ class SegmentAnything2:
         Returns:
             np.ndarray: mask image -> [HxWx3]
         """
-        mask = mask.astype(np.uint8) * 255
+        mask = as_uint8_mask(mask) * np.uint8(255)
         mask = cv.cvtColor(mask, cv.COLOR_GRAY2BGR)
         return mask
 
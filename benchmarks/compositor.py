@@ -0,0 +1,92 @@
+"""Compares the label-map compositor with the previous per-object float blending.
+
+Prints the time per rendered frame and the pixel difference to the previous
+rendering, full resolution and with `scale` applied before compositing.
+
+Usage:
+    python -m benchmarks.compositor --objects 10 --scale 0.5
+"""
+import time
+import argparse
+
+from typing import Dict
+
+import cv2 as cv
+import numpy as np
+
+from utils import hex_to_rgb, draw_masks_on_image
+from benchmarks.mask_pipeline import make_masks
+
+
+def draw_masks_on_image_float(
+    src_image: np.ndarray, masks: Dict[str, np.ndarray], color: Dict[str, str]
+) -> np.ndarray:
+    """Previous implementation: one full-frame float32 blend per object"""
+    alpha = 0.5
+    for obj_id, mask in masks.items():
+        obj_color = np.array(hex_to_rgb(color[obj_id]), dtype=np.uint8)
+        overlay = np.zeros_like(src_image)
+        overlay[mask] = obj_color
+        blended = src_image.copy().astype(np.float32)
+        overlay = overlay.astype(np.float32)
+        blended[mask] = (1 - alpha) * blended[mask] + alpha * overlay[mask]
+        src_image = blended.astype(np.uint8)
+    return src_image
+
+
+def resize_masks(masks: np.ndarray, size) -> np.ndarray:
+    # nearest neighbour like MaskOutput.resize
+    return np.stack(
+        [cv.resize(m.view(np.uint8), size, interpolation=cv.INTER_NEAREST) for m in masks]
+    ).view(bool)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--scale", type=float, default=0.5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8)
+    masks = make_masks(args.objects, args.height, args.width)
+    colors = {str(i): "#%06X" % rng.integers(0, 0xFFFFFF) for i in range(args.objects)}
+    mask_mapping = {str(i): mask for i, mask in enumerate(masks)}
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        reference = draw_masks_on_image_float(image, mask_mapping, colors)
+    float_time = (time.perf_counter() - start) / args.repeat
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        rendered = draw_masks_on_image(image, mask_mapping, colors)
+    label_time = (time.perf_counter() - start) / args.repeat
+
+    diff = np.abs(reference.astype(np.int16) - rendered.astype(np.int16))
+    print(f"{args.objects} objects, {args.width}x{args.height}")
+    print(f"  float: {float_time * 1000:8.1f} ms/frame")
+    print(f"  label: {label_time * 1000:8.1f} ms/frame")
+    print(f"  diff : max {diff.max()}, mean {diff.mean():.4f}, "
+          f"pixels differing {np.count_nonzero(diff.any(axis=2)) / diff[..., 0].size:.4%}")
+
+    # scale after compositing (previous) vs before compositing
+    size = (round(args.width * args.scale), round(args.height * args.scale))
+    start = time.perf_counter()
+    scaled_reference = cv.resize(reference, (0, 0), fx=args.scale, fy=args.scale)
+    scaled = draw_masks_on_image(
+        cv.resize(image, size, interpolation=cv.INTER_AREA),
+        {str(i): m for i, m in enumerate(resize_masks(masks, size))},
+        colors,
+    )
+    scaled_time = time.perf_counter() - start
+    diff = np.abs(scaled_reference.astype(np.int16) - scaled.astype(np.int16))
+    print(f"  scale {args.scale}: {scaled_time * 1000:8.1f} ms/frame, "
+          f"diff mean {diff.mean():.4f}, 99th percentile {np.percentile(diff, 99):.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compares propagation response traffic of full frames and delta mode on a mostly static
+shot: objects stay in place with a few moving ones, one object leaves the scene.
+
+Usage:
+    python -m benchmarks.delta --objects 20 --frames 300 --moving 2
+"""
+import argparse
+
+import numpy as np
+import torch
+
+import schemas
+from ai_module import MaskOutput, MaskDeltaTracker
+from benchmarks.mask_pipeline import make_masks
+
+
+def bbox_message(frame_idx: int, ids: list, masks: MaskOutput, meta: dict) -> bytes:
+    cover = schemas.BboxCover.model_construct(
+        frame_number=frame_idx,
+        bboxes=[
+            schemas.BboxObject.model_construct(
+                id=obj_id, xmin=b[0], ymin=b[1], xmax=b[2], ymax=b[3], normalized=True
+            )
+            for obj_id, b in zip(ids, masks.xyxy(normalized=True).tolist())
+        ],
+    )
+    response = schemas.SingleFrameResponseCover.model_construct(
+        msg_type="bbox", data=cover, meta=meta
+    )
+    return response.model_dump_json().encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--moving", type=int, default=2)
+    parser.add_argument("--height", type=int, default=540)
+    parser.add_argument("--width", type=int, default=960)
+    args = parser.parse_args()
+
+    base = torch.from_numpy(make_masks(args.objects, args.height, args.width))
+    ids = [str(i) for i in range(args.objects)]
+    tracker = MaskDeltaTracker()
+    full_bytes = delta_bytes = sent_objects = 0
+    for frame_idx in range(args.frames):
+        masks = base.clone()
+        for i in range(args.moving):
+            masks[i] = torch.roll(base[i], shifts=frame_idx, dims=1)
+        if frame_idx >= args.frames // 2:
+            masks[-1] = False  # leaves the scene
+        output = MaskOutput(masks)
+
+        full_bytes += len(bbox_message(frame_idx, ids, output, {"propagation": True}))
+        delta = tracker.update(frame_idx, ids, output)
+        sent_objects += len(delta.changed)
+        delta_bytes += len(
+            bbox_message(
+                frame_idx,
+                [ids[k] for k in delta.changed],
+                output[delta.changed],
+                {"propagation": True, **delta.meta()},
+            )
+        )
+
+    print(f"{args.objects} objects ({args.moving} moving), {args.frames} frames")
+    print(f"  full : {full_bytes / 1024:9.1f} KiB, {args.objects * args.frames} objects sent")
+    print(f"  delta: {delta_bytes / 1024:9.1f} KiB, {sent_objects} objects sent")
+    print(f"  ratio: {full_bytes / max(delta_bytes, 1):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
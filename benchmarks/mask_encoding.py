@@ -0,0 +1,63 @@
+"""Compares mask response encodings: 3-channel PNG (current `mask`), COCO RLE and bitmask.
+
+Usage:
+    python -m benchmarks.mask_encoding --objects 10 --height 1080 --width 1920
+"""
+import time
+import argparse
+
+from typing import Callable, Dict, List
+
+import cv2 as cv
+import numpy as np
+
+from utils import image_to_base64, as_uint8_mask, mask_to_rle, mask_to_bitmask
+from benchmarks.mask_pipeline import make_masks
+
+
+def encode_png(mask: np.ndarray) -> str:
+    # same path as SegmentAnything2.mask_to_image + image_to_base64
+    mask_image = cv.cvtColor(as_uint8_mask(mask) * np.uint8(255), cv.COLOR_GRAY2BGR)
+    return image_to_base64(mask_image)
+
+
+def encode_rle(mask: np.ndarray) -> str:
+    return str(mask_to_rle(mask)["counts"])
+
+
+ENCODERS: Dict[str, Callable[[np.ndarray], str]] = {
+    "png": encode_png,
+    "rle": encode_rle,
+    "bitmask": mask_to_bitmask,
+}
+
+
+def measure(encode: Callable[[np.ndarray], str], masks: np.ndarray, repeat: int) -> Dict[str, float]:
+    encoded: List[str] = [encode(mask) for mask in masks]  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        encoded = [encode(mask) for mask in masks]
+    elapsed = (time.perf_counter() - start) / repeat
+    return {"seconds": elapsed, "bytes": float(sum(len(e) for e in encoded))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    masks = make_masks(args.objects, args.height, args.width)
+    print(f"{args.objects} objects, {args.width}x{args.height}")
+    for name, encode in ENCODERS.items():
+        result = measure(encode, masks, args.repeat)
+        print(
+            f"{name:>8}: {result['seconds'] * 1000:8.1f} ms/frame, "
+            f"{result['bytes'] / 1024:10.1f} KiB/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
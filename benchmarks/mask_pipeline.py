@@ -0,0 +1,84 @@
+"""Compares the previous int64 mask pipeline with the boolean one on synthetic masks.
+
+Usage:
+    python -m benchmarks.mask_pipeline --objects 10 --height 2160 --width 3840
+"""
+import time
+import argparse
+import tracemalloc
+
+from typing import Callable, Dict
+
+import cv2 as cv
+import numpy as np
+
+from utils import mask_to_polygons, mask_to_xyxy, draw_masks_on_image, as_uint8_mask
+
+
+def make_masks(n: int, h: int, w: int, seed: int = 0) -> np.ndarray:
+    """Random elliptic objects as thresholded model output [NxHxW] bool"""
+    rng = np.random.default_rng(seed)
+    masks = np.zeros((n, h, w), dtype=np.uint8)
+    for i in range(n):
+        center = (int(rng.integers(0, w)), int(rng.integers(0, h)))
+        axes = (int(rng.integers(w // 20, w // 5)), int(rng.integers(h // 20, h // 5)))
+        cv.ellipse(masks[i], center, axes, 0, 0, 360, 1, -1)
+    return masks.view(bool)
+
+
+def int64_pipeline(masks: np.ndarray, image: np.ndarray) -> None:
+    masks = masks.astype(np.int64)
+    mask_to_xyxy(masks, normlized=True)
+    for mask in masks:
+        mask_to_polygons(mask.astype(np.uint8), normalized=True)
+        mask_image = mask.astype(np.uint8) * 255
+        cv.cvtColor(mask_image, cv.COLOR_GRAY2BGR)
+    draw_masks_on_image(
+        image, masks={str(i): mask.astype(bool) for i, mask in enumerate(masks)}, color={}
+    )
+
+
+def bool_pipeline(masks: np.ndarray, image: np.ndarray) -> None:
+    mask_to_xyxy(masks, normlized=True)
+    for mask in masks:
+        mask_to_polygons(mask, normalized=True)
+        mask_image = as_uint8_mask(mask) * np.uint8(255)
+        cv.cvtColor(mask_image, cv.COLOR_GRAY2BGR)
+    draw_masks_on_image(image, masks={str(i): mask for i, mask in enumerate(masks)}, color={})
+
+
+def measure(fn: Callable, masks: np.ndarray, image: np.ndarray, repeat: int) -> Dict[str, float]:
+    fn(masks, image)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(masks, image)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn(masks, image)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": elapsed, "peak_mb": peak / 2**20}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    masks = make_masks(args.objects, args.height, args.width)
+    image = np.zeros((args.height, args.width, 3), dtype=np.uint8)
+    print(f"{args.objects} objects, {args.width}x{args.height}")
+    for name, fn in (("int64", int64_pipeline), ("bool", bool_pipeline)):
+        result = measure(fn, masks, image, args.repeat)
+        print(
+            f"{name:>6}: {result['seconds'] * 1000:8.1f} ms/frame, "
+            f"peak {result['peak_mb']:8.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Compares polygon response size and conversion time for the polygon options.
+
+Masks get ragged edges and specks like thresholded model output.
+
+Usage:
+    python -m benchmarks.polygon --objects 10 --height 1080 --width 1920
+"""
+import time
+import argparse
+
+from typing import Dict, List
+
+import cv2 as cv
+import numpy as np
+
+import schemas
+from utils import mask_to_polygons, encode_polygon
+from benchmarks.mask_pipeline import make_masks
+
+OPTIONS: Dict[str, schemas.PolygonOptions] = {
+    "all points": schemas.PolygonOptions(),
+    "epsilon=1": schemas.PolygonOptions(epsilon=1.0),
+    "epsilon=1, minArea=64, external": schemas.PolygonOptions(
+        epsilon=1.0, minArea=64, externalOnly=True
+    ),
+    "... flat": schemas.PolygonOptions(
+        epsilon=1.0, minArea=64, externalOnly=True, encoding="flat"
+    ),
+    "... delta": schemas.PolygonOptions(
+        epsilon=1.0, minArea=64, externalOnly=True, encoding="delta"
+    ),
+}
+
+
+def make_ragged_masks(n: int, h: int, w: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    masks = make_masks(n, h, w, seed).view(np.uint8).copy()
+    for mask in masks:
+        noise = (rng.random((h, w)) < 0.02).astype(np.uint8)
+        edge = cv.morphologyEx(mask, cv.MORPH_GRADIENT, np.ones((5, 5), np.uint8))
+        mask ^= noise & edge  # ragged edges
+        mask |= (rng.random((h, w)) < 0.0002).astype(np.uint8)  # specks
+    return masks.view(bool)
+
+
+def to_cover(masks: np.ndarray, options: schemas.PolygonOptions) -> schemas.PolygonCover:
+    polygons: List[schemas.PolygonObject] = list()
+    for obj_id, mask in enumerate(masks):
+        for poly in mask_to_polygons(
+            mask,
+            normalized=options.encoding == "points",
+            epsilon=options.epsilon,
+            min_area=options.minArea,
+            external_only=options.externalOnly,
+        ):
+            polygons.append(
+                schemas.PolygonObject(
+                    id=obj_id,
+                    encoding=options.encoding,
+                    coordinates=encode_polygon(poly, options.encoding),
+                    normalized=options.encoding == "points",
+                )
+            )
+    return schemas.PolygonCover(frame_number=0, polygons=polygons)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    masks = make_ragged_masks(args.objects, args.height, args.width)
+    print(f"{args.objects} objects, {args.width}x{args.height}")
+    for name, options in OPTIONS.items():
+        cover = to_cover(masks, options)  # warm-up
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            cover = to_cover(masks, options)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        message = cover.model_dump_json()
+        points = sum(
+            len(p.coordinates) // (1 if options.encoding == "points" else 2)
+            for p in cover.polygons
+        )
+        print(
+            f"{name:>34}: {len(cover.polygons):5d} polygons, {points:7d} points, "
+            f"{len(message) / 1024:8.1f} KiB, {elapsed * 1000:7.1f} ms/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
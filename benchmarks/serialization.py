@@ -0,0 +1,129 @@
+"""Per-frame serialization cost of the propagation responses and annotations, validated
+models + `model_dump_json` vs `model_construct` + JSON bytes, and request parsing,
+`json.loads` + `model_validate` vs `model_validate_json`.
+
+Usage:
+    python -m benchmarks.serialization --objects 10 --height 1080 --width 1920
+"""
+import json
+import time
+import argparse
+
+from typing import Any, Callable, List
+
+import numpy as np
+
+import schemas
+from utils import mask_to_polygons, dump_json_bytes, validate_request
+from benchmarks.polygon import make_ragged_masks
+
+
+def build_frame(polygons: List[List[np.ndarray]], boxes: list, construct: bool) -> Any:
+    def make(model, **kwargs):
+        return model.model_construct(**kwargs) if construct else model(**kwargs)
+
+    polygon_cover = make(
+        schemas.PolygonCover,
+        frame_number=0,
+        polygons=[
+            make(
+                schemas.PolygonObject,
+                id=str(i),
+                objectColor="#FFFFFF",
+                coordinates=poly.tolist(),
+                normalized=True,
+            )
+            for i, object_polygons in enumerate(polygons)
+            for poly in object_polygons
+        ],
+    )
+    bbox_annotations = [
+        make(schemas.BboxAnnotation, id=str(i), xmin=b[0], ymin=b[1], xmax=b[2], ymax=b[3])
+        for i, b in enumerate(boxes)
+    ]
+    polygon_annotations = [
+        make(schemas.PolygonAnnotation, id=str(p.id), coordinates=p.coordinates)
+        for p in polygon_cover.polygons
+    ]
+    response = make(
+        schemas.SingleFrameResponseCover,
+        msg_type="polygon",
+        data=polygon_cover,
+        meta={"propagation": True},
+    )
+    annotation = make(
+        schemas.ImageAnnotation,
+        image_id="task:0",
+        image_path="/frames/00000001.jpg",
+        meta=make(schemas.AnnotationMeta, annotation_model="sam2", frame_idx=0),
+        bbox_annotations=bbox_annotations,
+        polygon_annotations=polygon_annotations,
+    )
+    return response, annotation
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    masks = make_ragged_masks(args.objects, args.height, args.width)
+    polygons = [mask_to_polygons(mask, normalized=True) for mask in masks]
+    boxes = np.random.rand(args.objects, 4).tolist()
+    points = sum(len(p) for object_polygons in polygons for p in object_polygons)
+    print(f"{args.objects} objects, {points} polygon points per frame")
+
+    contours = timed(lambda: [mask_to_polygons(m, normalized=True) for m in masks], args.repeat)
+
+    def validated() -> None:
+        response, annotation = build_frame(polygons, boxes, construct=False)
+        response.model_dump_json()
+        annotation.model_dump_json()
+
+    def constructed() -> None:
+        response, annotation = build_frame(polygons, boxes, construct=True)
+        dump_json_bytes(response)
+        dump_json_bytes(annotation)
+
+    print(f"  contour extraction : {contours * 1000:8.2f} ms/frame")
+    print(f"  validated + str    : {timed(validated, args.repeat) * 1000:8.2f} ms/frame")
+    print(f"  construct + bytes  : {timed(constructed, args.repeat) * 1000:8.2f} ms/frame")
+
+    request = json.dumps(
+        {
+            "msg_type": "add_points",
+            "data": [
+                {
+                    "id": str(i),
+                    "objectColor": "#FFFFFF",
+                    "child": [
+                        {"id": str(i), "frameNumber": 0, "x": 0.5, "y": 0.5, "markerType": 1}
+                    ]
+                    * 8,
+                }
+                for i in range(args.objects)
+            ],
+            "meta": {},
+        }
+    ).encode("utf-8")
+    # the error path is cheaper, make sure the valid path is timed
+    assert validate_request(request)[1], validate_request(request)[0].message
+    loads = timed(lambda: validate_request(json.loads(request.decode("utf-8"))), args.repeat)
+    raw = timed(lambda: validate_request(request), args.repeat)
+    print(f"  request loads + validate : {loads * 1e6:8.1f} us")
+    print(f"  request validate_json    : {raw * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
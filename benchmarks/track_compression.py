@@ -0,0 +1,104 @@
+"""Checks the reconstruction error of compressed bbox tracks against the tolerance and
+compares the stored size and export time with per-frame bboxes.
+
+Tracks are random walks with smooth motion, still phases, jitter and direction changes,
+forward and reverse, split into segments like propagation runs.
+
+Usage:
+    python -m benchmarks.track_compression --objects 20 --frames 18000 --tolerance 0.002
+"""
+import json
+import time
+import argparse
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils import TrackCompressor, interpolate_track
+
+
+def make_track(frames: int, rng: np.random.Generator) -> np.ndarray:
+    """[frames x 4] normalized boxes"""
+    velocity = np.zeros(2)
+    center = rng.uniform(0.2, 0.8, 2)
+    size = rng.uniform(0.05, 0.2, 2)
+    boxes = np.zeros((frames, 4))
+    for i in range(frames):
+        if rng.random() < 0.01:
+            # new motion phase, still in about a third of them
+            velocity = rng.normal(0, 0.002, 2) * (rng.random() > 0.3)
+        center = np.clip(center + velocity, size / 2, 1 - size / 2)
+        jitter = rng.normal(0, 0.0003, 4)
+        boxes[i] = np.concatenate([center - size / 2, center + size / 2]) + jitter
+    return np.clip(boxes, 0, 1)
+
+
+def compress(
+    frame_order: List[int], boxes: np.ndarray, tolerance: float
+) -> List[List[Tuple[int, List[float]]]]:
+    compressor = TrackCompressor(tolerance=tolerance)
+    segments = list()
+    for frame in frame_order:
+        closed = compressor.add(frame, boxes[frame].tolist())
+        if closed:
+            segments.append(closed)
+    closed = compressor.close()
+    if closed:
+        segments.append(closed)
+    return segments
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=18000)
+    parser.add_argument("--tolerance", type=float, default=0.002)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    half = args.frames // 2
+    # forward run over the second half, reverse run over the first half
+    frame_order = list(range(half, args.frames)) + list(range(half - 1, -1, -1))
+
+    per_frame_bytes = track_bytes = keyframes = 0
+    max_error = 0.0
+    compress_seconds = expand_seconds = 0.0
+    for obj_id in range(args.objects):
+        boxes = make_track(args.frames, rng)
+        per_frame_bytes += sum(
+            len(json.dumps({"id": str(obj_id), "xmin": b[0], "ymin": b[1], "xmax": b[2], "ymax": b[3]}))
+            for b in boxes.tolist()
+        )
+
+        start = time.perf_counter()
+        segments = compress(frame_order, boxes, args.tolerance)
+        compress_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        restored: Dict[int, List[float]] = dict()
+        for segment in segments:
+            restored.update(interpolate_track(segment))
+        expand_seconds += time.perf_counter() - start
+
+        assert sorted(restored) == list(range(args.frames)), "frames missing after expansion"
+        error = np.abs(np.array([restored[f] for f in range(args.frames)]) - boxes).max()
+        max_error = max(max_error, float(error))
+        keyframes += sum(len(segment) for segment in segments)
+        track_bytes += sum(
+            len(json.dumps({"id": str(obj_id), "keyframes": [[f, *b] for f, b in segment]}))
+            for segment in segments
+        )
+
+    total = args.objects * args.frames
+    print(f"{args.objects} objects, {args.frames} frames, tolerance {args.tolerance}")
+    print(f"  keyframes  : {keyframes} of {total} boxes ({total / max(keyframes, 1):.1f}x fewer)")
+    print(f"  stored     : {per_frame_bytes / 1024:9.1f} KiB per frame, {track_bytes / 1024:9.1f} KiB as tracks")
+    print(f"  compress   : {compress_seconds * 1000:9.1f} ms, expand {expand_seconds * 1000:9.1f} ms")
+    print(f"  max error  : {max_error:.6f}")
+    assert max_error <= args.tolerance + 1e-9, "reconstruction error above the tolerance"
+    print("  reconstruction within tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Compares response wire formats: json with base64 payloads vs the binary envelope.
+
+Measures message size, worker-side serialization and client-side decoding (json parse
+plus base64 decode vs binary decode) of rendered frames and png/bitmask masks. As in the
+worker, json responses hold base64 payloads and binary responses hold the raw bytes.
+
+Usage:
+    python -m benchmarks.wire_format --objects 10 --height 1080 --width 1920
+"""
+import json
+import time
+import base64
+import argparse
+
+from typing import Any, Callable, Dict, List, Union
+
+import cv2 as cv
+import numpy as np
+
+import schemas
+from utils import (
+    encode_image,
+    draw_masks_on_image,
+    mask_to_packed_bits,
+    encode_binary_message,
+    decode_binary_message,
+)
+from benchmarks.mask_pipeline import make_masks
+from benchmarks.mask_encoding import encode_png
+
+
+def make_responses(
+    masks: np.ndarray, raw: bool
+) -> Dict[str, schemas.SingleFrameResponseCover]:
+    def payload(data: bytes) -> Union[str, bytes]:
+        return data if raw else base64.b64encode(data).decode("utf-8")
+
+    n, h, w = masks.shape
+    image = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+    image = cv.GaussianBlur(image, (31, 31), 0)  # photo-like, compressible jpeg
+    frame = draw_masks_on_image(
+        image,
+        {str(i): mask for i, mask in enumerate(masks)},
+        {str(i): "#%06x" % np.random.randint(0, 0xFFFFFF) for i in range(n)},
+    )
+    return {
+        "frame": schemas.SingleFrameResponseCover(
+            msg_type="frame",
+            data=schemas.FrameCover(frame_number=0, image_base64=payload(encode_image(frame))),
+        ),
+        "mask (png)": schemas.SingleFrameResponseCover(
+            msg_type="mask",
+            data=schemas.MaskCover(
+                frame_number=0,
+                masks=[
+                    schemas.Mask(
+                        mask_type="mask", id=str(i), mask=payload(base64.b64decode(encode_png(mask)))
+                    )
+                    for i, mask in enumerate(masks)
+                ],
+            ),
+        ),
+        "bitmask": schemas.SingleFrameResponseCover(
+            msg_type="bitmask",
+            data=schemas.MaskCover(
+                frame_number=0,
+                masks=[
+                    schemas.Mask(
+                        mask_type="bitmask",
+                        id=str(i),
+                        mask=payload(mask_to_packed_bits(mask)),
+                        size=[h, w],
+                    )
+                    for i, mask in enumerate(masks)
+                ],
+            ),
+        ),
+    }
+
+
+def decode_json(message: Union[str, bytes]) -> Any:
+    # what a client does to get the raw bytes out of the json message
+    decoded = json.loads(message)
+    data = decoded["data"]
+    if "image_base64" in data:
+        data["image_base64"] = base64.b64decode(data["image_base64"])
+    for mask in data.get("masks", []):
+        mask["mask"] = base64.b64decode(mask["mask"])
+    return decoded
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--objects", type=int, default=10)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    masks = make_masks(args.objects, args.height, args.width)
+    print(f"{args.objects} objects, {args.width}x{args.height}")
+    json_responses = make_responses(masks, raw=False)
+    binary_responses = make_responses(masks, raw=True)
+    for name, response in json_responses.items():
+        binary_response = binary_responses[name]
+        json_message = response.model_dump_json()
+        binary_message = encode_binary_message(binary_response.model_dump())
+        rows: List[str] = []
+        for wire, message, encode, decode in (
+            ("json", json_message, response.model_dump_json, lambda: decode_json(json_message)),
+            (
+                "binary",
+                binary_message,
+                lambda: encode_binary_message(binary_response.model_dump()),
+                lambda: decode_binary_message(binary_message),
+            ),
+        ):
+            rows.append(
+                f"  {wire:>6}: {len(message) / 1024:9.1f} KiB, "
+                f"encode {timed(encode, args.repeat) * 1000:7.2f} ms, "
+                f"decode {timed(decode, args.repeat) * 1000:7.2f} ms"
+            )
+        print(name)
+        print("\n".join(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,2 @@
-from .service import BaseService
\ No newline at end of file
+from .service import BaseService
+from .response_queue import ResponseQueue
@@ -0,0 +1,92 @@
+import queue
+import threading
+
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+
+class ResponseQueue:
+    def __init__(
+        self,
+        maxsize: int,
+        max_coalesced: int = 1,
+        is_coalescible: Optional[Callable[[Any], bool]] = None,
+    ) -> None:
+        """Bounded FIFO queue with a per-item policy, a drop-in for `queue.Queue` get/put.
+
+        - regular items are never dropped, `put` blocks while the queue is full (backpressure)
+        - coalescible items (e.g. propagation previews) are dropped oldest first so that
+          at most `max_coalesced` of them are queued, only the newest ones are delivered
+
+        Args:
+            maxsize (int): max number of queued items
+            max_coalesced (int, optional): max number of queued coalescible items. Defaults to 1.
+            is_coalescible (Optional[Callable[[Any], bool]], optional): item policy,
+                all items are regular if not given. Defaults to None.
+        """
+        self.maxsize = max(maxsize, 1)
+        self.max_coalesced = max(max_coalesced, 1)
+        self.is_coalescible = is_coalescible or (lambda item: False)
+
+        self._items: Deque[Any] = deque()
+        self._coalesced_count = 0
+        self._cond = threading.Condition()
+        # number of coalescible items replaced by newer ones
+        self.dropped: int = 0
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        with self._cond:
+            if self.is_coalescible(item):
+                while self._coalesced_count >= self.max_coalesced:
+                    self._drop_oldest_coalescible()
+                if len(self._items) >= self.maxsize:
+                    # queue is full of regular items, the preview is the one to drop
+                    self.dropped += 1
+                    return
+                self._coalesced_count += 1
+            else:
+                while len(self._items) >= self.maxsize:
+                    # make room from previews first, block only on regular items
+                    if self._coalesced_count > 0:
+                        self._drop_oldest_coalescible()
+                        continue
+                    if not block:
+                        raise queue.Full
+                    if not self._cond.wait(timeout=timeout):
+                        raise queue.Full
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def put_nowait(self, item: Any) -> None:
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        with self._cond:
+            if not block:
+                if not self._items:
+                    raise queue.Empty
+            elif not self._cond.wait_for(lambda: len(self._items) > 0, timeout=timeout):
+                raise queue.Empty
+            item = self._items.popleft()
+            if self.is_coalescible(item):
+                self._coalesced_count -= 1
+            self._cond.notify_all()
+            return item
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def _drop_oldest_coalescible(self) -> None:
+        for i, item in enumerate(self._items):
+            if self.is_coalescible(item):
+                del self._items[i]
+                self._coalesced_count -= 1
+                self.dropped += 1
+                return
@@ -1,6 +1,6 @@
 import redis
 
-from typing import Optional, Any, Awaitable, List, Union, Literal, Tuple
+from typing import Optional, Any, Awaitable, List, Union, Literal, Tuple, Dict, Iterator
 from settings import settings
 
 
@@ -40,26 +40,67 @@ class RedisClient:
             print(f"Error: {e}")
             return None
 
+    def queue_many(
+        self, queue_name: str, values: List[Union[str, bytes]], ttl: Optional[int] = None
+    ) -> Optional[int]:
+        """Pushes multiple values in one round trip, values are dequeued (RPOP) in the given order
+
+        Args:
+            queue_name (str): queue name
+            values (List[Union[str, bytes]]): values to be queued
+            ttl (Optional[int], optional): expiration of the queue in seconds,
+                refreshed on every push. Defaults to None.
+
+        Returns:
+            Optional[int]: queue length after the push, None on error
+        """
+        if not values:
+            return None
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.lpush(queue_name, *values)
+            if ttl:
+                pipe.expire(queue_name, ttl)
+            return pipe.execute()[0]
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+
+    def queue_length(self, queue_name: str) -> Optional[int]:
+        try:
+            return self.client.llen(queue_name)  # type: ignore
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+
     def dequeue(
-        self, queue_name: str, timeout: Optional[int] = None, count: int = 1
+        self,
+        queue_name: Union[str, List[str]],
+        timeout: Optional[int] = None,
+        count: int = 1,
     ) -> Optional[List[bytes]]:
         """Dequeue a value from a queue
         if timeout is None, it behives like non-blocking
 
         Args:
-            queue_name (str): queue name to be dequeued
+            queue_name (Union[str, List[str]]): queue name to be dequeued,
+                multiple queues can be given to a blocking pop
             timeout (Optional[int], optional): timeout in seconds. Defaults to None.
 
         Returns:
             Optional[Awaitable[Any] | Any]: Dequeued value if exists, None otherwise
+                blocking pop returns [queue_name, value]
         """
         try:
             if timeout is None:
+                if not isinstance(queue_name, str):
+                    raise RuntimeWarning("Multiple queues are supported with blocking pop")
                 response = self.client.rpop(queue_name, count)
             else:
                 if count > 1:
                     raise RuntimeWarning("Count is not supported with blocking pop")
-                response = self.client.brpop([queue_name], timeout)
+                queue_names = [queue_name] if isinstance(queue_name, str) else queue_name
+                response = self.client.brpop(queue_names, timeout)
 
             if response:
                 return response  # type: ignore
@@ -68,6 +109,105 @@ class RedisClient:
             print(f"Error: {e}")
             return None
 
+    def hash_set_many(self, key: str, mapping: Dict[str, Union[str, bytes]]) -> bool:
+        """Sets multiple hash fields in one round trip
+
+        Args:
+            key (str): hash key
+            mapping (Dict[str, Union[str, bytes]]): field -> value
+
+        Returns:
+            bool: True if the write succeeded
+        """
+        if not mapping:
+            return True
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(key, mapping=mapping)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+
+    def hash_get(self, key: str, field: str) -> Optional[str]:
+        try:
+            value = self.client.hget(key, field)
+            return value.decode("utf-8") if value else None  # type: ignore
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+
+    def hash_get_many(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        """Reads multiple hash fields in one round trip
+
+        Args:
+            key (str): hash key
+            fields (List[str]): fields to read
+
+        Returns:
+            List[Optional[str]]: values in field order, None for missing fields or on error
+        """
+        if not fields:
+            return list()
+        try:
+            values = self.client.hmget(key, fields)
+            return [v.decode("utf-8") if v else None for v in values]  # type: ignore
+        except Exception as e:
+            print(f"Error: {e}")
+            return [None] * len(fields)
+
+    def hash_keys(self, key: str) -> List[str]:
+        try:
+            return [field.decode("utf-8") for field in self.client.hkeys(key)]  # type: ignore
+        except Exception as e:
+            print(f"Error: {e}")
+            return list()
+
+    def hash_replace(
+        self, key: str, delete_fields: List[str], mapping: Dict[str, Union[str, bytes]]
+    ) -> bool:
+        """Deletes and sets hash fields in one transaction
+
+        Args:
+            key (str): hash key
+            delete_fields (List[str]): fields to delete
+            mapping (Dict[str, Union[str, bytes]]): fields to set afterwards
+
+        Returns:
+            bool: True if the write succeeded
+        """
+        if not delete_fields and not mapping:
+            return True
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            if delete_fields:
+                pipe.hdel(key, *delete_fields)
+            if mapping:
+                pipe.hset(key, mapping=mapping)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+
+    def hash_scan(self, key: str, count: int = 1000) -> Iterator[Tuple[str, str]]:
+        """Iterates over all fields of a hash with HSCAN
+
+        Args:
+            key (str): hash key
+            count (int, optional): HSCAN count hint. Defaults to 1000.
+
+        Yields:
+            Tuple[str, str]: field, value, iteration stops on error
+        """
+        try:
+            for field, value in self.client.hscan_iter(key, count=count):
+                yield field.decode("utf-8"), value.decode("utf-8")
+        except Exception as e:
+            print(f"Error: {e}")
+            return
+
     def stream_add(self, stream_name: str, data: dict) -> bool:
         pub_idx = self.client.xadd(stream_name, data)
         return True if pub_idx else False
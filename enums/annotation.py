@@ -6,5 +6,6 @@ class AnnotationStatusEnum(Enum):
     IN_PROGRESS = "in_progress"  # if the annotation is being processed (while running the model on viode)
     EXPORTED = "exported"  # if the annotation has been exported
     FAILED = "failed"  # if the annotation failed to be processed
+    CANCELLED = "cancelled"  # if the video processing is cancelled (frames processed until cancel are kept)
     WAITING = "waiting"  # if the annotation is waiting for the model to be ready
     UNKNOWN = "unknown"  # if the annotation status is unknown
\ No newline at end of file
@@ -8,6 +8,7 @@ class Task(Enum):
     RUN_MODEL = "run_model"
     TERMINATE_MODEL = "terminate_model"
     RESET = "reset"
+    PRE_ENCODE_VIDEO = "pre_encode_video"
 
 
 class TaskStatus(Enum):
@@ -9,4 +9,5 @@ from .mask import *
 from .frame import *
 from .bbox import *
 from .polygon import *
-from .annotation import *
\ No newline at end of file
+from .annotation import *
+from .delta import *
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Literal, Optional, List, Tuple, Union
 from datetime import datetime, timezone
 
 
@@ -20,7 +20,9 @@ class PolygonAnnotation(BaseModel):
     id: str  # unique uuid for the annotation
     label: Optional[str] = None
     confidence: Optional[float] = None
-    coordinates: List[List[float]] = []
+    encoding: Literal["points", "flat", "delta"] = "points"  # see PolygonObject
+    coordinates: Union[List[List[float]], List[int]] = []
+    size: Optional[List[int]] = None  # [height, width] for flat and delta pixel coordinates
 
     class Config:
         from_attributes = True
@@ -63,3 +65,14 @@ class ImageAnnotation(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class BboxTrack(BaseModel):
+    # compressed bbox track segment of an object over consecutive frames, frames between
+    # keyframes are linearly interpolated (see utils.track_compression)
+    id: str  # object id
+    label: Optional[str] = None
+    keyframes: List[Tuple[int, float, float, float, float]] = []  # frame, xmin, ymin, xmax, ymax
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class DeltaOptions(BaseModel):
+    # delta mode options of the propagation, read from the `delta` request meta
+    enabled: bool = False
+    iouThreshold: float = 0.95  # objects are sent below this IoU with their last sent mask
+    pixelThreshold: Optional[float] = 2.0  # or when a bbox edge moved more, None disables
+    keyframeInterval: int = 30  # every n-th frame sends all objects
+
+    class Config:
+        from_attributes = True
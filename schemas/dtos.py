@@ -1,10 +1,10 @@
 from __future__ import annotations
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, field_validator
 from typing import Any, Dict, List, Optional, TypeVar, Literal, Union
 
 from .prompt import PointPrompt, AnnotationObject, SingleFrameAnnotationObject
 from .mask import MaskCover
-from .frame import FrameCover
+from .frame import FrameCover, FrameObject
 from .bbox import BboxCover
 from .polygon import PolygonCover
 
@@ -15,6 +15,8 @@ class ResponseCover(BaseModel):
     error: Any = None
     meta: Any = None
     message: Optional[str] = None
+    # wire format the payloads are encoded for, set when the worker queues the response
+    _wire_format: Optional[str] = PrivateAttr(default=None)
 
     class Config:
         from_attributes = True
@@ -54,6 +56,37 @@ class RunInferenceInputCover(PointPromptInputCover):
     class Config:
         from_attributes = True
 
+    # optional propagation range: startFrame, maxFrameCount, direction
+    @field_validator("meta", mode="after")
+    @classmethod
+    def _validate_propagation_range(cls, v):
+        if not isinstance(v, dict):
+            return v
+        start_frame = v.get("startFrame")
+        if start_frame is not None and (not isinstance(start_frame, int) or start_frame < 0):
+            raise ValueError("startFrame should be a non-negative integer")
+        max_frame_count = v.get("maxFrameCount")
+        if max_frame_count is not None and (
+            not isinstance(max_frame_count, int) or max_frame_count < 0
+        ):
+            raise ValueError("maxFrameCount should be a non-negative integer")
+        direction = v.get("direction")
+        if direction is not None and direction not in ("forward", "reverse", "both"):
+            raise ValueError("direction should be one of forward, reverse or both")
+        return v
+
+
+class CancelTaskInputCover(ResponseCover):
+    msg_type: str = "cancel"
+    data: Any = None
+
+
+class GetFrameInputCover(ResponseCover):
+    # meta: frameNumber, optional scale
+    msg_type: str = "get_frame"
+    data: List[FrameObject] = []
+    meta: Dict[str, Any] = dict()
+
 
 class RemoveObjectInputCover(ResponseCover):
     msg_type: str = "remove_object"
@@ -69,9 +102,16 @@ class SingleFrameMaskResponseCover(ResponseCover):
 
 
 class SingleFrameResponseCover(ResponseCover):
-    msg_type: Literal["frame", "mask", "polygon", "bbox"] = "frame"
+    msg_type: Literal["frame", "mask", "rle", "bitmask", "polygon", "bbox"] = "frame"
     data: Optional[Union[FrameCover, MaskCover, BboxCover, PolygonCover]] = None
     meta: Dict[str, Any] = dict()
 
 
+class MultiFrameResponseCover(ResponseCover):
+    # propagation frames published together, data holds SingleFrameResponseCover objects
+    msg_type: str = "frames"
+    data: List[SingleFrameResponseCover] = []
+    meta: Dict[str, Any] = dict()
+
+
 ResponseType = TypeVar("ResponseType", bound=ResponseCover)
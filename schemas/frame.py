@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Union
 
 
 class FrameObject(BaseModel):
@@ -12,7 +12,7 @@ class FrameObject(BaseModel):
 
 class FrameCover(BaseModel):
     frame_number: int
-    image_base64: str
+    image_base64: Union[str, bytes]  # raw jpeg bytes with the binary wire format
     objects: List[FrameObject] = []
 
     class Config:
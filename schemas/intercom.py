@@ -16,7 +16,9 @@ class InitModelIntercom(BaseModel):
 
 
 class Intercom(BaseModel):
-    task_type: Literal["initialize_model", "terminate_model", "reset"]
+    task_type: Literal[
+        "initialize_model", "terminate_model", "reset", "pre_encode_video"
+    ]
     # task: Union[InitModelIntercom, None]
     task: Union[InitModelIntercom, Any]
     uuid: str
@@ -24,10 +26,10 @@ class Intercom(BaseModel):
     class Config:
         from_attributes = True
 
-    # if task_type == "initialize_model" check task is InitModelIntercom
+    # if task_type == "initialize_model" or "pre_encode_video" check task is InitModelIntercom
     @model_validator(mode="after")
     def _validate_task(self) -> Self:
-        if self.task_type == "initialize_model":
+        if self.task_type in ("initialize_model", "pre_encode_video"):
             if not isinstance(self.task, InitModelIntercom):
                 raise ValueError("Task should be an InitModelIntercom object")
         return self
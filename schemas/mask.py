@@ -1,11 +1,14 @@
 from pydantic import BaseModel
-from typing import List, Union, Tuple, Any
+from typing import List, Union, Tuple, Any, Optional
 
 
 class Mask(BaseModel):
-    mask_type: str = "base64"  # mask type
+    mask_type: str = "base64"  # mask type -> mask (png), rle, bitmask
     id: Union[str, int]  # object id str uuid
-    mask: str  # base64 encoded mask
+    # base64 encoded png | coco rle counts | base64 encoded packed bits,
+    # png and packed bits are raw bytes with the binary wire format
+    mask: Union[str, bytes]
+    size: Optional[List[int]] = None  # [height, width] for rle and bitmask
 
     class Config:
         from_attributes = True
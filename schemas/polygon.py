@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, Union, List
+from pydantic import BaseModel, ValidationInfo, field_validator
+from typing import Literal, Optional, Union, List
 
 
 class PolygonCoordinate(BaseModel):
@@ -14,8 +14,11 @@ class PolygonObject(BaseModel):
     id: Optional[Union[str, int]] = None  # unique identifier of the object
     label: Optional[str] = None  # label of the object
     objectColor: Optional[str] = None  # HEX color of the object
-    coordinates: List[List[Union[int, float]]] = []
+    # points -> [[x, y], ...], flat -> [x0, y0, x1, y1, ...], delta -> [x0, y0, dx1, dy1, ...]
+    encoding: Literal["points", "flat", "delta"] = "points"
+    coordinates: Union[List[List[Union[int, float]]], List[int]] = []
     normalized: bool = False
+    size: Optional[List[int]] = None  # [height, width] for flat and delta pixel coordinates
 
     class Config:
         from_attributes = True
@@ -23,7 +26,11 @@ class PolygonObject(BaseModel):
     # validate coordinates that list of list objects has 2 elements
     @field_validator("coordinates", mode="after")
     @classmethod
-    def _validate_coordinates(cls, v):
+    def _validate_coordinates(cls, v, info: ValidationInfo):
+        if info.data.get("encoding", "points") != "points":
+            if len(v) % 2 != 0:
+                raise ValueError("Flat coordinates should have an even number of elements")
+            return v
         for i in v:
             if len(i) != 2:
                 raise ValueError(
@@ -38,3 +45,14 @@ class PolygonCover(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class PolygonOptions(BaseModel):
+    # polygon conversion options, read from the `polygon` request meta
+    epsilon: float = 0.0  # Douglas-Peucker tolerance in pixels, 0 disables simplification
+    minArea: float = 0.0  # contours below this area in pixels are dropped
+    externalOnly: bool = False  # outer contours only, no holes
+    encoding: Literal["points", "flat", "delta"] = "points"
+
+    class Config:
+        from_attributes = True
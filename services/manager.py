@@ -12,6 +12,8 @@ import schemas
 from core import BaseService
 from db import RedisClient
 
+from .worker_pool import WorkerPool
+
 
 class Manager(BaseService):
     def __init__(self, src_settings, logger, test: bool = False) -> None:
@@ -33,12 +35,22 @@ class Manager(BaseService):
             enums.Task.INIT_MODEL.value: queue.Queue(),
             enums.Task.TERMINATE_MODEL.value: queue.Queue(),
             enums.Task.RESET.value: queue.Queue(),
+            enums.Task.PRE_ENCODE_VIDEO.value: queue.Queue(),
         }
 
         self.processes: Dict[str, sp.Popen] = dict()
 
         self.process_lock = threading.Lock()
 
+        self.pool: Optional[WorkerPool] = None
+        if self.settings.WORKER_POOL_ENABLED:
+            self.pool = WorkerPool(
+                src_settings=self.settings,
+                redis_client=RedisClient(config=self.settings),
+                logger=self.log,
+                test=self.test,
+            )
+
         self.__init_additional_threads()
 
     def __init_additional_threads(self) -> None:
@@ -47,6 +59,18 @@ class Manager(BaseService):
         )
         self.add_thread(target=self.process_starter_thread_fn, name="ProcessStarter")
         self.add_thread(target=self.stop_worker_thread_fn, name="StopWorker")
+        self.add_thread(
+            target=self.pre_encode_starter_thread_fn, name="PreEncodeStarter"
+        )
+        if self.pool is not None:
+            self.add_thread(
+                target=self.worker_pool_thread_fn, name="WorkerPoolMaintainer"
+            )
+
+    def stop(self):
+        super().stop()
+        if self.pool is not None:
+            self.pool.shutdown()
 
     def get_manager_messages(self) -> Optional[schemas.Intercom]:
         """Consumes a message from task-manager stream from redis
@@ -98,7 +122,19 @@ class Manager(BaseService):
             msg (schemas.Intercom): Message retrieved from the task-manager stream
         """
         self.redis.set(f"task:{msg.uuid}:status", enums.TaskStatus.STARTING.value)
+        # used by the worker to report time-to-ready
+        self.redis.set(f"task:{msg.uuid}:requested_at", str(time.time()))
         try:
+            # set the process (task) configuration to redis
+            #   this is used by the worker to get the configuration
+            self.redis.set(f"task:{msg.uuid}:config", msg.model_dump_json())
+            if self.pool is not None:
+                member = self.pool.acquire(msg.task.ai_model, msg.uuid)
+                if member is not None:
+                    self.log.debug(
+                        f"Task {msg.uuid} handed over to pooled worker {member.member_id}"
+                    )
+                    return
             with self.process_lock:
                 self.log.debug("Starting model initialization process")
                 if not self.test:
@@ -110,9 +146,6 @@ class Manager(BaseService):
                             msg.uuid,
                         ]
                     )
-            # set the process (task) configuration to redis
-            #   this is used by the worker to get the configuration
-            self.redis.set(f"task:{msg.uuid}:config", msg.model_dump_json())
         except Exception as e:
             self.log.error(f"Error starting process: {e}")
             self.redis.set(f"task:{msg.uuid}:status", enums.TaskStatus.FAILED.value)
@@ -128,6 +161,61 @@ class Manager(BaseService):
             except queue.Empty:
                 pass
 
+    def count_active_tasks(self) -> int:
+        """Number of running worker processes and tasks served by pooled workers"""
+        with self.process_lock:
+            active = sum(1 for p in self.processes.values() if p.poll() is None)
+        if self.pool is not None:
+            active += sum(len(m.task_uuids) for m in self.pool.members.values())
+        return active
+
+    def pre_encode_starter(self, msg: schemas.Intercom) -> bool:
+        """Starts a background process filling the image feature cache of a video
+        if there is idle capacity. Expected message is a pre_encode_video message
+
+        Args:
+            msg (schemas.Intercom): Message retrieved from the task-manager stream
+
+        Returns:
+            bool: False if the task should wait for idle capacity, True otherwise
+        """
+        if self.count_active_tasks() >= self.settings.PRE_ENCODE_MAX_ACTIVE_TASKS:
+            return False
+        self.redis.set(f"task:{msg.uuid}:status", enums.TaskStatus.STARTING.value)
+        try:
+            self.redis.set(f"task:{msg.uuid}:config", msg.model_dump_json())
+            with self.process_lock:
+                self.log.debug(f"Starting pre-encoding process for {msg.uuid}")
+                if not self.test:
+                    self.processes[msg.uuid] = sp.Popen(
+                        [
+                            f"{sys.executable}",
+                            "./worker.py",
+                            "--uuid",
+                            msg.uuid,
+                            "--pre-encode",
+                        ]
+                    )
+        except Exception as e:
+            self.log.error(f"Error starting pre-encoding process: {e}")
+            self.redis.set(f"task:{msg.uuid}:status", enums.TaskStatus.FAILED.value)
+        return True
+
+    def pre_encode_starter_thread_fn(self) -> None:
+        """Thread function to start pre-encoding processes on idle capacity. Reads from the PRE_ENCODE_VIDEO queue."""
+        pending: List[schemas.Intercom] = []
+        while not self.stop_event.is_set():
+            try:
+                pending.append(
+                    self.action_worker_map[enums.Task.PRE_ENCODE_VIDEO.value].get(
+                        timeout=0.1
+                    )
+                )
+            except queue.Empty:
+                pass
+            if pending and self.pre_encode_starter(pending[0]):
+                pending.pop(0)
+
     def stop_worker(self, uuid: str) -> None:
         """Stops a worker process given the task uuid
 
@@ -138,7 +226,9 @@ class Manager(BaseService):
             None: Only logs the result and updates the task status in redis
         """
         try:
-            if not self.test:
+            if self.pool is not None and self.pool.release(uuid):
+                self.log.info(f"Worker {uuid} released back to the pool")
+            elif not self.test:
                 self.processes[uuid].terminate()
                 self.processes[uuid].wait()
                 self.log.critical(
@@ -165,6 +255,15 @@ class Manager(BaseService):
             except queue.Empty:
                 pass
 
+    def worker_pool_thread_fn(self) -> None:
+        """Thread function to keep the warm worker pool at its configured size"""
+        while not self.stop_event.is_set():
+            try:
+                self.pool.maintain()  # type: ignore
+            except Exception as e:
+                self.log.error(f"Error maintaining worker pool: {e}")
+            time.sleep(1)
+
     def test_stop_worker(self) -> None:
         time.sleep(10)
         while not self.stop_event.is_set():
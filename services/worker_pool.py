@@ -0,0 +1,292 @@
+import sys
+import time
+import uuid
+import threading
+import subprocess as sp
+
+from typing import Optional, List, Dict, Set
+
+import schemas
+from db import RedisClient
+
+POOL_SHUTDOWN_MESSAGE = "__shutdown__"
+
+
+def get_pool_key(ai_model: schemas.AiModel) -> str:
+    return ai_model.checkpoint_path
+
+
+class PoolMember:
+    def __init__(
+        self,
+        member_id: str,
+        ai_model: schemas.AiModel,
+        process: Optional[sp.Popen],
+        max_tasks: int,
+        max_sessions: int = 1,
+    ) -> None:
+        """Warm worker process (worker host) with a preloaded model
+
+        Args:
+            member_id (str): unique id of the pooled process
+            ai_model (schemas.AiModel): model preloaded by the process
+            process (Optional[sp.Popen]): process handle (None in test mode)
+            max_tasks (int): number of tasks served before the process is recycled
+            max_sessions (int, optional): number of tasks served concurrently. Defaults to 1.
+        """
+        self.member_id = member_id
+        self.ai_model = ai_model
+        self.process = process
+        self.max_tasks = max_tasks
+        self.max_sessions = max_sessions
+        self.task_uuids: Set[str] = set()
+        # models loaded by the process, other models are loaded on first use
+        self.pool_keys: Set[str] = {get_pool_key(ai_model)}
+        self.served_tasks: int = 0
+        self.idle_since: float = time.time()
+
+    @property
+    def pool_key(self) -> str:
+        return get_pool_key(self.ai_model)
+
+    @property
+    def assign_key(self) -> str:
+        return f"pool:{self.member_id}:assign"
+
+    @property
+    def release_key(self) -> str:
+        return f"pool:{self.member_id}:release"
+
+    @property
+    def is_recycled(self) -> bool:
+        # recycled members exit by themselves after their last task
+        return self.served_tasks + len(self.task_uuids) >= self.max_tasks
+
+    @property
+    def is_idle(self) -> bool:
+        return not self.task_uuids and not self.is_recycled
+
+    @property
+    def has_capacity(self) -> bool:
+        return len(self.task_uuids) < self.max_sessions and not self.is_recycled
+
+    def is_alive(self) -> bool:
+        return self.process is None or self.process.poll() is None
+
+
+class WorkerPool:
+    def __init__(self, src_settings, redis_client: RedisClient, logger, test: bool = False) -> None:
+        """Keeps warm worker processes per model checkpoint. Each member builds its model
+        once and serves up to WORKER_HOST_MAX_SESSIONS tasks at a time on the same
+        model weights until it is recycled.
+
+        Args:
+            src_settings (Settings): General settings
+            redis_client (RedisClient): redis connection used to hand over tasks
+            logger (CustomLogger): Logger object to log messages
+            test (bool, optional): If true, processes are not spawned. Defaults to False.
+        """
+        self.settings = src_settings
+        self.redis = redis_client
+        self.log = logger
+        self.test = test
+
+        self.members: Dict[str, PoolMember] = dict()
+        # models seen by the manager -> pool key to model
+        self.models: Dict[str, schemas.AiModel] = dict()
+        self.lock = threading.Lock()
+
+        for checkpoint_path, config_path in self.settings.WORKER_POOL_PRELOAD_MODELS.items():
+            self.register_model(
+                schemas.AiModel(
+                    ai_model_id=-1,
+                    ai_model_name=checkpoint_path,
+                    checkpoint_path=checkpoint_path,
+                    config_path=config_path,
+                )
+            )
+
+    @property
+    def max_size(self) -> int:
+        return self.settings.WORKER_POOL_MAX_SIZE
+
+    @property
+    def max_tasks_per_member(self) -> int:
+        return self.settings.WORKER_POOL_MAX_TASKS_PER_WORKER
+
+    @property
+    def max_sessions_per_member(self) -> int:
+        return max(self.settings.WORKER_HOST_MAX_SESSIONS, 1)
+
+    def min_idle(self, pool_key: str) -> int:
+        return self.settings.WORKER_POOL_MIN_IDLE_PER_MODEL.get(
+            pool_key, self.settings.WORKER_POOL_MIN_IDLE
+        )
+
+    def register_model(self, ai_model: schemas.AiModel) -> None:
+        self.models.setdefault(get_pool_key(ai_model), ai_model)
+
+    def get_idle_members(self, pool_key: Optional[str] = None) -> List[PoolMember]:
+        return [
+            member
+            for member in self.members.values()
+            if member.is_idle and (pool_key is None or member.pool_key == pool_key)
+        ]
+
+    def get_available_members(self, pool_key: Optional[str] = None) -> List[PoolMember]:
+        return [
+            member
+            for member in self.members.values()
+            if member.has_capacity
+            and member.is_alive()
+            and (pool_key is None or pool_key in member.pool_keys)
+        ]
+
+    def spawn(self, ai_model: schemas.AiModel) -> Optional[PoolMember]:
+        """Starts a new warm worker process for the given model
+
+        Args:
+            ai_model (schemas.AiModel): model to be preloaded
+
+        Returns:
+            Optional[PoolMember]: spawned member, None if pool is full
+        """
+        if len(self.members) >= self.max_size:
+            return None
+        member_id = uuid.uuid4().hex
+        process = None
+        if not self.test:
+            process = sp.Popen(
+                [
+                    f"{sys.executable}",
+                    "./worker.py",
+                    "--pool-member",
+                    member_id,
+                    "--checkpoint-path",
+                    ai_model.checkpoint_path,
+                    "--config-path",
+                    ai_model.config_path,
+                    "--max-tasks",
+                    str(self.max_tasks_per_member),
+                    "--max-sessions",
+                    str(self.max_sessions_per_member),
+                ]
+            )
+        member = PoolMember(
+            member_id=member_id,
+            ai_model=ai_model,
+            process=process,
+            max_tasks=self.max_tasks_per_member,
+            max_sessions=self.max_sessions_per_member,
+        )
+        self.members[member_id] = member
+        self.log.info(f"Spawned pooled worker {member_id} for {member.pool_key}")
+        return member
+
+    def acquire(self, ai_model: schemas.AiModel, task_uuid: str) -> Optional[PoolMember]:
+        """Hands the task over to a warm worker with free capacity. Workers that already
+        loaded the requested model are preferred over workers that need to load it.
+
+        Args:
+            ai_model (schemas.AiModel): model requested by the task
+            task_uuid (str): task uuid
+
+        Returns:
+            Optional[PoolMember]: member serving the task, None if no member has capacity
+        """
+        pool_key = get_pool_key(ai_model)
+        with self.lock:
+            self.register_model(ai_model)
+            candidates = self.get_available_members(pool_key)
+            if not candidates and self.max_sessions_per_member > 1:
+                candidates = self.get_available_members()
+            if not candidates:
+                return None
+            # pack sessions into busy hosts, then prefer the most recently used member
+            # so older idle members are evicted first
+            member = max(candidates, key=lambda m: (len(m.task_uuids), m.idle_since))
+            member.task_uuids.add(task_uuid)
+            member.pool_keys.add(pool_key)
+            self.redis.queue(member.assign_key, task_uuid)
+            return member
+
+    def release(self, task_uuid: str) -> bool:
+        """Sends the worker serving the task back to the pool
+
+        Args:
+            task_uuid (str): task uuid
+
+        Returns:
+            bool: True if the task was served by a pooled worker
+        """
+        with self.lock:
+            for member in self.members.values():
+                if task_uuid in member.task_uuids:
+                    self.redis.queue(member.release_key, task_uuid)
+                    member.task_uuids.discard(task_uuid)
+                    member.served_tasks += 1
+                    if not member.task_uuids:
+                        member.idle_since = time.time()
+                    if member.is_recycled and not member.task_uuids:
+                        # process exits by itself after the last task, reaped on maintain
+                        self.log.info(f"Pooled worker {member.member_id} will be recycled")
+                    return True
+            return False
+
+    def detach_member(self, member: PoolMember) -> None:
+        """Takes the member out of the pool and asks its process to exit, must be called
+        with the lock held. The process is waited for by `stop_member` without the lock.
+        """
+        self.members.pop(member.member_id, None)
+        self.redis.queue(member.assign_key, POOL_SHUTDOWN_MESSAGE)
+
+    @staticmethod
+    def stop_member(member: PoolMember) -> None:
+        if member.process is not None:
+            try:
+                member.process.wait(timeout=10)
+            except sp.TimeoutExpired:
+                member.process.terminate()
+                member.process.wait()
+
+    def maintain(self) -> None:
+        """Reaps exited members, evicts long idle members and keeps per-model minimums"""
+        evicted: List[PoolMember] = []
+        with self.lock:
+            for member in list(self.members.values()):
+                recycled = member.is_recycled and not member.task_uuids
+                if not member.is_alive() or (member.process is None and recycled):
+                    self.log.info(f"Pooled worker {member.member_id} exited")
+                    self.members.pop(member.member_id, None)
+
+            now = time.time()
+            for pool_key in {member.pool_key for member in self.members.values()}:
+                idle_members = sorted(
+                    self.get_idle_members(pool_key), key=lambda m: m.idle_since
+                )
+                excess = len(idle_members) - self.min_idle(pool_key)
+                for member in idle_members[: max(excess, 0)]:
+                    if now - member.idle_since > self.settings.WORKER_POOL_IDLE_TIMEOUT:
+                        self.log.info(f"Evicting idle pooled worker {member.member_id}")
+                        self.detach_member(member)
+                        evicted.append(member)
+
+            for pool_key, ai_model in self.models.items():
+                missing = self.min_idle(pool_key) - len(
+                    self.get_available_members(pool_key)
+                )
+                for _ in range(max(missing, 0)):
+                    if self.spawn(ai_model) is None:
+                        break
+
+        # acquire and release are not blocked while evicted processes exit
+        for member in evicted:
+            self.stop_member(member)
+
+    def shutdown(self) -> None:
+        with self.lock:
+            members = list(self.members.values())
+            for member in members:
+                self.detach_member(member)
+        for member in members:
+            self.stop_member(member)
@@ -2,7 +2,7 @@ import os
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from typing import Optional, Dict, List, Literal
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,97 @@ class Settings(BaseSettings):
     MANAGER_QUEUE_NAME: str = str(os.environ.get("MANAGER_QUEUE_NAME"))
     MANAGER_STREAM_NAME: str
 
+    # max number of decoded frames kept in memory per session
+    FRAME_WINDOW_SIZE: int = int(os.environ.get("FRAME_WINDOW_SIZE", 64))
+    # number of frames decoded ahead of the prompt/propagation cursor
+    FRAME_READ_AHEAD: int = int(os.environ.get("FRAME_READ_AHEAD", 8))
+
+    # size bound of the decoded original frames cache per session
+    FRAME_CACHE_MAX_BYTES: int = int(os.environ.get("FRAME_CACHE_MAX_BYTES", 256 * 1024**2))
+    # size bound of the rendered overlay (frame response) cache per session
+    OVERLAY_CACHE_MAX_BYTES: int = int(os.environ.get("OVERLAY_CACHE_MAX_BYTES", 64 * 1024**2))
+
+    # warm worker pool (workers with preloaded models)
+    WORKER_POOL_ENABLED: bool = False
+    # max number of pooled worker processes (idle + busy)
+    WORKER_POOL_MAX_SIZE: int = 4
+    # min idle workers kept per model once the model is known
+    WORKER_POOL_MIN_IDLE: int = 1
+    # checkpoint_path -> min idle workers, overrides WORKER_POOL_MIN_IDLE
+    WORKER_POOL_MIN_IDLE_PER_MODEL: Dict[str, int] = dict()
+    # checkpoint_path -> config_path of the models warmed up on startup
+    WORKER_POOL_PRELOAD_MODELS: Dict[str, str] = dict()
+    # idle workers above the minimum are stopped after this many seconds
+    WORKER_POOL_IDLE_TIMEOUT: int = 600
+    # pooled worker process is recycled after serving this many tasks
+    WORKER_POOL_MAX_TASKS_PER_WORKER: int = 20
+    # number of tasks served concurrently by one pooled worker (worker host),
+    #   sessions of a host share the model weights
+    WORKER_HOST_MAX_SESSIONS: int = 1
+
+    # on-disk image feature cache, disabled if not set
+    FEATURE_CACHE_DIRECTORY: Optional[str] = os.environ.get("FEATURE_CACHE_DIRECTORY")
+    FEATURE_CACHE_MAX_BYTES: int = int(
+        os.environ.get("FEATURE_CACHE_MAX_BYTES", 50 * 1024**3)
+    )
+
+    # threads post-processing propagated frames while the model computes the next ones
+    PROPAGATION_POST_PROCESS_WORKERS: int = 4
+    # max number of propagated frames waiting for post-processing
+    PROPAGATION_MAX_IN_FLIGHT: int = 8
+    # stop running propagation when a point prompt arrives (overridden by preemptOnPrompt meta)
+    PROPAGATION_PREEMPT_ON_PROMPT: bool = False
+    # delta mode (overridden by delta request meta): frames carry only objects whose IoU
+    #   with the last sent mask dropped below the threshold or whose bbox moved more
+    #   pixels, plus appeared/disappeared events and a full keyframe every n frames
+    PROPAGATION_DELTA: bool = False
+    PROPAGATION_DELTA_IOU_THRESHOLD: float = 0.95
+    PROPAGATION_DELTA_PIXEL_THRESHOLD: Optional[float] = 2.0
+    PROPAGATION_DELTA_KEYFRAME_INTERVAL: int = 30
+    # geometry exported by the annotator during propagation, full resolution masks are
+    #   copied to the host only for polygons
+    ANNOTATION_EXPORT_TYPE: Literal["bbox", "polygon", "all"] = "all"
+    # max number of frame annotations written to redis in one pipelined batch
+    ANNOTATION_WRITE_BATCH_SIZE: int = 32
+    # store bboxes as per-object keyframe tracks, frames between keyframes are linearly
+    #   interpolated within the tolerance (normalized coordinates) and expanded on export
+    ANNOTATION_TRACK_COMPRESSION: bool = False
+    ANNOTATION_TRACK_TOLERANCE: float = 0.002
+    ANNOTATION_TRACK_MAX_SPAN: int = 256
+    # polygon defaults for responses and annotations (overridden by polygon request meta):
+    #   Douglas-Peucker tolerance and min contour area in pixels, outer contours only,
+    #   coordinates as normalized points or flat / delta encoded integer pixels
+    POLYGON_EPSILON: float = 0.0
+    POLYGON_MIN_AREA: float = 0.0
+    POLYGON_EXTERNAL_ONLY: bool = False
+    POLYGON_ENCODING: Literal["points", "flat", "delta"] = "points"
+
+    # seconds a blocking request read (BRPOP) waits before checking for stop
+    REQUEST_BLOCK_TIMEOUT: int = 1
+    # max number of responses waiting in the worker, interactive responses block when full
+    RESPONSE_QUEUE_MAX_SIZE: int = 256
+    # max number of waiting propagation previews, older previews are replaced by newer ones
+    RESPONSE_QUEUE_MAX_PREVIEWS: int = 2
+    # propagation response types treated as previews (annotations are exported separately)
+    RESPONSE_COALESCE_TYPES: List[str] = ["frame"]
+    # previews are not pushed while the redis response list is this long
+    RESPONSE_LIST_MAX_LENGTH: int = 256
+    # expiration of the redis response list, refreshed on every push
+    RESPONSE_LIST_TTL: int = 3600
+    # max number of responses sent to redis in one pipelined flush
+    RESPONSE_PUBLISH_MAX_BATCH: int = 64
+    # publish propagation frames in multi-frame envelopes (overridden by frameEnvelope meta)
+    RESPONSE_FRAME_ENVELOPE: bool = False
+    # an envelope is closed when it reaches either bound
+    RESPONSE_ENVELOPE_MAX_FRAMES: int = 16
+    RESPONSE_ENVELOPE_MAX_BYTES: int = 1024 * 1024
+    # response encoding (overridden by wireFormat meta), "binary" sends jpeg/png/bitmask
+    # payloads as raw bytes after a json header instead of base64 inside the json
+    RESPONSE_WIRE_FORMAT: Literal["json", "binary"] = "json"
+
+    # pre_encode_video tasks wait while more tasks than this are running
+    PRE_ENCODE_MAX_ACTIVE_TASKS: int = 1
+
     class Config:
         env_file = ".env"
 
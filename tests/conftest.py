@@ -0,0 +1,8 @@
+import os
+import sys
+
+# modules are imported from the repository root like the services do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# required by `settings`, tests do not connect to the manager
+os.environ.setdefault("MANAGER_STREAM_NAME", "test")
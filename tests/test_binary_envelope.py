@@ -0,0 +1,91 @@
+import base64
+import json
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+import schemas  # noqa: E402
+from utils.binary_envelope import (  # noqa: E402
+    decode_binary_message,
+    encode_binary_envelope,
+    encode_binary_message,
+    is_binary_message,
+)
+
+JPEG = b"\xff\xd8\xff\xe0jpeg bytes\x00\xff"
+PNG = b"\x89PNG\r\n\x1a\nmask bytes"
+BITS = bytes(range(256))
+
+
+def frame_response(frame_number, image, masks=(), thumbnails=None):
+    return schemas.SingleFrameResponseCover.model_construct(
+        msg_type="frame",
+        data=schemas.FrameCover.model_construct(
+            frame_number=frame_number, image_base64=image, objects=[]
+        ),
+        error=None,
+        meta={"objectThumbnails": thumbnails or {}, "frameNumber": frame_number},
+        message=None,
+    )
+
+
+def mask_response(masks):
+    return schemas.SingleFrameResponseCover.model_construct(
+        msg_type="mask",
+        data=schemas.MaskCover.model_construct(frame_number=0, masks=list(masks)),
+        error=None,
+        meta={},
+        message=None,
+    )
+
+
+def test_raw_bytes_round_trip():
+    response = frame_response(3, JPEG, thumbnails={"a": JPEG, "b": PNG})
+    message = encode_binary_message(response.model_dump())
+
+    assert is_binary_message(message)
+    decoded = decode_binary_message(message)
+    assert decoded["msg_type"] == "frame"
+    assert decoded["data"]["image_base64"] == JPEG
+    assert decoded["meta"]["objectThumbnails"] == {"a": JPEG, "b": PNG}
+    assert decoded["meta"]["frameNumber"] == 3
+
+
+def test_base64_payloads_become_raw_segments():
+    raw = frame_response(0, JPEG).model_dump()
+    b64 = frame_response(0, base64.b64encode(JPEG).decode("utf-8")).model_dump()
+    assert encode_binary_message(raw) == encode_binary_message(b64)
+
+
+def test_masks_round_trip_by_mask_type():
+    masks = [
+        schemas.Mask.model_construct(id="a", mask=PNG, mask_type="mask", size=None),
+        schemas.Mask.model_construct(id="b", mask=BITS, mask_type="bitmask", size=[32, 64]),
+        # rle counts are text and stay in the json header
+        schemas.Mask.model_construct(id="c", mask="0a1b", mask_type="rle", size=[4, 4]),
+    ]
+    decoded = decode_binary_message(encode_binary_message(mask_response(masks).model_dump()))
+
+    assert [m["mask"] for m in decoded["data"]["masks"]] == [PNG, BITS, "0a1b"]
+    assert decoded["data"]["masks"][1]["size"] == [32, 64]
+
+
+def test_envelope_round_trip():
+    responses = [frame_response(i, JPEG + bytes([i]), thumbnails={"a": PNG}) for i in range(3)]
+    envelope = encode_binary_envelope([encode_binary_message(r.model_dump()) for r in responses])
+
+    decoded = decode_binary_message(envelope)
+    assert decoded["msg_type"] == "frames"
+    assert decoded["meta"]["count"] == 3
+    for i, frame in enumerate(decoded["data"]):
+        assert frame["data"]["frame_number"] == i
+        assert frame["data"]["image_base64"] == JPEG + bytes([i])
+        assert frame["meta"]["objectThumbnails"]["a"] == PNG
+
+
+def test_json_message_is_not_binary():
+    message = json.dumps({"msg_type": "frame"}).encode("utf-8")
+    assert not is_binary_message(message)
+    with pytest.raises(ValueError):
+        decode_binary_message(message)
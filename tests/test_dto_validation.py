@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+import schemas  # noqa: E402
+from utils.dto_validation import validate_request  # noqa: E402
+from utils.fast_serialization import peek_msg_type  # noqa: E402
+
+
+def test_peek_msg_type():
+    assert peek_msg_type(b'{"data":[1,2],"msg_type":"cancel"}') == "cancel"
+    assert peek_msg_type('{"data":null}') is None
+
+
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_valid_raw_requests_are_accepted(as_bytes):
+    requests = [
+        {"msg_type": "cancel"},
+        {"msg_type": "run_inference", "data": [], "meta": {"startFrame": 3}},
+        {"msg_type": "get_frame", "data": [], "meta": {"frameNumber": 0}},
+    ]
+    for request in requests:
+        raw = json.dumps(request)
+        validated, ok = validate_request(raw.encode("utf-8") if as_bytes else raw)
+        assert ok, validated.message
+        assert validated.msg_type == request["msg_type"]
+    validated, ok = validate_request(b'{"msg_type":"run_inference","data":[]}')
+    assert isinstance(validated, schemas.RunInferenceInputCover)
+
+
+def test_parsed_and_raw_requests_agree():
+    request = {"msg_type": "remove_object", "data": ["a", "b"]}
+    raw, ok_raw = validate_request(json.dumps(request).encode("utf-8"))
+    parsed, ok_parsed = validate_request(request)
+    assert ok_raw and ok_parsed
+    assert raw == parsed
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b'{"data":[]}',
+        b'{"msg_type":"unknown"}',
+        b'{"msg_type":"run_inference","meta":{"startFrame":-1}}',
+        b'{"msg_type":"remove_object","data":"not a list"}',
+        b"not json",
+    ],
+)
+def test_invalid_raw_requests_are_rejected(raw):
+    validated, ok = validate_request(raw)
+    assert not ok
+    assert isinstance(validated, schemas.ErrorResponseCover)
@@ -0,0 +1,85 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from utils.image_processing import hex_to_rgb, draw_masks_on_image
+
+# the label map blend `(pixel + color) >> 1` equals the truncated float blend
+# `0.5 * pixel + 0.5 * color`, one level is allowed for rounding
+TOLERANCE = 1
+
+
+def draw_masks_on_image_float(src_image, masks, color):
+    """Previous renderer: one full-frame float32 blend per object"""
+    alpha = 0.5
+    for obj_id, mask in masks.items():
+        obj_color = np.array(hex_to_rgb(color[obj_id]), dtype=np.uint8)
+        overlay = np.zeros_like(src_image)
+        overlay[mask] = obj_color
+        blended = src_image.copy().astype(np.float32)
+        overlay = overlay.astype(np.float32)
+        blended[mask] = (1 - alpha) * blended[mask] + alpha * overlay[mask]
+        src_image = blended.astype(np.uint8)
+    return src_image
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (64, 96, 3), dtype=np.uint8)
+
+
+def make_mask(shape, top, left, bottom, right):
+    mask = np.zeros(shape, dtype=bool)
+    mask[top:bottom, left:right] = True
+    return mask
+
+
+def test_matches_float_renderer_without_overlaps(image):
+    masks = {
+        "a": make_mask(image.shape[:2], 0, 0, 20, 30),
+        "b": make_mask(image.shape[:2], 30, 40, 60, 90),
+        "c": np.random.default_rng(1).random(image.shape[:2]) > 0.9,
+    }
+    masks["c"] &= ~(masks["a"] | masks["b"])
+    colors = {"a": "#FF0000", "b": "#00FF80", "c": "#123456"}
+
+    expected = draw_masks_on_image_float(image, masks, colors)
+    rendered = draw_masks_on_image(image, masks, colors)
+
+    diff = np.abs(expected.astype(np.int16) - rendered.astype(np.int16))
+    assert diff.max() <= TOLERANCE
+
+
+def test_overlapping_masks_are_blended_in_object_order(image):
+    masks = {
+        "a": make_mask(image.shape[:2], 0, 0, 40, 60),
+        "b": make_mask(image.shape[:2], 20, 30, 64, 96),
+        "c": make_mask(image.shape[:2], 10, 50, 50, 80),
+    }
+    colors = {"a": "#FF0000", "b": "#0000FF", "c": "#33CC66"}
+    rendered = draw_masks_on_image(image, masks, colors)
+    reference = draw_masks_on_image_float(image, masks, colors)
+
+    diff = np.abs(reference.astype(np.int16) - rendered.astype(np.int16))
+    assert diff.max() <= TOLERANCE
+    all_three = masks["a"] & masks["b"] & masks["c"]
+    assert all_three.any()
+    assert np.abs(reference[all_three].astype(np.int16) - rendered[all_three]).max() <= TOLERANCE
+
+    # order matters where objects overlap
+    reordered = draw_masks_on_image(image, dict(reversed(list(masks.items()))), colors)
+    assert not np.array_equal(reordered[all_three], rendered[all_three])
+
+
+def test_source_image_is_not_modified(image):
+    source = image.copy()
+    draw_masks_on_image(image, {"a": make_mask(image.shape[:2], 0, 0, 10, 10)}, {"a": "#FFFFFF"})
+    assert np.array_equal(image, source)
+
+
+def test_without_masks_returns_copy(image):
+    rendered = draw_masks_on_image(image, {}, {})
+    assert np.array_equal(rendered, image)
+    assert rendered is not image
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.lru_cache import LRUCache  # noqa: E402
+
+
+def test_least_recently_used_is_evicted_first():
+    cache = LRUCache(max_bytes=3, sizeof=lambda value: 1)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"  # a becomes the most recently used
+    cache.put("d", "D")
+
+    assert "b" not in cache
+    assert [key for key in "acd" if key in cache] == ["a", "c", "d"]
+    assert cache.evictions == 1
+
+
+def test_eviction_is_bound_by_bytes():
+    cache = LRUCache(max_bytes=100)
+    cache.put("a", np.zeros(40, dtype=np.uint8))
+    cache.put("b", np.zeros(40, dtype=np.uint8))
+    cache.put("c", np.zeros(50, dtype=np.uint8))
+
+    # one large value evicts as many old values as needed
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.size == 90
+
+    cache.put("d", np.zeros(100, dtype=np.uint8))
+    assert len(cache) == 1 and cache.size == 100
+    assert cache.evictions == 3
+
+
+def test_oversize_value_is_not_cached_and_keeps_the_cache():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", b"12345")
+    cache.put("big", b"x" * 11)
+
+    assert "big" not in cache
+    assert cache.get("a") == b"12345"
+    assert cache.evictions == 0
+
+
+def test_replacing_a_key_updates_its_size():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", b"12345")
+    cache.put("a", b"12")
+    assert cache.size == 2 and len(cache) == 1
+
+    # an oversize replacement drops the old value
+    cache.put("a", b"x" * 11)
+    assert "a" not in cache and cache.size == 0
+
+
+def test_pop_clear_and_stats():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", b"123")
+    cache.put("b", b"45")
+    assert cache.get("missing") is None
+    assert cache.pop("a") == b"123"
+    assert cache.pop("a") is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "evictions": 0, "items": 1, "bytes": 2}
+
+    cache.clear()
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_get_or_load():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return b"value"
+
+    assert cache.get_or_load("a", loader) == b"value"
+    assert cache.get_or_load("a", loader) == b"value"
+    assert len(calls) == 1
+    # failed loads are not cached
+    assert cache.get_or_load("b", lambda: None) is None
+    assert "b" not in cache
+
+
+def test_concurrent_puts_keep_the_bound():
+    cache = LRUCache(max_bytes=50, sizeof=len)
+
+    def put_many(offset):
+        for i in range(200):
+            cache.put(offset + i, b"x" * (i % 7 + 1))
+
+    threads = [threading.Thread(target=put_many, args=(n * 1000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.size <= 50
+    assert cache.size == sum(len(cache.get(key)) for key in list(cache._items))
@@ -0,0 +1,103 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+mask_delta = pytest.importorskip("ai_module.mask_delta")
+
+from ai_module.mask_output import MaskOutput  # noqa: E402
+
+MaskDeltaTracker = mask_delta.MaskDeltaTracker
+
+H, W = 64, 64
+
+
+def frame(*boxes):
+    """Masks of one frame, a box is (x0, y0, x1, y1) or None for an empty mask"""
+    masks = torch.zeros((len(boxes), H, W), dtype=torch.bool)
+    for k, box in enumerate(boxes):
+        if box is not None:
+            x0, y0, x1, y1 = box
+            masks[k, y0:y1, x0:x1] = True
+    return MaskOutput(masks)
+
+
+def box(x, y, size=20):
+    return (x, y, x + size, y + size)
+
+
+def test_first_frame_is_a_keyframe():
+    tracker = MaskDeltaTracker(keyframe_interval=30)
+    delta = tracker.update(0, ["a", "b"], frame(box(0, 0), box(30, 30)))
+    assert delta.keyframe
+    assert delta.changed == [0, 1]
+    assert delta.appeared == ["a", "b"]
+
+
+def test_static_objects_are_not_sent():
+    tracker = MaskDeltaTracker(keyframe_interval=30)
+    tracker.update(0, ["a"], frame(box(5, 5)))
+    delta = tracker.update(1, ["a"], frame(box(5, 5)))
+    assert not delta.keyframe
+    assert delta.changed == []
+    assert delta.appeared == [] and delta.disappeared == []
+
+
+def test_non_consecutive_frame_forces_a_keyframe():
+    tracker = MaskDeltaTracker(keyframe_interval=30)
+    tracker.update(0, ["a"], frame(box(5, 5)))
+    tracker.update(1, ["a"], frame(box(5, 5)))
+    delta = tracker.update(5, ["a"], frame(box(5, 5)))
+    assert delta.keyframe
+    assert delta.changed == [0]
+    # reverse propagation follows the previous frame too
+    assert not tracker.update(4, ["a"], frame(box(5, 5))).keyframe
+
+
+def test_keyframe_interval():
+    tracker = MaskDeltaTracker(keyframe_interval=3)
+    keyframes = [tracker.update(i, ["a"], frame(box(5, 5))).keyframe for i in range(7)]
+    assert keyframes == [True, False, False, True, False, False, True]
+
+
+def test_slow_drift_is_sent_once_it_crosses_the_threshold():
+    tracker = MaskDeltaTracker(iou_threshold=0.0, pixel_threshold=2.0, keyframe_interval=100)
+    tracker.update(0, ["a"], frame(box(10, 10)))
+    sent = []
+    for i in range(1, 8):
+        # one pixel per frame, below the threshold frame to frame
+        delta = tracker.update(i, ["a"], frame(box(10 + i, 10)))
+        sent.append(delta.changed == [0])
+    # compared with the last sent mask: 3 px at frame 3, then 3 px again at frame 6
+    assert sent == [False, False, True, False, False, True, False]
+
+
+def test_iou_threshold():
+    tracker = MaskDeltaTracker(iou_threshold=0.9, pixel_threshold=None, keyframe_interval=100)
+    tracker.update(0, ["a"], frame(box(10, 10)))
+    # 1 of 20 columns moves, IoU 19/21
+    assert tracker.update(1, ["a"], frame(box(11, 10))).changed == []
+    # 2 more columns since the last sent mask, IoU 17/23
+    assert tracker.update(2, ["a"], frame(box(13, 10))).changed == [0]
+
+
+def test_disappeared_and_reappeared():
+    tracker = MaskDeltaTracker(keyframe_interval=100)
+    tracker.update(0, ["a", "b"], frame(box(0, 0), box(30, 30)))
+
+    delta = tracker.update(1, ["a", "b"], frame(box(0, 0), None))
+    assert delta.disappeared == ["b"]
+    assert delta.appeared == [] and delta.changed == []
+
+    # still gone, reported once
+    delta = tracker.update(2, ["a", "b"], frame(box(0, 0), None))
+    assert delta.disappeared == []
+
+    delta = tracker.update(3, ["a", "b"], frame(box(0, 0), box(30, 30)))
+    assert delta.appeared == ["b"]
+    assert delta.changed == [1]
+    assert delta.meta() == {
+        "delta": True,
+        "keyframe": False,
+        "appeared": ["b"],
+        "disappeared": [],
+    }
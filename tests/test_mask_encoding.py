@@ -0,0 +1,93 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.mask_encoding import (  # noqa: E402
+    bitmask_to_mask,
+    mask_to_bitmask,
+    mask_to_rle,
+    mask_to_rle_counts,
+    rle_string_to_counts,
+    rle_to_mask,
+)
+
+
+def box_mask(h, w, y0, y1, x0, x1):
+    mask = np.zeros((h, w), dtype=bool)
+    mask[y0:y1, x0:x1] = True
+    return mask
+
+
+def hole_mask():
+    mask = box_mask(40, 50, 5, 35, 10, 45)
+    mask[20:25, 20:30] = False
+    return mask
+
+
+def corner_mask():
+    mask = np.zeros((6, 7), dtype=bool)
+    mask[0, 0] = mask[5, 6] = True
+    mask[2:5, 3] = True
+    return mask
+
+
+# counts produced by pycocotools.mask.encode for the same masks
+KNOWN_RLE = [
+    (lambda: box_mask(4, 5, 1, 3, 1, 4), "5220003"),
+    (corner_mask, "01c02ON"),
+    (
+        hole_mask,
+        "e<n0:000000000000000000AKK55KK55KK55KK55KK55KK55KK55KK55KK55KK5"
+        "d00000000000000000000000000000S6",
+    ),
+    (lambda: np.zeros((3, 3), dtype=bool), "9"),
+    (lambda: np.ones((3, 3), dtype=bool), "09"),
+    (lambda: np.ones((1080, 1920), dtype=bool), "0PPYo1"),
+]
+
+
+@pytest.mark.parametrize("make_mask,counts", KNOWN_RLE)
+def test_rle_matches_pycocotools(make_mask, counts):
+    mask = make_mask()
+    rle = mask_to_rle(mask)
+    assert rle["counts"] == counts
+    assert rle["size"] == list(mask.shape)
+    assert (rle_to_mask({"size": list(mask.shape), "counts": counts}) == mask).all()
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("density", [0.01, 0.5, 0.99])
+def test_rle_round_trip(seed, density):
+    rng = np.random.default_rng(seed)
+    mask = rng.random((rng.integers(1, 64), rng.integers(1, 64))) < density
+    assert (rle_to_mask(mask_to_rle(mask)) == mask).all()
+
+
+def test_rle_round_trip_large_runs():
+    mask = box_mask(1080, 1920, 100, 900, 300, 1500)
+    rle = mask_to_rle(mask)
+    assert rle_string_to_counts(rle["counts"]) == mask_to_rle_counts(mask).tolist()
+    assert (rle_to_mask(rle) == mask).all()
+
+
+@pytest.mark.parametrize("fill", [False, True])
+def test_rle_empty_and_full_masks(fill):
+    mask = np.full((7, 5), fill, dtype=bool)
+    counts = mask_to_rle_counts(mask).tolist()
+    # counts always start with a run of zeros
+    assert counts == ([0, 35] if fill else [35])
+    decoded = rle_to_mask(mask_to_rle(mask))
+    assert decoded.shape == (7, 5)
+    assert (decoded == fill).all()
+
+
+def test_rle_uncompressed_counts():
+    mask = corner_mask()
+    counts = mask_to_rle_counts(mask).tolist()
+    assert (rle_to_mask({"size": [6, 7], "counts": counts}) == mask).all()
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (3, 5), (8, 8), (17, 9)])
+def test_bitmask_round_trip(shape):
+    mask = np.random.default_rng(0).random(shape) < 0.5
+    assert (bitmask_to_mask(mask_to_bitmask(mask), list(shape)) == mask).all()
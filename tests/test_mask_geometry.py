@@ -0,0 +1,44 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.mask_geometry import masks_to_xyxy  # noqa: E402
+
+
+def reference_xyxy(mask):
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        return [0, 0, 0, 0]
+    return [xs.min(), ys.min(), xs.max(), ys.max()]
+
+
+@pytest.fixture
+def masks():
+    rng = np.random.default_rng(0)
+    masks = np.zeros((5, 40, 60), dtype=bool)
+    for mask in masks[:4]:
+        y, x = rng.integers(0, 30), rng.integers(0, 50)
+        mask[y : y + rng.integers(1, 10), x : x + rng.integers(1, 10)] = True
+    masks[3, -1, -1] = True  # touches the bottom right corner
+    return masks  # last mask is empty
+
+
+def test_masks_to_xyxy(masks):
+    expected = np.array([reference_xyxy(mask) for mask in masks])
+    assert (masks_to_xyxy(masks) == expected).all()
+    normalized = expected / np.array([60, 40, 60, 40], dtype=np.float32)
+    assert np.allclose(masks_to_xyxy(masks, normalized=True), normalized)
+
+
+def test_mask_output_uses_the_same_reduction(masks):
+    torch = pytest.importorskip("torch")
+    from ai_module.mask_output import MaskOutput
+
+    output = MaskOutput(torch.from_numpy(masks))
+    assert (output.xyxy() == masks_to_xyxy(masks)).all()
+    assert (output[[1, 4]].xyxy() == masks_to_xyxy(masks[[1, 4]])).all()
+
+
+def test_no_masks():
+    masks = np.zeros((0, 4, 4), dtype=bool)
+    assert masks_to_xyxy(masks).shape == (0, 4)
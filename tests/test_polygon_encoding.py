@@ -0,0 +1,58 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from utils.annotation_processing import (  # noqa: E402
+    decode_polygon,
+    encode_polygon,
+    mask_to_polygons,
+)
+
+POLYGON = np.array([[10, 20], [15, 20], [15, 28], [9, 31], [3, 25]])
+
+
+@pytest.mark.parametrize("encoding", ["points", "flat", "delta"])
+def test_round_trip(encoding):
+    decoded = decode_polygon(encode_polygon(POLYGON, encoding), encoding)
+    assert decoded.shape == POLYGON.shape
+    assert (decoded == POLYGON).all()
+
+
+def test_delta_encoding():
+    assert encode_polygon(POLYGON, "flat") == [10, 20, 15, 20, 15, 28, 9, 31, 3, 25]
+    # first point absolute, then differences to the previous point
+    assert encode_polygon(POLYGON, "delta") == [10, 20, 5, 0, 0, 8, -6, 3, -6, -6]
+
+
+def test_integer_encodings_round_float_points():
+    polygon = np.array([[0.4, 1.6], [2.5, 3.49], [-0.6, 7.0]])
+    expected = np.rint(polygon).astype(np.int64)
+    for encoding in ("flat", "delta"):
+        assert (decode_polygon(encode_polygon(polygon, encoding), encoding) == expected).all()
+
+
+def test_round_trip_of_mask_contours():
+    mask = np.zeros((64, 64), dtype=bool)
+    mask[10:30, 5:40] = True
+    mask[35:60, 20:50] = True
+    mask[40:50, 30:40] = False  # hole
+    polygons = mask_to_polygons(mask)
+    assert len(polygons) == 3
+    for polygon in polygons:
+        encoded = encode_polygon(polygon, "delta")
+        assert all(isinstance(v, int) for v in encoded)
+        assert (decode_polygon(encoded, "delta") == polygon).all()
+
+
+def test_simplification_and_min_area():
+    mask = np.zeros((64, 64), dtype=bool)
+    yy, xx = np.mgrid[:64, :64]
+    mask[(yy - 30) ** 2 + (xx - 30) ** 2 < 20**2] = True
+    mask[60:62, 60:62] = True  # speck
+
+    full = mask_to_polygons(mask)
+    filtered = mask_to_polygons(mask, min_area=10)
+    simplified = mask_to_polygons(mask, epsilon=2.0, min_area=10)
+    assert len(full) == 2 and len(filtered) == 1
+    assert len(simplified) == 1 and len(simplified[0]) < len(filtered[0])
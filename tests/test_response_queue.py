@@ -0,0 +1,178 @@
+import queue
+import threading
+
+import pytest
+
+from core.response_queue import ResponseQueue
+
+
+def preview(i):
+    return ("preview", i)
+
+
+def regular(i):
+    return ("regular", i)
+
+
+def is_preview(item):
+    return item is not None and item[0] == "preview"
+
+
+def drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+def test_fifo_order_of_regular_items():
+    q = ResponseQueue(maxsize=8, is_coalescible=is_preview)
+    for i in range(5):
+        q.put(regular(i))
+    assert drain(q) == [regular(i) for i in range(5)]
+
+
+def test_only_the_newest_previews_are_kept():
+    q = ResponseQueue(maxsize=8, max_coalesced=2, is_coalescible=is_preview)
+    q.put(regular(0))
+    for i in range(5):
+        q.put(preview(i))
+    q.put(regular(1))
+    assert drain(q) == [regular(0), preview(3), preview(4), regular(1)]
+    assert q.dropped == 3
+
+
+def test_previews_make_room_for_regular_items():
+    q = ResponseQueue(maxsize=3, max_coalesced=3, is_coalescible=is_preview)
+    q.put(preview(0))
+    q.put(preview(1))
+    q.put(regular(0))
+    q.put(regular(1), block=False)
+    assert drain(q) == [preview(1), regular(0), regular(1)]
+    assert q.dropped == 1
+
+
+def test_preview_is_dropped_when_full_of_regular_items():
+    q = ResponseQueue(maxsize=2, is_coalescible=is_preview)
+    q.put(regular(0))
+    q.put(regular(1))
+    q.put(preview(0))  # does not block
+    assert q.dropped == 1
+    assert drain(q) == [regular(0), regular(1)]
+
+
+def test_regular_items_block_when_full():
+    q = ResponseQueue(maxsize=1, is_coalescible=is_preview)
+    q.put(regular(0))
+    with pytest.raises(queue.Full):
+        q.put_nowait(regular(1))
+    with pytest.raises(queue.Full):
+        q.put(regular(1), timeout=0.01)
+
+    # unblocked by a get
+    thread = threading.Thread(target=q.put, args=(regular(1),))
+    thread.start()
+    assert q.get(timeout=1) == regular(0)
+    thread.join(timeout=1)
+    assert q.get(timeout=1) == regular(1)
+
+
+def test_get_times_out_when_empty():
+    q = ResponseQueue(maxsize=1)
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+    with pytest.raises(queue.Empty):
+        q.get_nowait()
+
+
+class FakeRedis:
+    def __init__(self, list_length):
+        self.list_length = list_length
+        self.length_queries = 0
+        self.pushed = []
+
+    def queue_length(self, queue_name):
+        self.length_queries += 1
+        return self.list_length
+
+    def queue_many(self, queue_name, values, ttl=None):
+        self.pushed.extend(values)
+        self.list_length += len(values)
+        return self.list_length
+
+
+class FakeLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def worker_module():
+    return pytest.importorskip("worker")
+
+
+def make_worker(worker_module, list_length, max_length=4):
+    # only the publishing state, no model or threads
+    worker = worker_module.Worker.__new__(worker_module.Worker)
+    worker.uuid = "task"
+    worker.log = FakeLogger()
+    worker.settings = worker_module.Settings(
+        MANAGER_STREAM_NAME="test",
+        RESPONSE_LIST_MAX_LENGTH=max_length,
+        RESPONSE_COALESCE_TYPES=["frame"],
+    )
+    worker.redis = FakeRedis(list_length)
+    worker.wire_format = "json"
+    worker.frame_envelope = False
+    worker.response_list_length = 0
+    worker.dropped_previews = 0
+    return worker
+
+
+def frame_response(worker_module, frame_number, propagation=True):
+    schemas = worker_module.schemas
+    return schemas.SingleFrameResponseCover.model_construct(
+        msg_type="frame",
+        data=None,
+        error=None,
+        meta={"propagation": propagation, "frameNumber": frame_number},
+        message=None,
+    )
+
+
+def test_previews_are_published_below_the_list_bound(worker_module):
+    worker = make_worker(worker_module, list_length=0)
+    responses = [frame_response(worker_module, i) for i in range(3)]
+    assert worker.publish_responses(responses)
+    assert len(worker.redis.pushed) == 3
+    # the length returned by the push is used, the list is not queried
+    assert worker.redis.length_queries == 0
+    assert worker.response_list_length == 3
+
+
+def test_previews_are_skipped_when_the_list_is_full(worker_module):
+    worker = make_worker(worker_module, list_length=4)
+    worker.response_list_length = 4
+    previews = [frame_response(worker_module, i) for i in range(3)]
+    final = frame_response(worker_module, 3, propagation=False)
+
+    assert worker.publish_responses(previews + [final])
+    assert worker.redis.length_queries == 1
+    assert len(worker.redis.pushed) == 1
+    assert worker.dropped_previews == 3
+
+    # nothing left to push
+    assert worker.publish_responses(previews)
+    assert len(worker.redis.pushed) == 1
+    assert worker.dropped_previews == 6
+
+
+def test_previews_resume_once_the_consumer_catches_up(worker_module):
+    worker = make_worker(worker_module, list_length=4)
+    worker.response_list_length = 4
+    worker.redis.list_length = 1  # consumer read the list meanwhile
+    assert worker.publish_responses([frame_response(worker_module, 0)])
+    assert len(worker.redis.pushed) == 1
+    assert worker.dropped_previews == 0
@@ -0,0 +1,149 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils.track_compression import (  # noqa: E402
+    TrackCompressor,
+    clip_track,
+    interpolate_frame,
+    interpolate_track,
+    to_frame_ranges,
+)
+
+
+def compress(frames, boxes, tolerance, max_span=256):
+    compressor = TrackCompressor(tolerance, max_span=max_span)
+    segments = []
+    for frame_idx, box in zip(frames, boxes):
+        closed = compressor.add(frame_idx, box)
+        if closed:
+            segments.append(closed)
+    closed = compressor.close()
+    if closed:
+        segments.append(closed)
+    return segments
+
+
+def random_walk(num_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    start = np.array([100.0, 100.0, 200.0, 200.0])
+    return start + np.cumsum(rng.normal(0, 2.0, size=(num_frames, 4)), axis=0)
+
+
+@pytest.mark.parametrize("tolerance", [0.5, 2.0, 8.0])
+def test_reconstruction_error_is_within_tolerance(tolerance):
+    boxes = random_walk(300)
+    segments = compress(range(300), boxes, tolerance)
+
+    assert len(segments) == 1
+    track = interpolate_track(segments[0])
+    assert sorted(track) == list(range(300))
+    restored = np.array([track[frame] for frame in range(300)])
+    assert np.abs(restored - boxes).max() <= tolerance + 1e-9
+
+
+def test_higher_tolerance_keeps_fewer_keyframes():
+    boxes = random_walk(300)
+    low = compress(range(300), boxes, 0.5)[0]
+    high = compress(range(300), boxes, 8.0)[0]
+    assert len(high) < len(low) < 300
+
+
+def test_linear_motion_keeps_only_the_end_frames():
+    boxes = [[i, i, i + 10.0, i + 10.0] for i in range(50)]
+    segments = compress(range(50), boxes, 0.1)
+    assert [frame for frame, _ in segments[0]] == [0, 49]
+
+
+def test_keyframes_are_restored_exactly():
+    boxes = random_walk(100)
+    keyframes = compress(range(100), boxes, 2.0)[0]
+    track = interpolate_track(keyframes)
+    for frame, box in keyframes:
+        assert track[frame] == box
+        assert box == boxes[frame].tolist()
+
+
+@pytest.mark.parametrize("max_span", [1, 5, 16])
+def test_max_span_bounds_the_distance_between_keyframes(max_span):
+    boxes = [[0.0, 0.0, 10.0, 10.0]] * 100
+    keyframes = compress(range(100), boxes, 1.0, max_span=max_span)[0]
+    frames = [frame for frame, _ in keyframes]
+    assert frames[0] == 0 and frames[-1] == 99
+    assert max(b - a for a, b in zip(frames, frames[1:])) <= max_span
+
+
+def test_direction_change_is_a_keyframe():
+    # moves right, then back left
+    boxes = [[x, 0.0, x + 10.0, 10.0] for x in list(range(0, 20)) + list(range(18, -1, -1))]
+    keyframes = compress(range(len(boxes)), boxes, 0.5)[0]
+    frames = [frame for frame, _ in keyframes]
+    assert frames == [0, 19, len(boxes) - 1]
+
+
+def test_reverse_propagation_is_returned_in_ascending_order():
+    boxes = random_walk(60)
+    segments = compress(range(59, -1, -1), boxes[::-1], 1.0)
+
+    assert len(segments) == 1
+    frames = [frame for frame, _ in segments[0]]
+    assert frames == sorted(frames) and frames[0] == 0 and frames[-1] == 59
+    track = interpolate_track(segments[0])
+    restored = np.array([track[frame] for frame in range(60)])
+    assert np.abs(restored - boxes).max() <= 1.0 + 1e-9
+
+
+def test_gap_closes_the_segment_and_is_not_filled():
+    frames = list(range(0, 10)) + list(range(20, 30))
+    boxes = [[f, f, f + 10.0, f + 10.0] for f in frames]
+    segments = compress(frames, boxes, 0.1)
+
+    assert [[frame for frame, _ in segment] for segment in segments] == [[0, 9], [20, 29]]
+    restored = {}
+    for segment in segments:
+        restored.update(interpolate_track(segment))
+    assert sorted(restored) == frames
+
+
+def test_direction_switch_closes_the_segment():
+    frames = [5, 6, 7, 6, 5]
+    boxes = [[f, f, f + 10.0, f + 10.0] for f in frames]
+    segments = compress(frames, boxes, 0.1)
+    assert [[frame for frame, _ in segment] for segment in segments] == [[5, 7], [5, 6]]
+
+
+def test_interpolate_frame_matches_interpolate_track():
+    keyframes = compress(range(100), random_walk(100), 2.0)[0]
+    track = interpolate_track(keyframes)
+    for frame in range(100):
+        assert interpolate_frame(keyframes, frame) == pytest.approx(track[frame])
+    with pytest.raises(ValueError):
+        interpolate_frame(keyframes, 100)
+
+
+def test_clip_track_keeps_the_frames_outside_of_the_range():
+    keyframes = compress(range(100), random_walk(100), 2.0)[0]
+    track = interpolate_track(keyframes)
+    left, right = clip_track(keyframes, 30, 59)
+
+    assert left[0][0] == 0 and left[-1][0] == 29
+    assert right[0][0] == 60 and right[-1][0] == 99
+    restored = {**interpolate_track(left), **interpolate_track(right)}
+    assert sorted(restored) == list(range(30)) + list(range(60, 100))
+    for frame, box in restored.items():
+        assert box == pytest.approx(track[frame])
+
+
+def test_clip_track_edges():
+    keyframes = [(10, [0.0, 0.0, 10.0, 10.0]), (20, [10.0, 10.0, 20.0, 20.0])]
+    assert clip_track(keyframes, 0, 5) == [keyframes]
+    assert clip_track(keyframes, 0, 30) == []
+    (right,) = clip_track(keyframes, 0, 14)
+    assert right[0] == (15, [5.0, 5.0, 15.0, 15.0])
+    (left,) = clip_track(keyframes, 20, 30)
+    assert left[-1][0] == 19
+
+
+def test_to_frame_ranges():
+    assert to_frame_ranges([]) == []
+    assert to_frame_ranges([5, 3, 4, 10, 12, 11, 20]) == [(3, 5), (10, 12), (20, 20)]
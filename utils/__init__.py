@@ -1,3 +1,32 @@
 from .dto_validation import validate_request
-from .image_processing import hex_to_rgb, image_to_base64, draw_masks_on_image
-from .annotation_processing import mask_to_polygons, mask_to_xyxy
+from .image_processing import hex_to_rgb, image_to_base64, encode_image, draw_masks_on_image
+from .annotation_processing import (
+    mask_to_polygons,
+    mask_to_xyxy,
+    as_uint8_mask,
+    encode_polygon,
+    decode_polygon,
+)
+from .mask_geometry import masks_to_xyxy, xyxy_from_occupancy
+from .mask_encoding import (
+    mask_to_rle,
+    rle_to_mask,
+    mask_to_bitmask,
+    mask_to_packed_bits,
+    bitmask_to_mask,
+)
+from .lru_cache import LRUCache
+from .binary_envelope import (
+    encode_binary_message,
+    encode_binary_envelope,
+    decode_binary_message,
+    is_binary_message,
+)
+from .fast_serialization import get_type_adapter, dump_json_bytes, peek_msg_type
+from .track_compression import (
+    TrackCompressor,
+    interpolate_track,
+    interpolate_frame,
+    clip_track,
+    to_frame_ranges,
+)
@@ -1,12 +1,38 @@
 import cv2 as cv
 import numpy as np
 
-from typing import List, Optional
+from typing import List, Literal, Optional
+
+from .mask_geometry import masks_to_xyxy
 
 MIN_POLYGON_POINT_COUNT = 3
 
 
-def mask_to_polygons(mask: np.ndarray, normalized: bool = False) -> List[np.ndarray]:
+def as_uint8_mask(mask: np.ndarray) -> np.ndarray:
+    """Returns a uint8 view of a boolean mask for OpenCV without copying pixels.
+    Masks of other dtypes are converted.
+
+    Parameters:
+        mask (np.ndarray): A binary mask of any shape
+
+    Returns:
+        np.ndarray: mask as `np.uint8` with values in {0, 1}
+    """
+    if mask.dtype == np.uint8:
+        return mask
+    if mask.dtype == bool:
+        # bool and uint8 share the same memory layout, view needs a contiguous array
+        return np.ascontiguousarray(mask).view(np.uint8)
+    return (mask != 0).view(np.uint8)
+
+
+def mask_to_polygons(
+    mask: np.ndarray,
+    normalized: bool = False,
+    epsilon: float = 0.0,
+    min_area: float = 0.0,
+    external_only: bool = False,
+) -> List[np.ndarray]:
     """
     Converts a binary mask to a list of polygons.
 
@@ -15,6 +41,12 @@ def mask_to_polygons(mask: np.ndarray, normalized: bool = False) -> List[np.ndar
             shape `(H, W)`, where H and W are the height and width of
             the mask, respectively.
         normalized (bool): If `True`, the polygon coordinates are normalized
+        epsilon (float): Douglas-Peucker tolerance in pixels, the max distance between
+            the contour and its simplified polygon. `0` keeps all contour points.
+        min_area (float): contours enclosing fewer pixels are dropped (specks and
+            small holes). Default is `0`.
+        external_only (bool): If `True`, only outer contours are returned, holes and
+            nested contours are skipped.
 
     Returns:
         List[np.ndarray]: A list of polygons, where each polygon is represented by a
@@ -24,9 +56,16 @@ def mask_to_polygons(mask: np.ndarray, normalized: bool = False) -> List[np.ndar
     """
 
     contours, _ = cv.findContours(
-        mask.astype(np.uint8), cv.RETR_TREE, cv.CHAIN_APPROX_SIMPLE
+        as_uint8_mask(mask),
+        cv.RETR_EXTERNAL if external_only else cv.RETR_TREE,
+        cv.CHAIN_APPROX_SIMPLE,
     )
 
+    if min_area > 0:
+        contours = [c for c in contours if cv.contourArea(c) >= min_area]
+    if epsilon > 0:
+        contours = [cv.approxPolyDP(c, epsilon, True) for c in contours]
+
     polygons = [
         np.squeeze(contour, axis=1)
         for contour in contours
@@ -40,12 +79,58 @@ def mask_to_polygons(mask: np.ndarray, normalized: bool = False) -> List[np.ndar
     return polygons
 
 
+def encode_polygon(
+    polygon: np.ndarray, encoding: Literal["points", "flat", "delta"] = "points"
+) -> list:
+    """
+    Converts a polygon into its coordinate list.
+
+    Parameters:
+        polygon (np.ndarray): polygon points of shape `(N, 2)`
+        encoding (Literal["points", "flat", "delta"]): coordinate format
+            - `points`: `[[x, y], ...]`
+            - `flat`: integer pixels `[x0, y0, x1, y1, ...]`
+            - `delta`: integer pixels `[x0, y0, x1 - x0, y1 - y0, ...]`, small numbers
+              that serialize shorter
+
+    Returns:
+        list: coordinates
+    """
+    if encoding == "points":
+        return polygon.tolist()
+    points = np.rint(polygon).astype(np.int64)
+    if encoding == "delta":
+        points[1:] = np.diff(points, axis=0)
+    return points.ravel().tolist()
+
+
+def decode_polygon(
+    coordinates: list, encoding: Literal["points", "flat", "delta"] = "points"
+) -> np.ndarray:
+    """
+    Converts a coordinate list produced by `encode_polygon` back into points.
+
+    Parameters:
+        coordinates (list): encoded coordinates
+        encoding (Literal["points", "flat", "delta"]): coordinate format
+
+    Returns:
+        np.ndarray: polygon points of shape `(N, 2)`
+    """
+    if encoding == "points":
+        return np.asarray(coordinates).reshape(-1, 2)
+    points = np.asarray(coordinates, dtype=np.int64).reshape(-1, 2)
+    if encoding == "delta":
+        points = np.cumsum(points, axis=0)
+    return points
+
+
 def mask_to_xyxy(masks: np.ndarray, normlized: bool = False) -> np.ndarray:
     """
     Converts a 3D `np.array` of 2D bool masks into a 2D `np.array` of bounding boxes.
 
     Parameters:
-        masks (np.ndarray): A 3D `np.array` of shape `(N, W, H)`
+        masks (np.ndarray): A 3D `np.array` of shape `(N, H, W)`
             containing 2D bool masks
         normalized (bool): If `True`, the bounding box coordinates are normalized
             to the range `[0, 1]`. Default is `False`.
@@ -54,16 +139,4 @@ def mask_to_xyxy(masks: np.ndarray, normlized: bool = False) -> np.ndarray:
         np.ndarray: A 2D `np.array` of shape `(N, 4)` containing the bounding boxes
             `(x_min, y_min, x_max, y_max)` for each mask
     """
-    n = masks.shape[0]
-    xyxy = np.zeros((n, 4), dtype=np.float32)
-
-    for i, mask in enumerate(masks):
-        rows, cols = np.where(mask)
-
-        if len(rows) > 0 and len(cols) > 0:
-            x_min, x_max = np.min(cols), np.max(cols)
-            y_min, y_max = np.min(rows), np.max(rows)
-            xyxy[i, :] = [x_min, y_min, x_max, y_max]
-            if normlized:
-                xyxy[i, :] = xyxy[i, :] / np.array([mask.shape[1], mask.shape[0]] * 2)
-    return xyxy.astype(np.int64) if not normlized else xyxy
+    return masks_to_xyxy(masks, normalized=normlized)
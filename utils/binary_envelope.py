@@ -0,0 +1,162 @@
+import json
+import base64
+import struct
+
+from typing import Any, Dict, List, Tuple, Union
+
+# magic + big-endian uint32 header length + json header + raw segments
+BINARY_MAGIC = b"ALA\x01"
+HEADER_LENGTH_FORMAT = ">I"
+# segment holding another binary message (multi-frame envelopes)
+MESSAGE_MEDIA_TYPE = "application/x-ala-message"
+
+# mask types whose base64 payload travels as raw bytes
+MASK_MEDIA_TYPES = {"mask": "image/png", "bitmask": "application/octet-stream"}
+
+Segments = List[Tuple[bytes, str]]
+
+
+def is_binary_message(data: bytes) -> bool:
+    return data[: len(BINARY_MAGIC)] == BINARY_MAGIC
+
+
+def pack_binary_message(message: Dict[str, Any], segments: Segments) -> bytes:
+    """
+    Packs a message whose binary fields are replaced by `{"$segment": index}` placeholders.
+
+    Layout: `BINARY_MAGIC | uint32 header length | header json | segment bytes...` where
+    the header is `{"message": message, "segments": [[length, media_type], ...]}`.
+
+    Parameters:
+        message (Dict[str, Any]): message with segment placeholders
+        segments (Segments): raw segment bytes and media types in placeholder order
+
+    Returns:
+        bytes: binary message
+    """
+    header = json.dumps(
+        {
+            "message": message,
+            "segments": [[len(data), media_type] for data, media_type in segments],
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return b"".join(
+        [BINARY_MAGIC, struct.pack(HEADER_LENGTH_FORMAT, len(header)), header]
+        + [data for data, _ in segments]
+    )
+
+
+def encode_binary_message(message: Dict[str, Any]) -> bytes:
+    """
+    Encodes a response (`ResponseCover.model_dump()`) with images and masks moved out
+    of the json into raw segments: frame renders (`image_base64`), png and bit-packed
+    masks (`mask`) and object thumbnails (`meta.objectThumbnails`). Raw `bytes` values
+    become segments as they are, base64 strings are decoded.
+
+    Parameters:
+        message (Dict[str, Any]): response as a dict
+
+    Returns:
+        bytes: binary message
+    """
+    segments: Segments = []
+    return pack_binary_message(_extract_segments(message, segments), segments)
+
+
+def encode_binary_envelope(messages: List[bytes]) -> bytes:
+    """
+    Packs binary messages into a multi-frame `frames` message, each message is a segment.
+
+    Parameters:
+        messages (List[bytes]): binary frame messages
+
+    Returns:
+        bytes: binary envelope
+    """
+    envelope = {
+        "msg_type": "frames",
+        "data": [{"$segment": i} for i in range(len(messages))],
+        "error": None,
+        "meta": {"count": len(messages)},
+        "message": None,
+    }
+    return pack_binary_message(envelope, [(m, MESSAGE_MEDIA_TYPE) for m in messages])
+
+
+def decode_binary_message(data: bytes) -> Dict[str, Any]:
+    """
+    Decodes a binary message, segments are placed back as raw `bytes` and nested
+    messages are decoded recursively.
+
+    Parameters:
+        data (bytes): binary message
+
+    Returns:
+        Dict[str, Any]: decoded message
+    """
+    if not is_binary_message(data):
+        raise ValueError("Not a binary message")
+    offset = len(BINARY_MAGIC)
+    (header_length,) = struct.unpack_from(HEADER_LENGTH_FORMAT, data, offset)
+    offset += struct.calcsize(HEADER_LENGTH_FORMAT)
+    header = json.loads(data[offset : offset + header_length])
+    offset += header_length
+
+    segments: List[Any] = []
+    view = memoryview(data)
+    for length, media_type in header["segments"]:
+        segment = bytes(view[offset : offset + length])
+        if media_type == MESSAGE_MEDIA_TYPE:
+            segments.append(decode_binary_message(segment))
+        else:
+            segments.append(segment)
+        offset += length
+    return _restore_segments(header["message"], segments)
+
+
+def _extract_segments(value: Any, segments: Segments) -> Any:
+    if isinstance(value, list):
+        return [_extract_segments(item, segments) for item in value]
+    if not isinstance(value, dict):
+        return value
+
+    out = dict()
+    for key, item in value.items():
+        media_type = _get_media_type(key, value)
+        if media_type is not None and isinstance(item, (str, bytes)):
+            out[key] = _add_segment(item, media_type, segments)
+        elif key == "objectThumbnails" and isinstance(item, dict):
+            out[key] = {
+                obj_id: _add_segment(thumbnail, "image/jpeg", segments)
+                for obj_id, thumbnail in item.items()
+            }
+        else:
+            out[key] = _extract_segments(item, segments)
+    return out
+
+
+def _get_media_type(key: str, parent: Dict[str, Any]) -> Any:
+    if key == "image_base64":
+        return "image/jpeg"
+    if key == "mask":
+        return MASK_MEDIA_TYPES.get(parent.get("mask_type"))  # type: ignore
+    return None
+
+
+def _add_segment(
+    value: Union[str, bytes], media_type: str, segments: Segments
+) -> Dict[str, int]:
+    data = value if isinstance(value, bytes) else base64.b64decode(value)
+    segments.append((data, media_type))
+    return {"$segment": len(segments) - 1}
+
+
+def _restore_segments(value: Any, segments: List[Any]) -> Any:
+    if isinstance(value, list):
+        return [_restore_segments(item, segments) for item in value]
+    if isinstance(value, dict):
+        if len(value) == 1 and "$segment" in value:
+            return segments[value["$segment"]]
+        return {key: _restore_segments(item, segments) for key, item in value.items()}
+    return value
@@ -1,28 +1,50 @@
 from typing import Union, Tuple, Type, Dict
 import schemas
 
+from .fast_serialization import peek_msg_type
+
 schema_mapping: Dict[str, Type[schemas.ResponseCover]] = {
     "add_points": schemas.SingleFramePointPromptInputCover,
     "run_inference": schemas.RunInferenceInputCover,
     "remove_object": schemas.RemoveObjectInputCover,
     "error": schemas.ErrorResponseCover,
-    "reset": schemas.ResetTaskInputCover
+    "reset": schemas.ResetTaskInputCover,
+    "cancel": schemas.CancelTaskInputCover,
+    "get_frame": schemas.GetFrameInputCover,
 }
 
 
-def validate_request(request: dict) -> Tuple[schemas.ResponseCover, bool]:
+def validate_request(
+    request: Union[dict, str, bytes]
+) -> Tuple[schemas.ResponseCover, bool]:
+    """Validates a request, raw JSON is validated by pydantic without `json.loads`
+
+    Args:
+        request (Union[dict, str, bytes]): parsed request or raw JSON message
+
+    Returns:
+        Tuple[schemas.ResponseCover, bool]: request model and True, error response and False
+    """
+    is_raw = isinstance(request, (str, bytes))
+    try:
+        msg_type = peek_msg_type(request) if is_raw else request.get("msg_type")  # type: ignore
+    except Exception as e:
+        return schemas.ErrorResponseCover(message=str(e)), False
 
-    if request.get("msg_type") is None:
+    if msg_type is None:
         return schemas.ErrorResponseCover(message="msg_type is required"), False
 
     validation_schema: Type[schemas.ResponseCover] = schema_mapping.get(
-        request["msg_type"], schemas.ErrorResponseCover
+        msg_type, schemas.ErrorResponseCover
     )
     if validation_schema is schemas.ErrorResponseCover:
         return validation_schema(message="Unknown msg_type"), False
 
     try:
-        validated_request = validation_schema.model_validate(request)
+        if is_raw:
+            validated_request = validation_schema.model_validate_json(request)  # type: ignore
+        else:
+            validated_request = validation_schema.model_validate(request)
         return validated_request, True
     except Exception as e:
         return schemas.ErrorResponseCover(message=str(e)), False
@@ -0,0 +1,47 @@
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+
+class MessageHeader(BaseModel):
+    # only the message type is read, other fields are ignored
+    msg_type: Optional[str] = None
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """Returns a cached `TypeAdapter`, building one compiles the validator and serializer
+    of the type, so they are built once per type instead of once per call."""
+    return TypeAdapter(tp)
+
+
+def dump_json_bytes(value: Any, tp: Optional[Any] = None) -> bytes:
+    """
+    Serializes a model (or a value of the given type) straight to JSON bytes, without the
+    `str` copy of `model_dump_json`. Meant for the worker's own models, which may be built
+    with `model_construct` and are not validated again.
+
+    Parameters:
+        value (Any): pydantic model or a value of `tp`
+        tp (Optional[Any]): type of the value, the model class is used if not given
+
+    Returns:
+        bytes: JSON
+    """
+    if tp is None and isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    return get_type_adapter(tp if tp is not None else type(value)).dump_json(value)
+
+
+def peek_msg_type(raw: Union[str, bytes]) -> Optional[str]:
+    """
+    Reads `msg_type` of a JSON message without building python objects of the rest.
+
+    Parameters:
+        raw (Union[str, bytes]): JSON message
+
+    Returns:
+        Optional[str]: message type, None if missing
+    """
+    return MessageHeader.model_validate_json(raw).msg_type
@@ -20,30 +20,48 @@ def hex_to_rgb(hex: str) -> Tuple[int, ...]:
     return tuple(int(hex[i : i + 2], 16) for i in (0, 2, 4))
 
 
-def image_to_base64(src_image: np.ndarray, encode: bool = False) -> str:
-    """Convert image to base64
+def encode_image(src_image: np.ndarray, encode: bool = False) -> bytes:
+    """Encode image as PNG, or as JPEG if `encode`
 
     Args:
         image (np.ndarray): image
 
     Returns:
-        str: base64 encoded image
+        bytes: encoded image
     """
     if not encode:
         image = Image.fromarray(src_image)
         buffer = io.BytesIO()
         image.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return buffer.getvalue()
     else:
         encode_param = [int(cv.IMWRITE_JPEG_QUALITY), 70]
         result, encimg = cv.imencode(".jpg", src_image, encode_param)
-        return base64.b64encode(encimg).decode("utf-8")  # type: ignore
+        return encimg.tobytes()
+
+
+def image_to_base64(src_image: np.ndarray, encode: bool = False) -> str:
+    """Convert image to base64
+
+    Args:
+        image (np.ndarray): image
+
+    Returns:
+        str: base64 encoded image
+    """
+    return base64.b64encode(encode_image(src_image, encode=encode)).decode("utf-8")
 
 
 def draw_masks_on_image(
     src_image: np.ndarray, masks: Dict[str, np.ndarray], color: Dict[str, str]
 ) -> np.ndarray:
-    """Draws segmentation masks on the source image.
+    """Draws segmentation masks on the source image with 50% alpha blending.
+
+    All masks are painted into one label map first, then the pixels of a single object
+    are blended in one integer pass: `(pixel + color) >> 1`, the truncated float blend
+    `0.5 * pixel + 0.5 * color`. Pixels covered by several objects are blended object by
+    object in mask order, like the previous per-object renderer, only those pixels are
+    visited again (see tests/test_image_processing.py).
 
     Args:
         src_image (np.ndarray): original image in [HxWx3] format (pixel values in [0, 255])
@@ -51,29 +69,48 @@ def draw_masks_on_image(
         color (Dict[str, str]): Dict of colors object_id -> color(hex)
 
     Returns:
-        np.ndarray: Drawn image with masks
+        np.ndarray: Drawn image with masks, the source image is not modified
     """
-    alpha = 0.5
-    for obj_id, mask in masks.items():
+    out_image = np.array(src_image, copy=True)
+    if not masks:
+        return out_image
+
+    # label 0 is background, object i is painted as label i + 1
+    label_dtype = np.uint8 if len(masks) < 255 else np.uint16
+    label_map = np.zeros(src_image.shape[:2], dtype=label_dtype)
+    color_lut = np.zeros((len(masks) + 1, 3), dtype=np.uint16)
+    bool_masks: List[np.ndarray] = []
+    overlap: Optional[np.ndarray] = None
+    for label, (obj_id, mask) in enumerate(masks.items(), start=1):
         obj_color = color.get(obj_id)
         if obj_color is None:
-            obj_color = np.random.randint(0, 255, 3).astype(np.uint8)
+            color_lut[label] = np.random.randint(0, 255, 3)
         else:
-            obj_color = hex_to_rgb(obj_color)
-            obj_color = np.array(obj_color, dtype=np.uint8)
-
+            color_lut[label] = hex_to_rgb(obj_color)
         if mask.dtype != bool:
-            mask = mask.astype(bool)
-
-        overlay = np.zeros_like(src_image)
-        overlay[mask] = obj_color
-
-        # perform alpha blending
-        blended = src_image.copy().astype(np.float32)
-        overlay = overlay.astype(np.float32)
-
-        blended[mask] = (1 - alpha) * blended[mask] + alpha * overlay[mask]
-
-        src_image = blended.astype(np.uint8)
-
-    return src_image
+            mask = mask != 0
+        bool_masks.append(mask)
+        painted = label_map[mask] != 0
+        if painted.any():
+            if overlap is None:
+                overlap = np.zeros(src_image.shape[:2], dtype=bool)
+            overlap[mask] |= painted
+        label_map[mask] = label
+
+    pixels = out_image.reshape(-1, 3)
+    if overlap is not None:
+        # blended in mask order below
+        label_map[overlap] = 0
+    masked = np.flatnonzero(label_map)
+    pixels[masked] = (
+        pixels[masked].astype(np.uint16) + color_lut[label_map.ravel()[masked]]
+    ) >> 1
+
+    if overlap is not None:
+        overlapped = np.flatnonzero(overlap)
+        blended = pixels[overlapped].astype(np.uint16)
+        for label, mask in enumerate(bool_masks, start=1):
+            covered = mask.ravel()[overlapped]
+            blended[covered] = (blended[covered] + color_lut[label]) >> 1
+        pixels[overlapped] = blended
+    return out_image
@@ -0,0 +1,101 @@
+import threading
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ) -> None:
+        """Thread-safe least recently used cache bounded by the total size of its values
+
+        Args:
+            max_bytes (int): size bound, least recently used values are evicted above it
+            sizeof (Optional[Callable[[Any], int]], optional): size of a value in bytes,
+                `nbytes` of the value (numpy arrays) or 1 if not given. Defaults to None.
+        """
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: getattr(value, "nbytes", 1))
+
+        self._items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = dict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._items
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._items:
+                self._size -= self._sizes.pop(key)
+                del self._items[key]
+            if size > self.max_bytes:
+                # never fits, do not flush the whole cache for it
+                return
+            self._items[key] = value
+            self._sizes[key] = size
+            self._size += size
+            while self._size > self.max_bytes:
+                old_key, _ = self._items.popitem(last=False)
+                self._size -= self._sizes.pop(old_key)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Returns the cached value or loads and caches it. Loader runs outside of the lock,
+        concurrent misses of the same key may load it more than once."""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            if value is not None:
+                self.put(key, value)
+        return value
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._items.pop(key, None)
+            if value is not None:
+                self._size -= self._sizes.pop(key)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._sizes.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "items": len(self._items),
+                "bytes": self._size,
+            }
@@ -0,0 +1,162 @@
+import base64
+
+import numpy as np
+
+from typing import Dict, List, Union
+
+
+def mask_to_rle_counts(mask: np.ndarray) -> np.ndarray:
+    """
+    Computes uncompressed COCO run-length counts of a binary mask.
+
+    Parameters:
+        mask (np.ndarray): A binary mask of shape `(H, W)`
+
+    Returns:
+        np.ndarray: run lengths in column-major order, starting with a run of zeros
+    """
+    flat = mask.ravel(order="F").astype(bool, copy=False)
+    if flat.size == 0:
+        return np.zeros(1, dtype=np.int64)
+    change_points = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    boundaries = np.concatenate(([0], change_points, [flat.size]))
+    counts = np.diff(boundaries)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts
+
+
+def rle_counts_to_string(counts: Union[np.ndarray, List[int]]) -> str:
+    """
+    Compresses run-length counts into the COCO RLE string format
+    (same as `pycocotools.mask.encode`).
+
+    Parameters:
+        counts (Union[np.ndarray, List[int]]): uncompressed run lengths
+
+    Returns:
+        str: compressed counts
+    """
+    counts = [int(c) for c in counts]
+    chars = []
+    for i, x in enumerate(counts):
+        if i > 2:
+            x -= counts[i - 2]
+        more = True
+        while more:
+            c = x & 0x1F
+            x >>= 5
+            more = x != -1 if c & 0x10 else x != 0
+            if more:
+                c |= 0x20
+            chars.append(chr(c + 48))
+    return "".join(chars)
+
+
+def rle_string_to_counts(rle: str) -> List[int]:
+    """
+    Decompresses COCO RLE string counts.
+
+    Parameters:
+        rle (str): compressed counts
+
+    Returns:
+        List[int]: uncompressed run lengths
+    """
+    counts: List[int] = []
+    p = 0
+    while p < len(rle):
+        x = 0
+        k = 0
+        more = True
+        while more:
+            c = ord(rle[p]) - 48
+            x |= (c & 0x1F) << (5 * k)
+            more = bool(c & 0x20)
+            p += 1
+            k += 1
+            if not more and c & 0x10:
+                x |= -1 << (5 * k)
+        if len(counts) > 2:
+            x += counts[-2]
+        counts.append(x)
+    return counts
+
+
+def mask_to_rle(mask: np.ndarray) -> Dict[str, Union[List[int], str]]:
+    """
+    Encodes a binary mask as COCO compressed RLE.
+
+    Parameters:
+        mask (np.ndarray): A binary mask of shape `(H, W)`
+
+    Returns:
+        Dict[str, Union[List[int], str]]: `{"size": [H, W], "counts": str}`
+    """
+    return {
+        "size": [int(mask.shape[0]), int(mask.shape[1])],
+        "counts": rle_counts_to_string(mask_to_rle_counts(mask)),
+    }
+
+
+def rle_to_mask(rle: Dict[str, Union[List[int], str]]) -> np.ndarray:
+    """
+    Decodes COCO RLE (compressed or uncompressed counts) into a binary mask.
+
+    Parameters:
+        rle (Dict[str, Union[List[int], str]]): `{"size": [H, W], "counts": ...}`
+
+    Returns:
+        np.ndarray: bool mask of shape `(H, W)`
+    """
+    h, w = rle["size"]  # type: ignore
+    counts = rle["counts"]
+    if isinstance(counts, str):
+        counts = rle_string_to_counts(counts)
+    values = np.zeros(len(counts), dtype=bool)
+    values[1::2] = True
+    flat = np.repeat(values, counts)
+    return flat.reshape((w, h)).T
+
+
+def mask_to_packed_bits(mask: np.ndarray) -> bytes:
+    """
+    Packs a binary mask into 1 bit per pixel (row-major, most significant bit first).
+
+    Parameters:
+        mask (np.ndarray): A binary mask of shape `(H, W)`
+
+    Returns:
+        bytes: packed bits, last byte is zero padded
+    """
+    return np.packbits(mask, axis=None).tobytes()
+
+
+def mask_to_bitmask(mask: np.ndarray) -> str:
+    """
+    Packs a binary mask into 1 bit per pixel (row-major, most significant bit first)
+    and base64 encodes it.
+
+    Parameters:
+        mask (np.ndarray): A binary mask of shape `(H, W)`
+
+    Returns:
+        str: base64 encoded packed bits, last byte is zero padded
+    """
+    return base64.b64encode(mask_to_packed_bits(mask)).decode("utf-8")
+
+
+def bitmask_to_mask(bitmask: str, size: List[int]) -> np.ndarray:
+    """
+    Decodes a base64 encoded bit-packed mask.
+
+    Parameters:
+        bitmask (str): base64 encoded packed bits
+        size (List[int]): `[H, W]` of the mask
+
+    Returns:
+        np.ndarray: bool mask of shape `(H, W)`
+    """
+    h, w = size
+    packed = np.frombuffer(base64.b64decode(bitmask), dtype=np.uint8)
+    return np.unpackbits(packed, count=h * w).reshape((h, w)).astype(bool)
@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def masks_to_xyxy(masks: np.ndarray, normalized: bool = False) -> np.ndarray:
+    """
+    Computes bounding boxes of all masks at once from row/column reductions.
+
+    Parameters:
+        masks (np.ndarray): A 3D `np.array` of shape `(N, H, W)` containing 2D bool masks
+        normalized (bool): If `True`, the bounding box coordinates are normalized
+            to the range `[0, 1]`. Default is `False`.
+
+    Returns:
+        np.ndarray: A 2D `np.array` of shape `(N, 4)` containing the bounding boxes
+            `(x_min, y_min, x_max, y_max)` for each mask, zeros for empty masks
+    """
+    _, h, w = masks.shape
+    rows = masks.any(axis=2)
+    cols = masks.any(axis=1)
+    return xyxy_from_occupancy(rows, cols, h, w, normalized)
+
+
+def xyxy_from_occupancy(
+    rows: np.ndarray, cols: np.ndarray, h: int, w: int, normalized: bool = False
+) -> np.ndarray:
+    """
+    Computes bounding boxes from per-row and per-column occupancy of the masks. Shared
+    by all bbox reductions, callers only differ in how the occupancy is reduced.
+
+    Parameters:
+        rows (np.ndarray): `(N, H)` True for rows with foreground pixels
+        cols (np.ndarray): `(N, W)` True for columns with foreground pixels
+        h (int): mask height
+        w (int): mask width
+        normalized (bool): If `True`, the bounding box coordinates are normalized
+            to the range `[0, 1]`. Default is `False`.
+
+    Returns:
+        np.ndarray: A 2D `np.array` of shape `(N, 4)` containing the bounding boxes
+            `(x_min, y_min, x_max, y_max)` for each mask, zeros for empty masks
+    """
+    if rows.shape[0] == 0:
+        return np.zeros((0, 4), dtype=np.float32 if normalized else np.int64)
+    # first occupied row/column from the front and the back, argmax stops at the first True
+    y_min = rows.argmax(axis=1)
+    y_max = h - 1 - rows[:, ::-1].argmax(axis=1)
+    x_min = cols.argmax(axis=1)
+    x_max = w - 1 - cols[:, ::-1].argmax(axis=1)
+    xyxy = np.stack([x_min, y_min, x_max, y_max], axis=1).astype(np.int64)
+    xyxy[~rows.any(axis=1)] = 0
+    if normalized:
+        return xyxy.astype(np.float32) / np.array([w, h, w, h], dtype=np.float32)
+    return xyxy
@@ -0,0 +1,208 @@
+import bisect
+
+import numpy as np
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (frame index, [xmin, ymin, xmax, ymax])
+Keyframe = Tuple[int, List[float]]
+
+
+class TrackCompressor:
+    def __init__(self, tolerance: float, max_span: int = 256) -> None:
+        """Online keyframe selection of a bbox track. Frames between two keyframes are
+        restored by linear interpolation (`interpolate_track`) with a max absolute error
+        of `tolerance` per coordinate. A segment holds consecutive frames in one direction,
+        a frame that does not follow the previous one closes it.
+
+        Args:
+            tolerance (float): max reconstruction error per coordinate, in box units
+            max_span (int, optional): max number of frames between keyframes, bounds the
+                check of each added frame. Defaults to 256.
+        """
+        self.tolerance = tolerance
+        self.max_span = max(max_span, 1)
+
+        self._keyframes: List[Keyframe] = list()
+        # frames after the last keyframe, restored by interpolation so far
+        self._pending: List[Keyframe] = list()
+        self._step: Optional[int] = None
+
+    @property
+    def last_frame_idx(self) -> Optional[int]:
+        if self._pending:
+            return self._pending[-1][0]
+        return self._keyframes[-1][0] if self._keyframes else None
+
+    def add(self, frame_idx: int, box: Sequence[float]) -> Optional[List[Keyframe]]:
+        """Adds the box of the next frame
+
+        Args:
+            frame_idx (int): frame index
+            box (Sequence[float]): `[xmin, ymin, xmax, ymax]`
+
+        Returns:
+            Optional[List[Keyframe]]: keyframes of the closed segment if the frame does
+                not follow the previous one, None otherwise
+        """
+        box = [float(v) for v in box]
+        closed = None
+        if self._keyframes and not self._follows(frame_idx):
+            closed = self.close()
+        if not self._keyframes:
+            self._keyframes.append((frame_idx, box))
+            return closed
+
+        if self._step is None:
+            self._step = frame_idx - self._keyframes[-1][0]
+        if len(self._pending) >= self.max_span or not self._fits(frame_idx, box):
+            # the previous frame still fit all frames before it
+            self._keyframes.append(self._pending[-1])
+            self._pending = list()
+        self._pending.append((frame_idx, box))
+        return closed
+
+    def close(self) -> Optional[List[Keyframe]]:
+        """Closes the open segment
+
+        Returns:
+            Optional[List[Keyframe]]: keyframes of the segment in ascending frame order,
+                None if there is no open segment
+        """
+        if not self._keyframes:
+            return None
+        if self._pending:
+            self._keyframes.append(self._pending[-1])
+        keyframes = sorted(self._keyframes, key=lambda keyframe: keyframe[0])
+        self._keyframes = list()
+        self._pending = list()
+        self._step = None
+        return keyframes
+
+    def _follows(self, frame_idx: int) -> bool:
+        step = frame_idx - self.last_frame_idx  # type: ignore
+        return abs(step) == 1 if self._step is None else step == self._step
+
+    def _fits(self, frame_idx: int, box: List[float]) -> bool:
+        if not self._pending:
+            return True
+        anchor_frame, anchor_box = self._keyframes[-1]
+        frames = np.array([frame for frame, _ in self._pending], dtype=np.float64)
+        boxes = np.array([pending_box for _, pending_box in self._pending], dtype=np.float64)
+        restored = _interpolate(anchor_frame, anchor_box, frame_idx, box, frames)
+        return bool(np.abs(restored - boxes).max() <= self.tolerance)
+
+
+def interpolate_track(keyframes: Sequence[Keyframe]) -> Dict[int, List[float]]:
+    """
+    Restores all frames of a compressed track segment.
+
+    Parameters:
+        keyframes (Sequence[Keyframe]): keyframes in ascending frame order
+
+    Returns:
+        Dict[int, List[float]]: frame index -> `[xmin, ymin, xmax, ymax]`
+    """
+    track: Dict[int, List[float]] = dict()
+    for (start_frame, start_box), (end_frame, end_box) in zip(keyframes, keyframes[1:]):
+        frames = np.arange(start_frame, end_frame, dtype=np.float64)
+        restored = _interpolate(start_frame, start_box, end_frame, end_box, frames)
+        for frame, box in zip(range(start_frame, end_frame), restored.tolist()):
+            track[frame] = box
+    if keyframes:
+        # keyframes are restored exactly
+        for frame, box in keyframes:
+            track[frame] = list(box)
+    return track
+
+
+def clip_track(
+    keyframes: Sequence[Keyframe], start_frame: int, end_frame: int
+) -> List[List[Keyframe]]:
+    """
+    Removes the frames `[start_frame, end_frame]` from a compressed track segment. Frames
+    left of and right of the range are kept as separate segments and are restored as
+    before, the frames next to the range become keyframes.
+
+    Parameters:
+        keyframes (Sequence[Keyframe]): keyframes in ascending frame order
+        start_frame (int): first removed frame
+        end_frame (int): last removed frame
+
+    Returns:
+        List[List[Keyframe]]: remaining segments, 0 to 2 of them
+    """
+    if not keyframes:
+        return list()
+    first_frame, last_frame = keyframes[0][0], keyframes[-1][0]
+    if end_frame < first_frame or start_frame > last_frame:
+        return [list(keyframes)]
+
+    segments: List[List[Keyframe]] = list()
+    if first_frame < start_frame:
+        left = [k for k in keyframes if k[0] < start_frame]
+        if left[-1][0] != start_frame - 1:
+            left.append((start_frame - 1, interpolate_frame(keyframes, start_frame - 1)))
+        segments.append(left)
+    if last_frame > end_frame:
+        right = [k for k in keyframes if k[0] > end_frame]
+        if right[0][0] != end_frame + 1:
+            right.insert(0, (end_frame + 1, interpolate_frame(keyframes, end_frame + 1)))
+        segments.append(right)
+    return segments
+
+
+def interpolate_frame(keyframes: Sequence[Keyframe], frame_idx: int) -> List[float]:
+    """
+    Restores a single frame of a compressed track segment.
+
+    Parameters:
+        keyframes (Sequence[Keyframe]): keyframes in ascending frame order
+        frame_idx (int): frame index within the segment
+
+    Returns:
+        List[float]: `[xmin, ymin, xmax, ymax]`
+    """
+    frames = [frame for frame, _ in keyframes]
+    i = bisect.bisect_left(frames, frame_idx)
+    if i < len(frames) and frames[i] == frame_idx:
+        return list(keyframes[i][1])
+    if i == 0 or i == len(frames):
+        raise ValueError(f"Frame {frame_idx} is outside of the track segment")
+    (start_frame, start_box), (end_frame, end_box) = keyframes[i - 1], keyframes[i]
+    restored = _interpolate(
+        start_frame, start_box, end_frame, end_box, np.array([frame_idx], dtype=np.float64)
+    )
+    return restored[0].tolist()
+
+
+def to_frame_ranges(frames: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Groups frame indices into ranges of consecutive frames.
+
+    Parameters:
+        frames (Iterable[int]): frame indices in any order
+
+    Returns:
+        List[Tuple[int, int]]: ascending `(first, last)` ranges
+    """
+    ranges: List[Tuple[int, int]] = list()
+    for frame in sorted(set(frames)):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], frame)
+        else:
+            ranges.append((frame, frame))
+    return ranges
+
+
+def _interpolate(
+    start_frame: int,
+    start_box: Sequence[float],
+    end_frame: int,
+    end_box: Sequence[float],
+    frames: np.ndarray,
+) -> np.ndarray:
+    start = np.asarray(start_box, dtype=np.float64)
+    end = np.asarray(end_box, dtype=np.float64)
+    t = (frames - start_frame) / (end_frame - start_frame)
+    return start + (end - start) * t[:, None]
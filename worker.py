@@ -1,32 +1,91 @@
 import os
 import json
+import base64
 import time
 import atexit
 import queue
 import argparse
 import asyncio
+import threading
 
-from typing import Optional, Union, Any, List, Tuple, Literal, Dict, Set
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Union, Any, List, Tuple, Literal, Dict, Set, Deque
 
 import cv2 as cv
 import numpy as np
 
+from pydantic import ValidationError
+
 import enums
 import schemas
-from core import BaseService
+from core import BaseService, ResponseQueue
 from db import RedisClient
 from logger import CustomLogger
 from settings import Settings, settings
 
-from utils import validate_request
+from utils import validate_request, dump_json_bytes, LRUCache
+from utils import (
+    TrackCompressor,
+    interpolate_track,
+    interpolate_frame,
+    clip_track,
+    to_frame_ranges,
+)
 from utils import (
     hex_to_rgb,
     image_to_base64,
+    encode_image,
     draw_masks_on_image,
     mask_to_xyxy,
     mask_to_polygons,
+    encode_polygon,
+    mask_to_rle,
+    mask_to_packed_bits,
+    encode_binary_message,
+    encode_binary_envelope,
 )
-from ai_module import SegmentAnything2
+from ai_module import SegmentAnything2, FeatureCache, MaskOutput, MaskDelta, MaskDeltaTracker
+from sam2.sam2_video_predictor import SAM2VideoPredictor
+from services.worker_pool import POOL_SHUTDOWN_MESSAGE
+
+# pushed to the wake key of a worker host, carries no request
+ROUTER_WAKE_MESSAGE = "__wake__"
+
+
+def build_feature_cache(
+    ai_model: schemas.AiModel,
+    src_settings: Settings = settings,
+    blocking_writes: bool = False,
+) -> Optional[FeatureCache]:
+    """Returns the image feature cache of the model, None if the cache is disabled"""
+    if not src_settings.FEATURE_CACHE_DIRECTORY:
+        return None
+    return FeatureCache(
+        cache_dir=src_settings.FEATURE_CACHE_DIRECTORY,
+        model_path=ai_model.checkpoint_path,
+        model_config=ai_model.config_path,
+        max_bytes=src_settings.FEATURE_CACHE_MAX_BYTES,
+        blocking_writes=blocking_writes,
+    )
+
+
+def mask_to_polygons_with_options(
+    mask: np.ndarray, options: schemas.PolygonOptions
+) -> List[np.ndarray]:
+    """Converts a mask to polygons, normalized for the `points` encoding and in
+    pixels for the integer encodings"""
+    return mask_to_polygons(
+        mask,
+        normalized=options.encoding == "points",
+        epsilon=options.epsilon,
+        min_area=options.minArea,
+        external_only=options.externalOnly,
+    )
+
+
+def _overlaps(frame_range: Tuple[int, int], other: Tuple[int, int]) -> bool:
+    return frame_range[0] <= other[1] and other[0] <= frame_range[1]
 
 
 class Annotator:
@@ -36,11 +95,263 @@ class Annotator:
         config: schemas.InitModelIntercom,
         redis_client: RedisClient,
         logger: CustomLogger,
+        batch_size: int = 32,
+        track_tolerance: Optional[float] = None,
+        track_max_span: int = 256,
     ) -> None:
+        """Exports frame annotations into the task's annotation hash
+        (`task:{uuid}:annotations`, frame -> ImageAnnotation json). Frames are buffered and
+        written in pipelined batches by a background writer, call `flush` before reading.
+
+        With a track tolerance, bboxes are stored as compressed per-object tracks
+        (`task:{uuid}:tracks`, `{first}:{last}:{object id}` -> keyframes with linear
+        interpolation in between) instead of per frame, frames must be committed in
+        propagation order (`commit_frame`). Tracks are stored when the run is flushed and
+        replace all stored tracks over the frames of the run, like rewritten frames.
+
+        Args:
+            task_uuid (str): task uuid
+            config (schemas.InitModelIntercom): task configuration
+            redis_client (RedisClient): redis connection used by the writer
+            logger (CustomLogger): Logger object to log messages
+            batch_size (int, optional): max number of frames per write. Defaults to 32.
+            track_tolerance (Optional[float], optional): max interpolation error of the
+                normalized bbox coordinates, bboxes are stored per frame if None. Defaults to None.
+            track_max_span (int, optional): max number of frames between keyframes. Defaults to 256.
+        """
         self.uuid = task_uuid
         self.config = config
         self.redis = redis_client
         self.log = logger
+        self.batch_size = max(batch_size, 1)
+        self.track_tolerance = track_tolerance
+        self.track_max_span = track_max_span
+
+        # object id -> open track segment, frame -> bboxes waiting for `commit_frame`
+        self.tracks: Dict[str, TrackCompressor] = dict()
+        self.track_labels: Dict[str, Optional[str]] = dict()
+        self.track_frames: Dict[int, List[schemas.BboxAnnotation]] = dict()
+        self.track_lock = threading.Lock()
+        # closed segments and committed frames of the current run, stored by `flush`
+        self.run_segments: List[schemas.BboxTrack] = list()
+        self.run_frames: Set[int] = set()
+
+        # (hash key, field, value)
+        self.write_queue: queue.Queue[Optional[Tuple[str, str, bytes]]] = queue.Queue()
+        self.writer = threading.Thread(
+            target=self.writer_fn, name="AnnotationWriter", daemon=True
+        )
+        self.writer.start()
+
+    @property
+    def annotations_key(self) -> str:
+        return f"task:{self.uuid}:annotations"
+
+    @property
+    def tracks_key(self) -> str:
+        return f"task:{self.uuid}:tracks"
+
+    def writer_fn(self) -> None:
+        while True:
+            item = self.write_queue.get()
+            items = [item]
+            while item is not None and len(items) < self.batch_size:
+                try:
+                    item = self.write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                items.append(item)
+
+            batches: Dict[str, Dict[str, bytes]] = dict()
+            for key, field, value in (i for i in items if i is not None):
+                batches.setdefault(key, dict())[field] = value
+            try:
+                for key, batch in batches.items():
+                    if not self.redis.hash_set_many(key, batch):
+                        self.log.error(f"Error exporting {len(batch)} annotations to {key}")
+            finally:
+                for _ in items:
+                    self.write_queue.task_done()
+            if items[-1] is None:
+                return
+
+    def flush(self) -> None:
+        """Closes the open tracks and blocks until all buffered annotations are written"""
+        with self.track_lock:
+            # frames processed but not committed (e.g. cancelled runs) are kept
+            for frame_idx in sorted(self.track_frames):
+                self._add_track_frame(frame_idx, self.track_frames.pop(frame_idx))
+            for obj_id, track in self.tracks.items():
+                self._write_track(obj_id, track.close())
+            self._store_run_tracks()
+        self.write_queue.join()
+
+    def commit_frame(self, frame_idx: int) -> None:
+        """Adds the bboxes of an exported frame to the object tracks, frames have to be
+        committed in propagation order. No-op without track compression."""
+        with self.track_lock:
+            bboxes = self.track_frames.pop(frame_idx, None)
+            if bboxes is not None:
+                self._add_track_frame(frame_idx, bboxes)
+
+    def _add_track_frame(self, frame_idx: int, bboxes: List[schemas.BboxAnnotation]) -> None:
+        self.run_frames.add(frame_idx)
+        for bbox in bboxes:
+            track = self.tracks.get(bbox.id)
+            if track is None:
+                track = self.tracks[bbox.id] = TrackCompressor(
+                    tolerance=self.track_tolerance,  # type: ignore
+                    max_span=self.track_max_span,
+                )
+            if self.track_labels.get(bbox.id) != bbox.label:
+                # a segment carries one label
+                self._write_track(bbox.id, track.close())
+                self.track_labels[bbox.id] = bbox.label
+            self._write_track(
+                bbox.id, track.add(frame_idx, [bbox.xmin, bbox.ymin, bbox.xmax, bbox.ymax])
+            )
+
+    def _write_track(self, obj_id: str, keyframes: Optional[List[Tuple[int, List[float]]]]) -> None:
+        if not keyframes:
+            return
+        self.run_segments.append(
+            schemas.BboxTrack.model_construct(
+                id=obj_id,
+                label=self.track_labels.get(obj_id),
+                keyframes=[(frame, *box) for frame, box in keyframes],
+            )
+        )
+
+    def _store_run_tracks(self) -> None:
+        """Replaces the stored tracks of all objects over the frames of the run with the
+        segments of the run, stored segments are clipped to the frames outside of it"""
+        if not self.run_frames:
+            return
+        frame_ranges = to_frame_ranges(self.run_frames)
+        overlapping = [
+            field
+            for field in self.redis.hash_keys(self.tracks_key)
+            if any(
+                _overlaps(self.parse_track_field(field), frame_range)
+                for frame_range in frame_ranges
+            )
+        ]
+        segments: List[schemas.BboxTrack] = list()
+        for value in self.redis.hash_get_many(self.tracks_key, overlapping):
+            if value is None:
+                continue
+            stored = schemas.BboxTrack.model_validate_json(value)
+            pieces = [[(k[0], list(k[1:])) for k in stored.keyframes]]
+            for start_frame, end_frame in frame_ranges:
+                pieces = [
+                    piece
+                    for keyframes in pieces
+                    for piece in clip_track(keyframes, start_frame, end_frame)
+                ]
+            segments.extend(
+                schemas.BboxTrack.model_construct(
+                    id=stored.id,
+                    label=stored.label,
+                    keyframes=[(frame, *box) for frame, box in piece],
+                )
+                for piece in pieces
+            )
+        segments.extend(self.run_segments)
+
+        mapping = {
+            self.get_track_field(segment): dump_json_bytes(segment) for segment in segments
+        }
+        if not self.redis.hash_replace(self.tracks_key, overlapping, mapping):
+            self.log.error(f"Error exporting {len(self.run_segments)} track segments")
+        self.run_segments = list()
+        self.run_frames = set()
+
+    @staticmethod
+    def get_track_field(segment: schemas.BboxTrack) -> str:
+        # the frame range of the segment is readable without parsing it
+        return f"{segment.keyframes[0][0]:08d}:{segment.keyframes[-1][0]:08d}:{segment.id}"
+
+    @staticmethod
+    def parse_track_field(field: str) -> Tuple[int, int]:
+        first_frame, last_frame, _ = field.split(":", 2)
+        return int(first_frame), int(last_frame)
+
+    def close(self) -> None:
+        """Writes buffered annotations and stops the writer"""
+        if self.writer.is_alive():
+            self.write_queue.put(None)
+            self.writer.join()
+
+    def get_annotation(self, frame_idx: int) -> Optional[schemas.ImageAnnotation]:
+        value = self.redis.hash_get(
+            self.annotations_key, self.get_frame_idx_padding(frame_idx)
+        )
+        annotations = dict()
+        if value is not None:
+            annotations[frame_idx] = schemas.ImageAnnotation.model_validate_json(value)
+        self._merge_tracks(annotations, frame_idx=frame_idx)
+        return annotations.get(frame_idx)
+
+    def get_annotations(self) -> Dict[int, schemas.ImageAnnotation]:
+        """Reads all stored frame annotations of the task with HSCAN, compressed bbox
+        tracks are expanded into the frames
+
+        Returns:
+            Dict[int, schemas.ImageAnnotation]: frame index -> annotation
+        """
+        annotations = {
+            int(field) - 1: schemas.ImageAnnotation.model_validate_json(value)
+            for field, value in self.redis.hash_scan(self.annotations_key)
+        }
+        self._merge_tracks(annotations)
+        return annotations
+
+    def _merge_tracks(
+        self,
+        annotations: Dict[int, schemas.ImageAnnotation],
+        frame_idx: Optional[int] = None,
+    ) -> None:
+        if frame_idx is None:
+            values = [value for _, value in self.redis.hash_scan(self.tracks_key)]
+        else:
+            # only the segments covering the frame are read
+            fields = [
+                field
+                for field in self.redis.hash_keys(self.tracks_key)
+                if _overlaps(self.parse_track_field(field), (frame_idx, frame_idx))
+            ]
+            values = self.redis.hash_get_many(self.tracks_key, fields)
+
+        bboxes: Dict[int, Dict[str, schemas.BboxAnnotation]] = dict()
+        for value in values:
+            if value is None:
+                continue
+            segment = schemas.BboxTrack.model_validate_json(value)
+            keyframes = [(k[0], list(k[1:])) for k in segment.keyframes]
+            if frame_idx is None:
+                track = interpolate_track(keyframes)
+            else:
+                track = {frame_idx: interpolate_frame(keyframes, frame_idx)}
+            for frame, (xmin, ymin, xmax, ymax) in track.items():
+                bboxes.setdefault(frame, dict())[segment.id] = schemas.BboxAnnotation(
+                    id=segment.id, xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax, label=segment.label
+                )
+
+        for frame, frame_bboxes in bboxes.items():
+            annotation = annotations.get(frame)
+            if annotation is None:
+                annotation = annotations[frame] = schemas.ImageAnnotation(
+                    image_id=f"{self.uuid}:{frame}",
+                    image_path=self.get_image_path(frame),
+                    meta=schemas.AnnotationMeta(
+                        annotation_model=self.annotation_model,
+                        video_source=self.video_source,
+                        frame_idx=frame,
+                    ),
+                )
+            annotation.bbox_annotations = [
+                bbox for bbox in annotation.bbox_annotations if bbox.id not in frame_bboxes
+            ] + list(frame_bboxes.values())
 
     @property
     def status(self) -> enums.AnnotationStatusEnum:
@@ -76,23 +387,33 @@ class Annotator:
 
     def __call__(
         self,
-        segmentation_masks: np.ndarray,
+        segmentation_masks: MaskOutput,
         object_ids: List[Union[int, str]],
         frame_idx: int,
         color_mapping: Optional[Dict[str, str]] = None,
         label_mapping: Optional[Dict[str, str]] = None,
-        export_type: Literal["bbox", "poylgon", "all"] = "all",
+        export_type: Literal["bbox", "polygon", "all"] = "all",
+        polygon_options: Optional[schemas.PolygonOptions] = None,
+        bbox_cover: Optional[schemas.BboxCover] = None,
+        polygon_cover: Optional[schemas.PolygonCover] = None,
         *args,
         **kwargs,
     ) -> bool:
         """Exports single frame segmentation masks as bboxes and polygons to store in the redis
-        to be ready when user want to export annotations
+        to be ready when user want to export annotations. The frame is queued for the
+        background writer, redis is not waited.
 
         Args:
-            segmentation_masks (np.ndarray): segmentation masks generated by SAM2
+            segmentation_masks (MaskOutput): segmentation masks generated by SAM2
             object_ids (List[str]): object ids in that frame
             frame_idx (int): current frame index to track which frame is anotated
-            export_type (Literal["bbox", "poylgon","all"], optional): type of export. Defaults to "all".
+            export_type (Literal["bbox", "polygon", "all"], optional): type of export. Defaults to "all".
+            polygon_options (Optional[schemas.PolygonOptions], optional): polygon
+                simplification and encoding, all contour points if not given. Defaults to None.
+            bbox_cover (Optional[schemas.BboxCover], optional): bboxes already computed
+                for the response, reused instead of computing them again. Defaults to None.
+            polygon_cover (Optional[schemas.PolygonCover], optional): polygons already
+                computed with `polygon_options`, reused likewise. Defaults to None.
 
         Raises:
             Exception: _description_
@@ -104,14 +425,15 @@ class Annotator:
             ValueError: _description_
 
         Returns:
-            bool: true if storing is successful, false otherwise
+            bool: true if the frame is queued for storing, false otherwise
         """
-        annotation_meta = schemas.AnnotationMeta(
+        # models below are built from the worker's own data, validation is skipped
+        annotation_meta = schemas.AnnotationMeta.model_construct(
             annotation_model=self.annotation_model,
             video_source=self.video_source,
             frame_idx=frame_idx,
         )
-        if export_type == "bbox" or export_type == "all":
+        if (export_type == "bbox" or export_type == "all") and bbox_cover is None:
             bbox_cover = self.export_bbox(
                 frame_idx=frame_idx,
                 out_object_ids=object_ids,
@@ -119,25 +441,34 @@ class Annotator:
                 color_mapping=color_mapping if color_mapping else dict(),
                 label_mapping=label_mapping if label_mapping else dict(),
             )
-            bbox_annotations = self.get_annotation_object_from_bbox_cover(bbox_cover)
+        if export_type == "bbox" or export_type == "all":
+            bbox_annotations = self.get_annotation_object_from_bbox_cover(bbox_cover)  # type: ignore
         else:
             bbox_annotations = list()
+        if self.track_tolerance is not None:
+            # stored in the tracks once the frame is committed, frames without objects
+            # still clear the stored tracks over them
+            with self.track_lock:
+                self.track_frames[frame_idx] = bbox_annotations
+            bbox_annotations = list()
 
-        if export_type == "polygon" or export_type == "all":
+        if (export_type == "polygon" or export_type == "all") and polygon_cover is None:
             polygon_cover = self.export_polygon(
                 frame_idx=frame_idx,
                 out_object_ids=object_ids,
                 masks=segmentation_masks,
                 color_mapping=color_mapping if color_mapping else dict(),
                 label_mapping=label_mapping if label_mapping else dict(),
+                polygon_options=polygon_options,
             )
+        if export_type == "polygon" or export_type == "all":
             polygon_annotations = self.get_annotation_object_from_polygon_cover(
-                polygon_cover
+                polygon_cover  # type: ignore
             )
         else:
             polygon_annotations = list()
 
-        image_annotation = schemas.ImageAnnotation(
+        image_annotation = schemas.ImageAnnotation.model_construct(
             image_id=f"{self.uuid}:{frame_idx}",
             image_path=self.get_image_path(frame_idx),
             meta=annotation_meta,
@@ -145,11 +476,18 @@ class Annotator:
             polygon_annotations=polygon_annotations,
         )
 
-        is_published = self.redis.set(
-            f"task:{self.uuid}:annotation:{self.get_frame_idx_padding(frame_idx)}",
-            image_annotation.model_dump_json(),
+        if self.track_tolerance is not None and export_type == "bbox":
+            # nothing left per frame, the frame is restored from the tracks on export
+            return True
+        # written by the background writer, see `flush`
+        self.write_queue.put(
+            (
+                self.annotations_key,
+                self.get_frame_idx_padding(frame_idx),
+                dump_json_bytes(image_annotation),
+            )
         )
-        return is_published
+        return True
 
     @staticmethod
     def get_annotation_object_from_bbox_cover(
@@ -165,7 +503,7 @@ class Annotator:
         """
         annotation_list = list()
         for bbox in bbox_cover.bboxes:
-            annotation = schemas.BboxAnnotation(
+            annotation = schemas.BboxAnnotation.model_construct(
                 id=str(bbox.id),
                 xmin=bbox.xmin,
                 ymin=bbox.ymin,
@@ -190,10 +528,12 @@ class Annotator:
         """
         annotation_list = list()
         for polygon in polygon_cover.polygons:
-            annotation = schemas.PolygonAnnotation(
+            annotation = schemas.PolygonAnnotation.model_construct(
                 id=str(polygon.id),
                 label=polygon.label,
+                encoding=polygon.encoding,
                 coordinates=polygon.coordinates,
+                size=polygon.size,
             )
             annotation_list.append(annotation)
         return annotation_list
@@ -202,7 +542,7 @@ class Annotator:
         self,
         frame_idx: int,
         out_object_ids: List[Union[int, str]],
-        masks: np.ndarray,
+        masks: MaskOutput,
         color_mapping: Dict[str, str],
         label_mapping: Dict[str, str],
     ) -> schemas.BboxCover:
@@ -211,7 +551,7 @@ class Annotator:
         Args:
             frame_idx (int): corresponding frame index
             out_object_ids (List[Union[str, int]]): unique object ids
-            masks (np.ndarray): segmentation masks
+            masks (MaskOutput): segmentation masks
             color_mapping (Dict[str, str]): hex color mapping of object ids
             label_mapping (Dict[str, str]): object_id -> label
 
@@ -219,56 +559,80 @@ class Annotator:
         Returns:
             schemas.BboxCover: BboxCover computed from masks
         """
-        bboxes = mask_to_xyxy(masks, normlized=True)
-        bbox_objects: List[schemas.BboxObject] = list()
-        for obj_ids, bbox in zip(out_object_ids, bboxes):
-            # print(f"{obj_ids=}, {bbox=}")
-            bbox_objects.append(
-                schemas.BboxObject(
-                    id=obj_ids,
-                    objecColor=color_mapping.get(str(obj_ids), "#FFFFFF"),
-                    xmin=bbox[0],
-                    ymin=bbox[1],
-                    xmax=bbox[2],
-                    ymax=bbox[3],
-                    normalized=True,
-                    label=label_mapping.get(str(obj_ids), None),
-                )
+        # all boxes in one reduction, converted to python floats at once
+        bboxes = masks.xyxy(normalized=True).tolist()
+        bbox_objects: List[schemas.BboxObject] = [
+            schemas.BboxObject.model_construct(
+                id=obj_ids,
+                objecColor=color_mapping.get(str(obj_ids), "#FFFFFF"),
+                xmin=xmin,
+                ymin=ymin,
+                xmax=xmax,
+                ymax=ymax,
+                normalized=True,
+                label=label_mapping.get(str(obj_ids), None),
             )
-        return schemas.BboxCover(frame_number=frame_idx, bboxes=bbox_objects)
+            for obj_ids, (xmin, ymin, xmax, ymax) in zip(out_object_ids, bboxes)
+        ]
+        return schemas.BboxCover.model_construct(frame_number=frame_idx, bboxes=bbox_objects)
 
     def export_polygon(
         self,
         frame_idx: int,
         out_object_ids: List[Union[int, str]],
-        masks: np.ndarray,
+        masks: MaskOutput,
         color_mapping: Dict[str, str],
         label_mapping: Dict[str, str],
+        polygon_options: Optional[schemas.PolygonOptions] = None,
     ) -> schemas.PolygonCover:
         polygon_objects: List[schemas.PolygonObject] = list()
+        options = polygon_options or schemas.PolygonOptions()
         for obj_id, mask in zip(out_object_ids, masks):
-            polygon = mask_to_polygons(mask, normalized=True)
+            polygon = mask_to_polygons_with_options(mask, options)
             for poly in polygon:
-                polygon_object = schemas.PolygonObject(
+                polygon_object = schemas.PolygonObject.model_construct(
                     id=obj_id,
                     objectColor=color_mapping.get(str(obj_id), "#FFFFFF"),
-                    coordinates=poly.tolist(),
-                    normalized=True,
+                    encoding=options.encoding,
+                    coordinates=encode_polygon(poly, options.encoding),
+                    normalized=options.encoding == "points",
+                    size=None if options.encoding == "points" else list(mask.shape),
                     label=label_mapping.get(str(obj_id), None),
                 )
                 polygon_objects.append(polygon_object)
-        return schemas.PolygonCover(frame_number=frame_idx, polygons=polygon_objects)
+        return schemas.PolygonCover.model_construct(
+            frame_number=frame_idx, polygons=polygon_objects
+        )
 
 
 class Worker(BaseService):
     def __init__(
-        self, logger, worker_uuid: str, src_settings: Settings = settings
+        self,
+        logger,
+        worker_uuid: str,
+        src_settings: Settings = settings,
+        model: Optional[SegmentAnything2] = None,
+        routed: bool = False,
     ) -> None:
+        """Serves a single annotation task
+
+        Args:
+            logger (CustomLogger): Logger object to log messages
+            worker_uuid (str): task uuid
+            src_settings (Settings, optional): General settings. Defaults to settings.
+            model (Optional[SegmentAnything2], optional): preloaded model of a pooled worker,
+                built from the task configuration if not given. Defaults to None.
+            routed (bool, optional): requests are routed into `request_queue` by a worker host
+                instead of being consumed from redis. Defaults to False.
+        """
         logger.success(f"Worker {worker_uuid} started!")
         super().__init__(src_settings, logger)
 
         self.uuid = worker_uuid
         self.settings = src_settings
+        self.routed = routed
+        # raw requests routed by the worker host
+        self.request_queue: queue.Queue[bytes] = queue.Queue()
 
         self.redis = RedisClient(config=self.settings)
 
@@ -285,26 +649,47 @@ class Worker(BaseService):
                 config=self.settings
             ),  # create new redis connection
             logger=logger,
+            batch_size=self.settings.ANNOTATION_WRITE_BATCH_SIZE,
+            track_tolerance=(
+                self.settings.ANNOTATION_TRACK_TOLERANCE
+                if self.settings.ANNOTATION_TRACK_COMPRESSION
+                else None
+            ),
+            track_max_span=self.settings.ANNOTATION_TRACK_MAX_SPAN,
         )
 
-        self.model: SegmentAnything2 = SegmentAnything2(
-            model_path=self.config.task.ai_model.checkpoint_path,  # type: ignore
-            model_config=self.config.task.ai_model.config_path,  # type: ignore
-        )
+        self.start_mode = "cold" if model is None else "pooled"
+        if model is None:
+            model = SegmentAnything2(
+                model_path=self.config.task.ai_model.checkpoint_path,  # type: ignore
+                model_config=self.config.task.ai_model.config_path,  # type: ignore
+                frame_window_size=self.settings.FRAME_WINDOW_SIZE,
+                frame_read_ahead=self.settings.FRAME_READ_AHEAD,
+                feature_cache=build_feature_cache(
+                    self.config.task.ai_model, self.settings  # type: ignore
+                ),
+            )
+        self.model: SegmentAnything2 = model
 
         # update status while loading the video
         self.redis.set(self.status_key, enums.TaskStatus.LOADING_VIDEO.value)
         try:
             self.model.init_state(video_dir=self.config.task.video.frames_path)  # type: ignore
             self.redis.set(self.status_key, enums.TaskStatus.READY.value)
+            self.report_time_to_ready()
         except Exception as err:
             self.redis.set(self.status_key, enums.TaskStatus.FAILED.value)
             raise Exception(f"Error initializing model: {err}")
 
-        self.request_queue = queue.Queue()
-        self.response_queue: queue.Queue[
-            Union[schemas.SingleFrameResponseCover, schemas.ErrorResponseCover]
-        ] = queue.Queue()
+        # bounded, interactive responses block when full, propagation previews are coalesced
+        self.response_queue = ResponseQueue(
+            maxsize=self.settings.RESPONSE_QUEUE_MAX_SIZE,
+            max_coalesced=self.settings.RESPONSE_QUEUE_MAX_PREVIEWS,
+            is_coalescible=self._is_preview_frame,
+        )
+        # last known length of the redis response list
+        self.response_list_length: int = 0
+        self.dropped_previews: int = 0
         self.__init_additional_threads()
 
         # to store object ids and the frame numbers they in it
@@ -315,6 +700,32 @@ class Worker(BaseService):
         )
         self._inference_run: bool = False
 
+        # propagation cancellation
+        self.cancel_event = threading.Event()
+        self.propagation_active = threading.Event()
+        self.preempt_on_prompt: bool = self.settings.PROPAGATION_PREEMPT_ON_PROMPT
+        # post-processing stage of the propagation (contours, encoding, annotation export)
+        self.post_process_pool = ThreadPoolExecutor(
+            max_workers=max(self.settings.PROPAGATION_POST_PROCESS_WORKERS, 1),
+            thread_name_prefix="PostProcess",
+        )
+        # decoded original frames shared by thumbnails and frame renders
+        self.frame_cache = LRUCache(max_bytes=self.settings.FRAME_CACHE_MAX_BYTES)
+        # object id -> version of its masks, bumped whenever the masks may change
+        self.object_versions: Dict[str, int] = dict()
+        # rendered frames by (frame, object versions and colors, scale)
+        self.overlay_cache = LRUCache(
+            max_bytes=self.settings.OVERLAY_CACHE_MAX_BYTES,
+            sizeof=lambda frame_cover: len(frame_cover.image_base64),
+        )
+        # multi-frame response envelopes for propagation frames
+        self.frame_envelope: bool = self.settings.RESPONSE_FRAME_ENVELOPE
+        # "binary" moves images and masks out of the json into raw segments
+        self.wire_format: Literal["json", "binary"] = self.settings.RESPONSE_WIRE_FORMAT
+        # run_inference requests queued or running, cancel requests are ignored otherwise
+        self.pending_runs: int = 0
+        self.pending_runs_lock = threading.Lock()
+
     @property
     def inference_run(self) -> bool:
         return self._inference_run
@@ -365,6 +776,7 @@ class Worker(BaseService):
         self.redis.set(self.status_key, value.value)
 
     def __init_additional_threads(self) -> None:
+        self.add_thread(target=self.request_intake, name="RequestIntake Thread")
         self.add_thread(target=self.task_consumer, name="TaskConsumer Thread")
         self.add_thread(target=self.response_publisher, name="ResponsePublisher Thread")
 
@@ -374,7 +786,22 @@ class Worker(BaseService):
         # task_keys = self.redis.get_keys_with_pattern(f"task:{self.uuid}:*")
         # for key in task_keys:
         #    self.redis.set_expiration(key=key, ttl=60 * 5)
-        return super().stop()
+        stopped = super().stop()
+        self.post_process_pool.shutdown(wait=True)
+        self.annotator.close()
+        return stopped
+
+    def report_time_to_ready(self) -> None:
+        """Stores and logs the time passed between the init request and the READY status"""
+        requested_at = self.redis.get(f"task:{self.uuid}:requested_at")
+        if requested_at is None:
+            return
+        elapsed = time.time() - float(requested_at)
+        self.redis.set(
+            f"task:{self.uuid}:time_to_ready",
+            json.dumps({"seconds": round(elapsed, 3), "start_mode": self.start_mode}),
+        )
+        self.log.info(f"Task ready in {elapsed:.2f} seconds ({self.start_mode} start)")
 
     def get_worker_config(self) -> Optional[schemas.Intercom]:
         trial_count = 0
@@ -392,20 +819,40 @@ class Worker(BaseService):
                 return None
 
     def response_publisher(self) -> None:
+        """Blocks until a response is queued, then publishes everything queued so far
+        in one pipelined flush"""
         while not self.stop_event.is_set():
             try:
-                response = self.response_queue.get(block=False)
+                response = self.response_queue.get(timeout=0.5)
             except queue.Empty:
-                time.sleep(0.5)
                 continue
-            if response is None:
-                time.sleep(0.5)
+            responses = [response]
+            while len(responses) < self.settings.RESPONSE_PUBLISH_MAX_BATCH:
+                try:
+                    responses.append(self.response_queue.get_nowait())
+                except queue.Empty:
+                    break
+            responses = [r for r in responses if r is not None]
+            if not responses:
                 continue
-            is_published = self.publish_response(response)
+            is_published = self.publish_responses(responses)
             if not is_published:
-                self.log.error(f"Error publishing response: {response}")
+                self.log.error(f"Error publishing {len(responses)} responses")
                 continue
-            self.log.success(f"Published response: {response.msg_type}")
+            self.log.success(
+                f"Published responses: {', '.join(r.msg_type for r in responses)}"
+            )
+
+    def queue_response(self, response: schemas.ResponseCover) -> None:
+        """Queues a response for the publisher. The response keeps the wire format of the
+        task it was built for, its payloads are encoded for it (see `encode_payload`),
+        the format may have changed by the time the publisher serializes it.
+
+        Args:
+            response (schemas.ResponseCover): response to be delivered
+        """
+        response._wire_format = self.wire_format
+        self.response_queue.put(response)
 
     def publish_response(self, response: schemas.ResponseCover) -> bool:
         """Publish single processed response to the response queue
@@ -413,24 +860,173 @@ class Worker(BaseService):
         Args:
             response (schemas.ResponseCover): Created response object to be delivered
 
+        Returns:
+            bool: True if published successfully, False otherwise
+        """
+        return self.publish_responses([response])
+
+    def publish_responses(self, responses: List[schemas.ResponseCover]) -> bool:
+        """Publish processed responses to the response queue in one round trip
+
+        Args:
+            responses (List[schemas.ResponseCover]): responses in delivery order
+
         Returns:
             bool: True if published successfully, False otherwise
         """
         try:
-            is_publihsed = self.redis.queue(
-                self.response_key, response.model_dump_json()
+            previews = [r for r in responses if self._is_preview_frame(r)]
+            if previews and self.is_response_list_full():
+                # consumer is behind, previews are skipped, annotations are exported anyway
+                responses = [r for r in responses if not self._is_preview_frame(r)]
+                self.dropped_previews += len(previews)
+                self.log.debug(
+                    f"Response list is full, skipped {len(previews)} previews "
+                    f"({self.dropped_previews} in total)"
+                )
+                if not responses:
+                    return True
+
+            list_length = self.redis.queue_many(
+                self.response_key,
+                self.serialize_responses(responses),
+                ttl=self.settings.RESPONSE_LIST_TTL,
             )
-            if not is_publihsed:
+            if not list_length:
                 self.log.error("Error publishing response")
                 return False
+            self.response_list_length = list_length
             return True
         except Exception as e:
             self.log.critical(f"Error publishing response: {e}")
             return False
 
-    def consume_requests(self) -> Optional[schemas.ResponseCover]:
+    def serialize_responses(
+        self, responses: List[schemas.ResponseCover]
+    ) -> List[bytes]:
+        """Serializes responses in the wire format they were queued with, consecutive
+        propagation frames of the same format are packed into multi-frame envelopes if
+        enabled for the task. An envelope is closed when
+        it reaches RESPONSE_ENVELOPE_MAX_FRAMES frames or RESPONSE_ENVELOPE_MAX_BYTES, so the
+        number of frames per message adapts to the frame payload size.
+
+        Args:
+            responses (List[schemas.ResponseCover]): responses in delivery order
+
+        Returns:
+            List[bytes]: serialized messages in delivery order,
+                json or binary messages (see `utils.binary_envelope`)
+        """
+        messages: List[bytes] = []
+        envelope: List[bytes] = []
+        envelope_size = 0
+        envelope_format = self.wire_format
+
+        def close_envelope() -> None:
+            nonlocal envelope_size
+            if envelope:
+                # frames are serialized once and joined into the envelope
+                if envelope_format == "binary":
+                    messages.append(encode_binary_envelope(envelope))
+                else:
+                    messages.append(
+                        b'{"msg_type":"frames","data":[%s],"error":null,"meta":{"count":%d},"message":null}'
+                        % (b",".join(envelope), len(envelope))
+                    )
+                envelope.clear()
+                envelope_size = 0
+
+        for response in responses:
+            wire_format = response._wire_format or self.wire_format
+            message = self.serialize_response(response, wire_format)
+            if not (self.frame_envelope and self._is_propagation_frame(response)):
+                close_envelope()
+                messages.append(message)
+                continue
+            if envelope and (
+                wire_format != envelope_format
+                or len(envelope) >= self.settings.RESPONSE_ENVELOPE_MAX_FRAMES
+                or envelope_size + len(message) > self.settings.RESPONSE_ENVELOPE_MAX_BYTES
+            ):
+                close_envelope()
+            envelope.append(message)
+            envelope_size += len(message)
+            envelope_format = wire_format
+        close_envelope()
+        return messages
+
+    def encode_payload(self, data: bytes) -> Union[str, bytes]:
+        """Encoded images and masks of responses are kept as raw bytes with the binary wire
+        format, they become segments without a base64 round trip, base64 otherwise.
+        Responses are built and queued within their task, the format changes only when
+        the next task starts, `queue_response` keeps it on the response.
+
+        Args:
+            data (bytes): encoded image or packed mask bits
+
+        Returns:
+            Union[str, bytes]: raw bytes or base64 string
+        """
+        if self.wire_format == "binary":
+            return data
+        return base64.b64encode(data).decode("utf-8")
+
+    def serialize_response(
+        self, response: schemas.ResponseCover, wire_format: Literal["json", "binary"]
+    ) -> bytes:
+        if wire_format == "binary":
+            # raw image and mask bytes of the response are carried into the segments
+            return encode_binary_message(response.model_dump())
+        return dump_json_bytes(response)
+
+    @staticmethod
+    def _is_propagation_frame(response: schemas.ResponseCover) -> bool:
+        return isinstance(response, schemas.SingleFrameResponseCover) and bool(
+            response.meta.get("propagation")
+        )
+
+    def _is_preview_frame(self, response: Optional[schemas.ResponseCover]) -> bool:
+        """Propagation frames of the coalescible types, they can be dropped for newer ones"""
+        return (
+            response is not None
+            and self._is_propagation_frame(response)
+            and response.msg_type in self.settings.RESPONSE_COALESCE_TYPES
+            # a dropped delta frame would leave consumers out of sync until the next keyframe
+            and not response.meta.get("delta")
+        )
+
+    def is_response_list_full(self) -> bool:
+        """Checks the redis response list against RESPONSE_LIST_MAX_LENGTH. The length
+        returned by the last push is used while it is below the bound, the list is
+        queried only when it may be full."""
+        if self.response_list_length < self.settings.RESPONSE_LIST_MAX_LENGTH:
+            return False
+        list_length = self.redis.queue_length(self.response_key)
+        if list_length is not None:
+            self.response_list_length = list_length
+        return self.response_list_length >= self.settings.RESPONSE_LIST_MAX_LENGTH
+
+    def consume_requests(self, timeout: Optional[int] = None) -> Optional[schemas.ResponseCover]:
+        """Takes the next request of the task
+
+        Args:
+            timeout (Optional[int], optional): seconds to block waiting for a request (BRPOP),
+                non-blocking if None. Defaults to None.
+
+        Returns:
+            Optional[schemas.ResponseCover]: validated request, None if there is no valid request
+        """
         try:
-            msg = self.redis.dequeue(self.request_key, count=1)
+            if self.routed:
+                msg = [self.request_queue.get(block=timeout is not None, timeout=timeout)]
+            elif timeout is not None:
+                response = self.redis.dequeue(self.request_key, timeout=timeout)
+                # blocking pop returns [queue_name, value]
+                msg = response[1:] if response else None
+            else:
+                msg = self.redis.dequeue(self.request_key, count=1)
+        except queue.Empty:
+            return None
         except Exception as e:
             self.log.critical(f"Error consuming request: {e}")
             return None
@@ -438,7 +1034,7 @@ class Worker(BaseService):
             return None
         try:
             # validate message
-            task, is_valid = validate_request(json.loads(msg[0].decode("utf-8")))
+            task, is_valid = validate_request(msg[0])
             if not is_valid:
                 self.log.error(f"Invalid message: {task}")
                 return None
@@ -459,18 +1055,54 @@ class Worker(BaseService):
             if obj_id not in self.objects:
                 self.objects[str(obj_id)] = set()
             self.objects[str(obj_id)].add(frame_idx)
+        self.bump_object_versions(object_ids)
 
         self.annotated_frames.update({frame_idx: point_prompts})
 
-    def task_consumer(self) -> None:
+    def request_intake(self) -> None:
+        """Consumes requests while the task consumer is busy so that a running propagation
+        can be cancelled or preempted by a point prompt"""
         while not self.stop_event.is_set():
-            task = self.consume_requests()
+            # blocks until a request arrives, timeout only bounds the reaction to stop
+            task = self.consume_requests(timeout=self.settings.REQUEST_BLOCK_TIMEOUT)
             if task is None:
-                time.sleep(0.2)
+                continue
+
+            if isinstance(task, schemas.CancelTaskInputCover):
+                with self.pending_runs_lock:
+                    if self.pending_runs > 0:
+                        self.log.warning("Cancelling video inference")
+                        self.cancel_event.set()
+                    else:
+                        self.log.warning("No video inference to cancel")
+                continue
+
+            if isinstance(task, schemas.RunInferenceInputCover):
+                with self.pending_runs_lock:
+                    self.pending_runs += 1
+            elif (
+                isinstance(task, schemas.SingleFramePointPromptInputCover)
+                and self.propagation_active.is_set()
+                and self.preempt_on_prompt
+            ):
+                self.log.warning("Video inference preempted by point prompt")
+                self.cancel_event.set()
+            self.task_queue.put(task)
+
+    def task_consumer(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                task = self.task_queue.get(timeout=0.2)
+            except queue.Empty:
                 continue
 
             try:
                 self.status = enums.TaskStatus.BUSY
+                if isinstance(task.meta, dict) and task.meta.get("wireFormat") in (
+                    "json",
+                    "binary",
+                ):
+                    self.wire_format = task.meta["wireFormat"]
                 if isinstance(task, schemas.SingleFramePointPromptInputCover):
                     if self.inference_run:
                         # todo: soft reset state
@@ -478,13 +1110,19 @@ class Worker(BaseService):
                     single_frame_response_cover = (
                         self._process_single_frame_point_prompt(task=task)
                     )
-                    self.response_queue.put(single_frame_response_cover)
+                    self.queue_response(single_frame_response_cover)
                     self.log.success(f"Processed {len(task.data)} annotations.")
 
                 elif isinstance(task, schemas.RunInferenceInputCover):
+                    self.preempt_on_prompt = task.meta.get(
+                        "preemptOnPrompt", self.settings.PROPAGATION_PREEMPT_ON_PROMPT
+                    )
+                    self.frame_envelope = task.meta.get(
+                        "frameEnvelope", self.settings.RESPONSE_FRAME_ENVELOPE
+                    )
                     if not self.objects:
                         self.log.error("No objects to run inference")
-                        self.response_queue.put(
+                        self.queue_response(
                             schemas.ErrorResponseCover(
                                 message="No objects to run inference",
                                 error={"message": "No objects to run inference"},
@@ -505,26 +1143,43 @@ class Worker(BaseService):
                     self.model.reset_state()
                     self.objects.clear()
                     self.annotated_frames.clear()
+                    self.object_versions.clear()
+                    self.overlay_cache.clear()
                     self.status = enums.TaskStatus.READY
 
+                elif isinstance(task, schemas.GetFrameInputCover):
+                    self._process_get_frame(task=task)
+
             except Exception as e:
                 self.log.error(f"Error processing task: {e}")
-                self.response_queue.put(
+                self.queue_response(
                     schemas.ErrorResponseCover(
                         message="Error processing task", error={"message": str(e)}
                     )
                 )
             finally:
+                if isinstance(task, schemas.RunInferenceInputCover):
+                    with self.pending_runs_lock:
+                        self.pending_runs -= 1
+                        # a cancel or preemption stops the run it arrived during,
+                        # runs queued behind it start clean
+                        self.cancel_event.clear()
                 self.status = enums.TaskStatus.READY
 
     def soft_reset_worker(self) -> None:
         """Soft resets worker. When user wants to add new object to the video after tracking completed,
         model_state should be reseted however this operation removes all objects from the video.
 
-        With soft reset inference, all points re-added to model and user can continue to annotate
+        With soft reset, the prompt-only state snapshotted before the propagation is restored.
+        If no snapshot exists, all points are re-added to the model and user can continue to annotate
         """
         self.status = enums.TaskStatus.BUSY
 
+        if self.model.restore_prompt_state():
+            self.log.debug("Restored prompt state snapshot")
+            self.inference_run = False
+            return
+
         # temp point prompts from history
         tasks = []
         for frame_idx, point_prompts in self.annotated_frames.items():
@@ -562,7 +1217,7 @@ class Worker(BaseService):
             out_frame_idx = frame_idx
             out_object_ids = []
             # get empty mask [1, H, W]
-            masks = np.zeros((1, self.video_h, self.video_w), dtype=np.int64)
+            masks = MaskOutput.zeros(1, self.video_h, self.video_w)
             self.log.critical(f"No point prompt passed for frame {frame_idx}")
         else:
             out_frame_idx, out_object_ids, masks = self.process_annotation_object(
@@ -596,20 +1251,20 @@ class Worker(BaseService):
         if is_thumbnail_required:
             
             thumbnails: Dict[str, str] = dict()
-            for obj_id, mask in zip(out_object_ids, masks):
-                try:
-                    thumbnail = self.get_thumbnail_from_mask(
-                        original_image=self.get_original_image(frame_idx=out_frame_idx),
-                        mask=mask,
-                        scale=0.5,
-                        return_type="base64",
-                    )
-                    if isinstance(thumbnail, str):
-                        thumbnails[str(obj_id)] = thumbnail
-                except:
+            try:
+                # one decode and one bbox reduction for all objects
+                original_image = self.get_original_image(frame_idx=out_frame_idx)
+                object_thumbnails = self.get_thumbnails_from_masks(
+                    original_image=original_image, masks=masks, scale=0.5
+                )
+            except:
+                self.log.error(f"Error getting thumbnails for frame: {out_frame_idx}")
+                object_thumbnails = [None] * len(out_object_ids)
+            for obj_id, thumbnail in zip(out_object_ids, object_thumbnails):
+                if thumbnail is None:
                     self.log.error(f"Error getting thumbnail for object: {obj_id}")
-                    thumbnails[str(obj_id)] = self.get_fallback_thumbnail()
-                # print(f"{obj_id=}, {thumbnail=}")
+                    thumbnail = self.get_fallback_thumbnail()
+                thumbnails[str(obj_id)] = thumbnail
             single_frame_response_cover.meta["objectThumbnails"] = thumbnails
         return single_frame_response_cover
 
@@ -619,37 +1274,190 @@ class Worker(BaseService):
 
         post_process_return_type = task.meta.get("returnType", "mask")
         self.log.warning(f"Starting video inference with {post_process_return_type=}")
-        c = 0
-        for out_frame_idx, out_obj_ids, masks in self.model.run_inference():
+        if not self.inference_run:
+            # state still holds prompts only, kept for soft resets after the propagation
+            self.model.snapshot_prompt_state()
+        # propagation changes the masks of all objects
+        self.bump_object_versions(list(self.objects.keys()))
+        processed_frames = 0
+        last_frame_idx: Optional[int] = None
+        cancelled = False
+        color_mapping = self._get_id_color_mapping(task)
+        max_in_flight = max(self.settings.PROPAGATION_MAX_IN_FLIGHT, 1)
+        # frames being post-processed in the pool, in frame order
+        pending: Deque[Tuple[int, Future]] = deque()
+        # delta mode, frames are compared in delivery order before post-processing
+        delta_tracker = self._get_delta_tracker(task, post_process_return_type)
+
+        def emit_next() -> None:
+            nonlocal processed_frames, last_frame_idx
+            frame_idx, future = pending.popleft()
+            self.queue_response(future.result())
+            # bbox tracks are built in frame order
+            self.annotator.commit_frame(frame_idx)
+            processed_frames += 1
+            last_frame_idx = frame_idx
+
+        self.propagation_active.set()
+        frames = self.model.run_inference(
+            start_frame_idx=task.meta.get("startFrame"),
+            max_frame_num_to_track=task.meta.get("maxFrameCount"),
+            direction=task.meta.get("direction", "forward"),
+        )
+        try:
+            # the model computes the next frame while previous frames are post-processed
+            for out_frame_idx, out_obj_ids, masks in frames:
+                delta = (
+                    delta_tracker.update(out_frame_idx, out_obj_ids, masks)
+                    if delta_tracker is not None
+                    else None
+                )
+                future = self.post_process_pool.submit(
+                    self._post_process_propagation_frame,
+                    frame_idx=out_frame_idx,
+                    out_object_ids=out_obj_ids,
+                    masks=masks,
+                    return_type=post_process_return_type,
+                    color_mapping=color_mapping,
+                    task=task,
+                    delta=delta,
+                )
+                pending.append((out_frame_idx, future))
+                # bounded window, the model waits for the oldest frame if it runs ahead
+                while len(pending) >= max_in_flight:
+                    emit_next()
+                while pending and pending[0][1].done():
+                    emit_next()
+                # stop between frames, frames processed so far are kept
+                if self.cancel_event.is_set():
+                    cancelled = True
+                    break
+            while pending:
+                emit_next()
+        finally:
+            for _, future in pending:
+                future.cancel()
+            frames.close()
+            self.propagation_active.clear()
+            # annotations are complete before the status changes
+            self.annotator.flush()
+
+        if cancelled:
+            self.annotator.status = enums.AnnotationStatusEnum.CANCELLED
+            self.queue_response(
+                schemas.ResponseCover(
+                    msg_type="cancelled",
+                    message="Video inference cancelled",
+                    meta={
+                        "processedFrames": processed_frames,
+                        "lastFrame": last_frame_idx,
+                    },
+                )
+            )
+            self.log.warning(
+                f"Video inference cancelled after {processed_frames} frames"
+            )
+        else:
+            self.annotator.status = enums.AnnotationStatusEnum.READY
+            self.log.success(f"Processed video inference")
+        self.status = enums.TaskStatus.READY
+
+    def _post_process_propagation_frame(
+        self,
+        frame_idx: int,
+        out_object_ids: List[Union[int, str]],
+        masks: MaskOutput,
+        return_type: str,
+        color_mapping: Dict[str, str],
+        task: schemas.RunInferenceInputCover,
+        delta: Optional[MaskDelta] = None,
+    ) -> schemas.SingleFrameResponseCover:
+        """Post-processing stage of the propagation, runs in the post-processing pool
+
+        Args:
+            frame_idx (int): propagated frame index
+            out_object_ids (List[Union[int, str]]): object ids of the frame
+            masks (MaskOutput): segmentation masks of the frame
+            return_type (str): requested response type
+            color_mapping (Dict[str, str]): object_id -> color(hex)
+            task (schemas.RunInferenceInputCover): run inference request
+            delta (Optional[MaskDelta], optional): objects to respond with in delta mode,
+                all objects if not given. Annotations always keep all objects. Defaults to None.
+
+        Returns:
+            schemas.SingleFrameResponseCover: response of the frame
+        """
+        meta: Dict[str, Any] = {"propagation": True}
+        if delta is not None:
+            meta.update(delta.meta())
+
+        if delta is not None and len(delta.changed) < len(out_object_ids):
+            # annotations first, the subset reuses the host copy of the masks
+            self._export_frame_annotation(
+                frame_idx=frame_idx,
+                out_object_ids=out_object_ids,
+                masks=masks,
+                color_mapping=color_mapping,
+                task=task,
+            )
+            processed_output = self.post_process_segmentation(
+                frame_idx=frame_idx,
+                out_object_ids=[out_object_ids[i] for i in delta.changed],
+                masks=masks[delta.changed],
+                return_type=return_type,  # type: ignore
+                task=task,
+            )
+        else:
             processed_output = self.post_process_segmentation(
-                frame_idx=out_frame_idx,
-                out_object_ids=out_obj_ids,
+                frame_idx=frame_idx,
+                out_object_ids=out_object_ids,
                 masks=masks,
-                return_type=post_process_return_type,
+                return_type=return_type,  # type: ignore
                 task=task,
             )
-            # remember: now return single frame response on video processing -> can be changed
-            self.response_queue.put(
-                schemas.SingleFrameResponseCover(
-                    msg_type=post_process_return_type, data=processed_output
-                )
+            # bboxes or polygons of the response are reused for the annotation
+            self._export_frame_annotation(
+                frame_idx=frame_idx,
+                out_object_ids=out_object_ids,
+                masks=masks,
+                color_mapping=color_mapping,
+                task=task,
+                bbox_cover=processed_output if return_type == "bbox" else None,
+                polygon_cover=processed_output if return_type == "polygon" else None,
             )
 
-            # export annotation to redis
-            is_cached = self.annotator(
-                segmentation_masks=masks,
-                object_ids=out_obj_ids,
-                color_mapping=self._get_id_color_mapping(task),
-                frame_idx=out_frame_idx,
-            )
-            if is_cached:
-                self.log.success(f"Exported annotation for frame {out_frame_idx}")
-            else:
-                self.log.error(f"Error exporting annotation for frame {out_frame_idx}")
+        # remember: now return single frame response on video processing -> can be changed
+        return schemas.SingleFrameResponseCover.model_construct(
+            msg_type=return_type,  # type: ignore
+            data=processed_output,
+            meta=meta,
+        )
 
-        self.annotator.status = enums.AnnotationStatusEnum.READY
-        self.status = enums.TaskStatus.READY
-        self.log.success(f"Processed video inference")
+    def _export_frame_annotation(
+        self,
+        frame_idx: int,
+        out_object_ids: List[Union[int, str]],
+        masks: MaskOutput,
+        color_mapping: Dict[str, str],
+        task: schemas.RunInferenceInputCover,
+        bbox_cover: Optional[schemas.BboxCover] = None,
+        polygon_cover: Optional[schemas.PolygonCover] = None,
+    ) -> None:
+        # export annotation to redis
+        is_cached = self.annotator(
+            segmentation_masks=masks,
+            object_ids=out_object_ids,
+            color_mapping=color_mapping,
+            frame_idx=frame_idx,
+            export_type=self.settings.ANNOTATION_EXPORT_TYPE,
+            polygon_options=self._get_polygon_options(task),
+            bbox_cover=bbox_cover,
+            polygon_cover=polygon_cover,
+        )
+        if is_cached:
+            self.log.success(f"Queued annotation for frame {frame_idx}")
+        else:
+            self.log.error(f"Error exporting annotation for frame {frame_idx}")
 
     def _process_remove_object(self, task: schemas.RemoveObjectInputCover) -> None:
         self.status = enums.TaskStatus.BUSY
@@ -657,7 +1465,7 @@ class Worker(BaseService):
         # check all objects exists
         if not all(obj_id in self.objects.keys() for obj_id in object_ids_to_remove):
             self.log.error(f"Invalid object ids: {object_ids_to_remove}")
-            self.response_queue.put(
+            self.queue_response(
                 schemas.ErrorResponseCover(
                     message="Invalid object ids to remove. Some objects do not exist",
                     error={"object_ids": object_ids_to_remove},
@@ -678,6 +1486,7 @@ class Worker(BaseService):
                         self.model.remove_object(object_id=obj_id)
                         break
             self.objects.pop(obj_id)
+            self.object_versions.pop(str(obj_id), None)
 
         # run inference for all remaining objects
         recursive_tasks: List[Tuple[int, schemas.SingleFramePointPromptInputCover]] = []
@@ -704,7 +1513,7 @@ class Worker(BaseService):
                 task=rec_task[1],
                 frame_idx=rec_task[0],
             )
-            self.response_queue.put(single_frame_response_cover)
+            self.queue_response(single_frame_response_cover)
 
             # convert masks into images and encode (base64)
             # print(f"{out_object_ids=}, {masks=}")
@@ -715,8 +1524,8 @@ class Worker(BaseService):
         self,
         frame_idx: int,
         out_object_ids: List[Union[int, str]],
-        masks: np.ndarray,
-        return_type: Literal["polygon", "mask", "frame"] = "mask",
+        masks: MaskOutput,
+        return_type: Literal["polygon", "mask", "rle", "bitmask", "frame", "bbox"] = "mask",
         task: Optional[schemas.ResponseCover] = None,
     ):
         if isinstance(task, schemas.ResponseCover):
@@ -735,6 +1544,13 @@ class Worker(BaseService):
             return self._post_process_segmentation_masks(
                 frame_idx=frame_idx, out_object_ids=out_object_ids, masks=masks
             )
+        elif return_type == "rle" or return_type == "bitmask":
+            return self._post_process_encoded_masks(
+                frame_idx=frame_idx,
+                out_object_ids=out_object_ids,
+                masks=masks,
+                encoding=return_type,
+            )
         elif return_type == "frame":
             return self._post_process_segmentation_frame(
                 frame_idx=frame_idx,
@@ -756,21 +1572,41 @@ class Worker(BaseService):
         self,
         frame_idx: int,
         out_object_ids: List[Union[int, str]],
-        masks: np.ndarray,
+        masks: MaskOutput,
         color_mapping: Dict[str, str],
         task: schemas.SingleFramePointPromptInputCover,
     ) -> Optional[schemas.FrameCover]:
-        """Visualize segmentation masks on the frame
+        """Visualize segmentation masks on the frame. Renders are cached by frame,
+        object versions, colors and scale.
 
         Args:
             frame_idx (int): _description_
             out_object_ids (List[Union[int, str]]): _description_
-            masks (np.ndarray): _description_
+            masks (MaskOutput): _description_
             task (Optional[schemas.SingleFramePointPromptInputCover]): _description_
 
         Returns:
             schemas.FrameCover: _description_
         """
+        scale = self._get_render_scale(task)
+        overlay_key = self._get_overlay_key(frame_idx, out_object_ids, color_mapping, scale)
+        frame_cover = self.overlay_cache.get(overlay_key)
+        if frame_cover is None:
+            frame_cover = self._render_segmentation_frame(
+                frame_idx, out_object_ids, masks, color_mapping, scale
+            )
+            if frame_cover is not None:
+                self.overlay_cache.put(overlay_key, frame_cover)
+        return frame_cover
+
+    def _render_segmentation_frame(
+        self,
+        frame_idx: int,
+        out_object_ids: List[Union[int, str]],
+        masks: MaskOutput,
+        color_mapping: Dict[str, str],
+        scale: Optional[float],
+    ) -> Optional[schemas.FrameCover]:
         """
         - original frame required
         """
@@ -778,34 +1614,171 @@ class Worker(BaseService):
             original_frame = self.get_original_image(frame_idx=frame_idx)
             # original_frame = cv.cvtColor(original_frame, cv.COLOR_BGR2RGB)
 
+            # downscale before compositing, masks are resized on their device
+            if scale is not None:
+                h, w = original_frame.shape[:2]
+                size = (max(int(round(w * scale)), 1), max(int(round(h * scale)), 1))
+                original_frame = cv.resize(original_frame, size, interpolation=cv.INTER_AREA)
+                frame_masks = masks.resize(height=size[1], width=size[0])
+            else:
+                frame_masks = masks.numpy()
+
             obj_id_mask_mapping: Dict[str, np.ndarray] = {
-                str(obj_id): mask for obj_id, mask in zip(out_object_ids, masks)
+                str(obj_id): mask for obj_id, mask in zip(out_object_ids, frame_masks)
             }
 
             visu = draw_masks_on_image(
                 original_frame, masks=obj_id_mask_mapping, color=color_mapping
             )
 
-            scale = task.meta.get("scale")
-            if scale and isinstance(scale, (int, float)) and (0 < scale < 1):
-                visu = cv.resize(visu, (0, 0), fx=float(scale), fy=float(scale))
-
-            return schemas.FrameCover(
+            return schemas.FrameCover.model_construct(
                 frame_number=frame_idx,
-                image_base64=image_to_base64(visu, encode=True),
+                image_base64=self.encode_payload(encode_image(visu, encode=True)),
                 objects=[
-                    schemas.FrameObject(
+                    schemas.FrameObject.model_construct(
                         id=str(obj_id), objectColor=color_mapping[str(obj_id)]
                     )
                     for obj_id in out_object_ids
                 ],
             )
 
+    @staticmethod
+    def _get_render_scale(task: Optional[schemas.ResponseCover]) -> Optional[float]:
+        scale = task.meta.get("scale") if task is not None and task.meta else None
+        if scale and isinstance(scale, (int, float)) and (0 < scale < 1):
+            return float(scale)
+        return None
+
+    def _get_polygon_options(
+        self, task: Optional[schemas.ResponseCover]
+    ) -> schemas.PolygonOptions:
+        """Polygon options from the `polygon` request meta over the POLYGON_* defaults"""
+        defaults = schemas.PolygonOptions(
+            epsilon=self.settings.POLYGON_EPSILON,
+            minArea=self.settings.POLYGON_MIN_AREA,
+            externalOnly=self.settings.POLYGON_EXTERNAL_ONLY,
+            encoding=self.settings.POLYGON_ENCODING,
+        )
+        meta = task.meta if task is not None and isinstance(task.meta, dict) else dict()
+        if not isinstance(meta.get("polygon"), dict):
+            return defaults
+        try:
+            return schemas.PolygonOptions(**{**defaults.model_dump(), **meta["polygon"]})
+        except ValidationError as e:
+            self.log.warning(f"Invalid polygon options, using defaults: {e}")
+            return defaults
+
+    def _get_delta_tracker(
+        self, task: schemas.RunInferenceInputCover, return_type: str
+    ) -> Optional[MaskDeltaTracker]:
+        """Delta mode tracker from the `delta` request meta over the PROPAGATION_DELTA_*
+        defaults, None if delta mode is off"""
+        defaults = schemas.DeltaOptions(
+            enabled=self.settings.PROPAGATION_DELTA,
+            iouThreshold=self.settings.PROPAGATION_DELTA_IOU_THRESHOLD,
+            pixelThreshold=self.settings.PROPAGATION_DELTA_PIXEL_THRESHOLD,
+            keyframeInterval=self.settings.PROPAGATION_DELTA_KEYFRAME_INTERVAL,
+        )
+        options = defaults
+        meta = task.meta if isinstance(task.meta, dict) else dict()
+        if isinstance(meta.get("delta"), dict):
+            try:
+                options = schemas.DeltaOptions(**{**defaults.model_dump(), **meta["delta"]})
+            except ValidationError as e:
+                self.log.warning(f"Invalid delta options, using defaults: {e}")
+        if not options.enabled:
+            return None
+        if return_type == "frame":
+            # rendered frames change with the video even if the objects do not
+            self.log.warning("Delta mode is not supported for frame responses")
+            return None
+        return MaskDeltaTracker(
+            iou_threshold=options.iouThreshold,
+            pixel_threshold=options.pixelThreshold,
+            keyframe_interval=options.keyframeInterval,
+        )
+
+    def bump_object_versions(self, object_ids: List[Union[int, str]]) -> None:
+        """Marks the masks of the objects as changed, cached renders of them are not used again"""
+        for obj_id in object_ids:
+            self.object_versions[str(obj_id)] = self.object_versions.get(str(obj_id), 0) + 1
+
+    def _get_overlay_key(
+        self,
+        frame_idx: int,
+        object_ids: List[Union[int, str]],
+        color_mapping: Dict[str, str],
+        scale: Optional[float],
+    ) -> Tuple:
+        return (
+            # renders hold raw bytes or base64 depending on the wire format
+            self.wire_format,
+            frame_idx,
+            tuple(
+                (
+                    str(obj_id),
+                    self.object_versions.get(str(obj_id), 0),
+                    color_mapping.get(str(obj_id)),
+                )
+                for obj_id in object_ids
+            ),
+            scale,
+        )
+
+    def _process_get_frame(self, task: schemas.GetFrameInputCover) -> None:
+        """Returns the rendered frame of already predicted masks. Cached renders are
+        returned without touching the model or OpenCV."""
+        frame_idx = task.meta.get("frameNumber")
+        if not isinstance(frame_idx, int) or not task.data:
+            self.queue_response(
+                schemas.ErrorResponseCover(
+                    message="get_frame requires frameNumber and objects",
+                    error={"frameNumber": frame_idx},
+                )
+            )
+            return
+
+        color_mapping = self._get_id_color_mapping(task)
+        object_ids: List[Union[int, str]] = [obj.id for obj in task.data]
+        scale = self._get_render_scale(task)
+        overlay_key = self._get_overlay_key(frame_idx, object_ids, color_mapping, scale)
+
+        frame_cover = self.overlay_cache.get(overlay_key)
+        cache_status = "hit"
+        if frame_cover is None:
+            cache_status = "miss"
+            frame_masks = self.model.get_frame_masks(frame_idx, object_ids)
+            if frame_masks is None:
+                self.queue_response(
+                    schemas.ErrorResponseCover(
+                        message="Frame has no masks for the requested objects",
+                        error={"frameNumber": frame_idx, "object_ids": object_ids},
+                    )
+                )
+                return
+            out_object_ids, masks = frame_masks
+            frame_cover = self._render_segmentation_frame(
+                frame_idx, out_object_ids, masks, color_mapping, scale
+            )
+            if frame_cover is not None:
+                self.overlay_cache.put(overlay_key, frame_cover)
+
+        self.queue_response(
+            schemas.SingleFrameResponseCover(
+                msg_type="frame",
+                data=frame_cover,
+                meta={
+                    "overlayCache": cache_status,
+                    "overlayCacheStats": self.overlay_cache.stats(),
+                },
+            )
+        )
+
     def _post_process_bbox(
         self,
         frame_idx: int,
         out_object_ids: List[Union[str, int]],
-        masks: np.ndarray,
+        masks: MaskOutput,
         color_mapping: Dict[str, str],
         task: Optional[schemas.ResponseCover],
     ) -> Optional[schemas.BboxCover]:
@@ -814,81 +1787,121 @@ class Worker(BaseService):
         Args:
             frame_idx (int): corresponding frame index
             out_object_ids (List[Union[str, int]]): unique object ids
-            masks (np.ndarray): segmentation masks
+            masks (MaskOutput): segmentation masks
             color_mapping (Dict[str, str]): hex color mapping of object ids
             task (schemas.ResponseCover): _description_
 
         Returns:
             Optional[schemas.BboxCover]: BboxCover computed from masks
         """
-        bboxes = mask_to_xyxy(masks, normlized=True)
-        bbox_objects: List[schemas.BboxObject] = list()
-        for obj_ids, bbox in zip(out_object_ids, bboxes):
-            # print(f"{obj_ids=}, {bbox=}")
-            bbox_objects.append(
-                schemas.BboxObject(
-                    id=obj_ids,
-                    objecColor=color_mapping.get(str(obj_ids), "#FFFFFF"),
-                    xmin=bbox[0],
-                    ymin=bbox[1],
-                    xmax=bbox[2],
-                    ymax=bbox[3],
-                    normalized=True,
-                )
+        # all boxes in one reduction, converted to python floats at once
+        bboxes = masks.xyxy(normalized=True).tolist()
+        bbox_objects: List[schemas.BboxObject] = [
+            schemas.BboxObject.model_construct(
+                id=obj_ids,
+                objecColor=color_mapping.get(str(obj_ids), "#FFFFFF"),
+                xmin=xmin,
+                ymin=ymin,
+                xmax=xmax,
+                ymax=ymax,
+                normalized=True,
             )
-        return schemas.BboxCover(frame_number=frame_idx, bboxes=bbox_objects)
+            for obj_ids, (xmin, ymin, xmax, ymax) in zip(out_object_ids, bboxes)
+        ]
+        return schemas.BboxCover.model_construct(frame_number=frame_idx, bboxes=bbox_objects)
 
     def _post_process_polygon(
         self,
         frame_idx: int,
         out_object_ids: List[Union[int, str]],
-        masks: np.ndarray,
+        masks: MaskOutput,
         color_mapping: Dict[str, str],
         task: schemas.ResponseCover,
     ) -> Optional[schemas.PolygonCover]:
         polygon_objects: List[schemas.PolygonObject] = list()
+        options = self._get_polygon_options(task)
         for obj_id, mask in zip(out_object_ids, masks):
-            polygon = mask_to_polygons(mask, normalized=True)
+            polygon = mask_to_polygons_with_options(mask, options)
             for poly in polygon:
-                polygon_object = schemas.PolygonObject(
+                polygon_object = schemas.PolygonObject.model_construct(
                     id=obj_id,
                     objectColor=color_mapping.get(str(obj_id), "#FFFFFF"),
-                    coordinates=poly.tolist(),
-                    normalized=True,
+                    encoding=options.encoding,
+                    coordinates=encode_polygon(poly, options.encoding),
+                    normalized=options.encoding == "points",
+                    size=None if options.encoding == "points" else list(mask.shape),
                 )
                 polygon_objects.append(polygon_object)
-        return schemas.PolygonCover(frame_number=frame_idx, polygons=polygon_objects)
+        return schemas.PolygonCover.model_construct(
+            frame_number=frame_idx, polygons=polygon_objects
+        )
 
     def _post_process_segmentation_masks(
         self,
         frame_idx: int,
         out_object_ids: List[Union[int, str]],
-        masks: np.ndarray,
+        masks: MaskOutput,
     ) -> schemas.MaskCover:
         out_masks = []
         for object_id, mask in zip(out_object_ids, masks):
             # convert mask to image
             mask_image = self.model.mask_to_image(mask)
-            # convert image to base64
-            mask_base64 = image_to_base64(mask_image)
+            # encode image as png
+            mask_png = self.encode_payload(encode_image(mask_image))
             # create mask object
-            mask_obj = schemas.Mask(id=object_id, mask=mask_base64, mask_type="mask")
+            mask_obj = schemas.Mask.model_construct(
+                id=object_id, mask=mask_png, mask_type="mask"
+            )
             # append to list
             out_masks.append(mask_obj)
-        return schemas.MaskCover(frame_number=frame_idx, masks=out_masks)
+        return schemas.MaskCover.model_construct(frame_number=frame_idx, masks=out_masks)
+
+    def _post_process_encoded_masks(
+        self,
+        frame_idx: int,
+        out_object_ids: List[Union[int, str]],
+        masks: MaskOutput,
+        encoding: Literal["rle", "bitmask"],
+    ) -> schemas.MaskCover:
+        """Encodes single channel masks without rendering them as images
+
+        Args:
+            frame_idx (int): corresponding frame index
+            out_object_ids (List[Union[int, str]]): unique object ids
+            masks (MaskOutput): segmentation masks
+            encoding (Literal["rle", "bitmask"]): COCO compressed RLE or 1 bit per pixel
+
+        Returns:
+            schemas.MaskCover: encoded masks
+        """
+        out_masks = []
+        for object_id, mask in zip(out_object_ids, masks):
+            if encoding == "rle":
+                encoded = str(mask_to_rle(mask)["counts"])
+            else:
+                encoded = self.encode_payload(mask_to_packed_bits(mask))
+            out_masks.append(
+                schemas.Mask.model_construct(
+                    id=object_id,
+                    mask=encoded,
+                    mask_type=encoding,
+                    size=[mask.shape[0], mask.shape[1]],
+                )
+            )
+        return schemas.MaskCover.model_construct(frame_number=frame_idx, masks=out_masks)
 
     def process_annotation_object(
         self,
         point_objects: List[schemas.SingleFrameAnnotationObject],
         frame_idx: Optional[int] = None,
-    ) -> Tuple[int, List[Union[int, str]], np.ndarray]:
+    ) -> Tuple[int, List[Union[int, str]], MaskOutput]:
         """Processes point prompt by running segment-anything model
 
         Args:
             point_objects (List[schemas.SingleFrameAnnotationObject]): Point Prompt annotations
 
         Returns:
-            Tuple[int, List[Union[int, str]], np.ndarray]: frame index, predicted object ids, predicted segmentation masks
+            Tuple[int, List[Union[int, str]], MaskOutput]: frame index, predicted object ids, predicted segmentation masks
         """
         # group by object_id
         points: List[np.ndarray] = [
@@ -945,47 +1958,101 @@ class Worker(BaseService):
         return result_array
 
     def get_original_image(self, frame_idx: int) -> np.ndarray:
+        """Decoded BGR frame, shared by all consumers through the decoded-frame cache.
+        The returned array is read-only, copy it before drawing on it.
+        """
         if self.config is None:
             raise RuntimeError("Could not get worker configuration")
+        return self.frame_cache.get_or_load(
+            frame_idx, lambda: self._decode_original_image(frame_idx)
+        )
+
+    def _decode_original_image(self, frame_idx: int) -> Optional[np.ndarray]:
         original_frame_path = os.path.join(
-            self.config.task.video.frames_path,
+            self.config.task.video.frames_path,  # type: ignore
             f"{str(frame_idx+1).zfill(8)}.jpg",
         )
         original_frame = cv.imread(original_frame_path)
+        if original_frame is not None:
+            original_frame.flags.writeable = False
         return original_frame
 
+    def get_thumbnails_from_masks(
+        self,
+        original_image: np.ndarray,
+        masks: MaskOutput,
+        scale: float = 1.0,
+    ) -> List[Optional[Union[str, bytes]]]:
+        """Crops thumbnails of all objects from one decoded frame
+
+        Args:
+            original_image (np.ndarray): decoded frame
+            masks (MaskOutput): segmentation masks of the objects
+            scale (float, optional): scale factor for thumbnail images. Defaults to 1.
+
+        Returns:
+            List[Optional[Union[str, bytes]]]: encoded thumbnails in mask order (see
+                `encode_payload`), None if cropping failed
+        """
+        thumbnails: List[Optional[Union[str, bytes]]] = []
+        for bbox in masks.xyxy(normalized=False):
+            try:
+                thumbnails.append(
+                    self.encode_payload(
+                        encode_image(
+                            self._crop_thumbnail(original_image, bbox, scale, return_type="array"),  # type: ignore
+                            encode=True,
+                        )
+                    )
+                )
+            except Exception:
+                thumbnails.append(None)
+        return thumbnails
+
     def get_thumbnail_from_mask(
         self,
         original_image: np.ndarray,
-        mask: np.ndarray,
+        mask: Union[np.ndarray, MaskOutput],
         scale: float = 1.0,
         return_type: Literal["array", "base64"] = "array",
     ) -> Union[np.ndarray, str]:
         """Crops segmentation mask from original image as a thumbnail image
 
         Args:
-            mask (np.ndarray): segmentation mask of corresponding object
+            mask (Union[np.ndarray, MaskOutput]): segmentation mask of corresponding object
             scale (float, optional): scale factor for thumbnail image. Defaults to 1.
 
         Returns:
             np.ndarray: thumbnail image of segmentation mask
         """
         # compute bboxes from mask
-        if mask.ndim == 2:
-            # add channel dimension [H, W] -> [1, H, W]
-            mask = np.expand_dims(mask, axis=0)
-        elif mask.ndim == 3:
-            # make sure N is 1
-            if mask.shape[0] != 1:
-                raise ValueError("Invalid mask shape -> {mask.shape}")
+        if isinstance(mask, MaskOutput):
+            # bbox is reduced on the mask device, full mask is not copied
+            bboxes = mask.xyxy(normalized=False)
         else:
-            raise ValueError(f"Invalid mask shape -> {mask.shape}")
+            if mask.ndim == 2:
+                # add channel dimension [H, W] -> [1, H, W]
+                mask = np.expand_dims(mask, axis=0)
+            elif mask.ndim == 3:
+                # make sure N is 1
+                if mask.shape[0] != 1:
+                    raise ValueError("Invalid mask shape -> {mask.shape}")
+            else:
+                raise ValueError(f"Invalid mask shape -> {mask.shape}")
+            bboxes = mask_to_xyxy(mask, normlized=False)
 
-        bboxes = mask_to_xyxy(mask, normlized=False)
         # crop image using bbox
         if bboxes.shape[0] != 1:
             raise ValueError(f"Invalid bbox shape -> {bboxes.shape}")
-        bbox = bboxes[0]
+        return self._crop_thumbnail(original_image, bboxes[0], scale, return_type)
+
+    @staticmethod
+    def _crop_thumbnail(
+        original_image: np.ndarray,
+        bbox: np.ndarray,
+        scale: float,
+        return_type: Literal["array", "base64"],
+    ) -> Union[np.ndarray, str]:
         xmin, ymin, xmax, ymax = bbox
         # crop image
         thumbnail = original_image[int(ymin) : int(ymax), int(xmin) : int(xmax)]
@@ -1002,18 +2069,18 @@ class Worker(BaseService):
 
         return thumbnail
     
-    def get_fallback_thumbnail(self) -> str:
-        """Returns default thumbnail image as base64 encoded string
+    def get_fallback_thumbnail(self) -> Union[str, bytes]:
+        """Returns default thumbnail image encoded for the wire format
 
         Returns:
-            str: base64 encoded string of default thumbnail image
+            Union[str, bytes]: encoded default thumbnail image (see `encode_payload`)
         """
         # todo: manage default thumbnail from assets
         im = np.zeros((100, 100, 3), dtype=np.uint8)
         im.fill(255)
         # put unknown text
         cv.putText(im, "Unknown", (10, 50), cv.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
-        return image_to_base64(im, encode=True)
+        return self.encode_payload(encode_image(im, encode=True))
         
 
     @staticmethod
@@ -1043,6 +2110,277 @@ class Worker(BaseService):
         return {obj.id: obj.label for obj in task.data}
 
 
+class WorkerHost:
+    def __init__(
+        self,
+        logger,
+        member_id: str,
+        checkpoint_path: str,
+        config_path: str,
+        max_tasks: int,
+        max_sessions: int = 1,
+        src_settings: Settings = settings,
+    ) -> None:
+        """Warm worker process of the manager's worker pool. Keeps one predictor per
+        model and serves up to `max_sessions` tasks concurrently, each task with its
+        own inference state on the shared weights. Sessions are opened and closed in the
+        background, so a task that loads a new model or a busy session being released
+        does not hold up other assignments and releases.
+
+        Args:
+            logger (CustomLogger): Logger object to log messages
+            member_id (str): pool member id assigned by the manager
+            checkpoint_path (str): model checkpoint to preload
+            config_path (str): model config to preload
+            max_tasks (int): number of tasks served before the process exits (recycling)
+            max_sessions (int, optional): number of tasks served concurrently. Defaults to 1.
+            src_settings (Settings, optional): General settings. Defaults to settings.
+        """
+        self.log = logger
+        self.member_id = member_id
+        self.max_tasks = max_tasks
+        self.max_sessions = max_sessions
+        self.settings = src_settings
+        self.redis = RedisClient(config=self.settings)
+        self.served_tasks = 0
+
+        self.predictors: Dict[Tuple[str, str], SAM2VideoPredictor] = dict()
+        self.feature_caches: Dict[Tuple[str, str], Optional[FeatureCache]] = dict()
+        # sessions are opened concurrently, models are built once
+        self.models_lock = threading.Lock()
+        self.sessions: Dict[str, Worker] = dict()
+        # task uuid -> session being opened / closed
+        self.opening: Dict[str, Future] = dict()
+        self.closing: Dict[str, Future] = dict()
+        self.sessions_lock = threading.Lock()
+        self.session_pool = ThreadPoolExecutor(
+            max_workers=max(max_sessions, 1), thread_name_prefix="OpenSession"
+        )
+        # separate from the session pool, a close may wait for the open of its task
+        self.close_pool = ThreadPoolExecutor(
+            max_workers=max(max_sessions, 1), thread_name_prefix="CloseSession"
+        )
+        self.stop_event = threading.Event()
+
+        self.get_predictor(checkpoint_path=checkpoint_path, config_path=config_path)
+        self.log.success(f"Pooled worker {member_id} loaded {checkpoint_path}")
+
+        self.router_thread = threading.Thread(
+            target=self.request_router, name="RequestRouter"
+        )
+
+    @property
+    def assign_key(self) -> str:
+        return f"pool:{self.member_id}:assign"
+
+    @property
+    def release_key(self) -> str:
+        return f"pool:{self.member_id}:release"
+
+    @property
+    def wake_key(self) -> str:
+        # popped by the router together with the request keys, see `wake_router`
+        return f"pool:{self.member_id}:wake"
+
+    def get_predictor(self, checkpoint_path: str, config_path: str) -> SAM2VideoPredictor:
+        key = (checkpoint_path, config_path)
+        with self.models_lock:
+            if key not in self.predictors:
+                self.predictors[key] = SegmentAnything2.build_predictor(
+                    model_path=checkpoint_path, model_config=config_path
+                )
+            return self.predictors[key]
+
+    def get_feature_cache(self, ai_model: schemas.AiModel) -> Optional[FeatureCache]:
+        key = (ai_model.checkpoint_path, ai_model.config_path)
+        with self.models_lock:
+            if key not in self.feature_caches:
+                # built once per model, building scans the cache directory and starts a writer
+                self.feature_caches[key] = build_feature_cache(ai_model, self.settings)
+            return self.feature_caches[key]
+
+    def run(self) -> None:
+        self.router_thread.start()
+        try:
+            while (
+                self.served_tasks < self.max_tasks
+                or self.sessions
+                or self.opening
+                or self.closing
+            ):
+                msg = self.redis.dequeue([self.assign_key, self.release_key], timeout=5)
+                if not msg:
+                    continue
+                queue_name, task_uuid = msg[0].decode("utf-8"), msg[1].decode("utf-8")
+                if queue_name == self.release_key:
+                    with self.sessions_lock:
+                        self.closing[task_uuid] = self.close_pool.submit(
+                            self.close_session, task_uuid
+                        )
+                elif task_uuid == POOL_SHUTDOWN_MESSAGE:
+                    break
+                else:
+                    with self.sessions_lock:
+                        self.opening[task_uuid] = self.session_pool.submit(
+                            self.open_session, task_uuid
+                        )
+        finally:
+            self.session_pool.shutdown(wait=True)
+            for task_uuid in list(self.sessions.keys()):
+                self.close_pool.submit(self.close_session, task_uuid)
+            self.close_pool.shutdown(wait=True)
+            self.stop_event.set()
+            self.wake_router()
+            self.router_thread.join()
+        self.log.info(
+            f"Pooled worker {self.member_id} exits after {self.served_tasks} tasks"
+        )
+
+    def open_session(self, task_uuid: str) -> None:
+        """Starts a worker for the task on the shared predictor of the task's model
+
+        Args:
+            task_uuid (str): task uuid
+        """
+        try:
+            config_msg = self.redis.get(f"task:{task_uuid}:config")
+            if config_msg is None:
+                raise RuntimeError("Could not get task configuration")
+            ai_model = schemas.Intercom.model_validate_json(config_msg).task.ai_model
+            model = SegmentAnything2(
+                model_path=ai_model.checkpoint_path,
+                model_config=ai_model.config_path,
+                frame_window_size=self.settings.FRAME_WINDOW_SIZE,
+                frame_read_ahead=self.settings.FRAME_READ_AHEAD,
+                predictor=self.get_predictor(
+                    checkpoint_path=ai_model.checkpoint_path,
+                    config_path=ai_model.config_path,
+                ),
+                feature_cache=self.get_feature_cache(ai_model),
+            )
+            worker = Worker(
+                logger=self.log, worker_uuid=task_uuid, model=model, routed=True
+            )
+            worker.start()
+            with self.sessions_lock:
+                self.sessions[task_uuid] = worker
+            # requests of the new session are routed without waiting for the router timeout
+            self.wake_router()
+        except Exception as e:
+            self.log.error(f"Error starting worker: {e}")
+            self.redis.set(f"task:{task_uuid}:status", enums.TaskStatus.FAILED.value)
+        finally:
+            with self.sessions_lock:
+                self.opening.pop(task_uuid, None)
+
+    def close_session(self, task_uuid: str) -> None:
+        """Cancels a running propagation, stops the worker of the task and drops its
+        inference state, waits for the session if it is still being opened. Runs on the
+        close pool, stopping joins the worker threads.
+
+        Args:
+            task_uuid (str): task uuid
+        """
+        try:
+            with self.sessions_lock:
+                opening = self.opening.get(task_uuid)
+            if opening is not None:
+                opening.result()
+            with self.sessions_lock:
+                worker = self.sessions.pop(task_uuid, None)
+            if worker is not None:
+                # the router stops reading requests of the session
+                self.wake_router()
+                # stop between frames instead of finishing the propagation
+                worker.cancel_event.set()
+                worker.stop()
+                worker.model.release_state()
+        except Exception as e:
+            self.log.error(f"Error stopping worker of task {task_uuid}: {e}")
+        finally:
+            with self.sessions_lock:
+                self.served_tasks += 1
+                self.closing.pop(task_uuid, None)
+        self.log.info(
+            f"Task {task_uuid} released, {len(self.sessions)}/{self.max_sessions} sessions active"
+        )
+
+    def wake_router(self) -> None:
+        """Interrupts the blocking pop of the router, it picks up the current sessions"""
+        self.redis.queue_many(self.wake_key, [ROUTER_WAKE_MESSAGE], ttl=60)
+
+    def request_router(self) -> None:
+        """Routes requests of all sessions to their workers with a single connection.
+        The wake key is popped in the same call, so the router is woken up as soon as
+        a session is opened instead of after the block timeout."""
+        while not self.stop_event.is_set():
+            with self.sessions_lock:
+                request_keys = {
+                    worker.request_key: worker for worker in self.sessions.values()
+                }
+            msg = self.redis.dequeue(
+                [self.wake_key] + list(request_keys.keys()),
+                timeout=self.settings.REQUEST_BLOCK_TIMEOUT,
+            )
+            if not msg:
+                continue
+            worker = request_keys.get(msg[0].decode("utf-8"))
+            if worker is not None:
+                worker.request_queue.put(msg[1])
+
+
+def pre_encode_video(logger, task_uuid: str, src_settings: Settings = settings) -> None:
+    """Runs the image encoder on every frame of the task's video to fill the feature cache.
+    Frames already in the cache are skipped.
+
+    Args:
+        logger (CustomLogger): Logger object to log messages
+        task_uuid (str): pre_encode_video task uuid
+        src_settings (Settings, optional): General settings. Defaults to settings.
+    """
+    rcli = RedisClient(config=src_settings)
+    status_key = f"task:{task_uuid}:status"
+    try:
+        # runs on idle capacity, leave the cpu to interactive workers
+        os.nice(10)
+        config_msg = rcli.get(f"task:{task_uuid}:config")
+        if config_msg is None:
+            raise RuntimeError("Could not get task configuration")
+        task = schemas.Intercom.model_validate_json(config_msg).task
+        # every frame must reach the disk, wait for the writer instead of dropping
+        feature_cache = build_feature_cache(
+            task.ai_model, src_settings, blocking_writes=True
+        )
+        if feature_cache is None:
+            raise RuntimeError("Feature cache is disabled")
+
+        model = SegmentAnything2(
+            model_path=task.ai_model.checkpoint_path,
+            model_config=task.ai_model.config_path,
+            frame_window_size=src_settings.FRAME_WINDOW_SIZE,
+            frame_read_ahead=src_settings.FRAME_READ_AHEAD,
+            feature_cache=feature_cache,
+        )
+        model.init_state(video_dir=task.video.frames_path)
+        rcli.set(status_key, enums.TaskStatus.IN_PROGRESS.value)
+
+        start = time.time()
+        encoded = 0
+        num_frames = model.num_frames
+        for frame_idx in range(num_frames):
+            encoded += int(model.encode_frame(frame_idx))
+        feature_cache.flush()
+        # num_frames is not readable after the state is released
+        model.release_state()
+        logger.success(
+            f"Pre-encoded {encoded}/{num_frames} frames in {time.time() - start:.2f} seconds"
+        )
+        rcli.set(status_key, enums.TaskStatus.COMPLETED.value)
+    except Exception as e:
+        logger.error(f"Error pre-encoding video: {e}")
+        rcli.set(status_key, enums.TaskStatus.FAILED.value)
+
+
 def main(log_level: str, uuid: str) -> None:
     rcli = RedisClient(config=settings)
 
@@ -1066,9 +2404,60 @@ def main(log_level: str, uuid: str) -> None:
         return
 
 
+def main_pool_member(
+    log_level: str,
+    member_id: str,
+    checkpoint_path: str,
+    config_path: str,
+    max_tasks: int,
+    max_sessions: int,
+) -> None:
+    logger = CustomLogger(level=log_level).get_logger()
+    host = WorkerHost(
+        logger=logger,
+        member_id=member_id,
+        checkpoint_path=checkpoint_path,
+        config_path=config_path,
+        max_tasks=max_tasks,
+        max_sessions=max_sessions,
+    )
+    host.run()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("--uuid", type=str, required=True, help="UUID of the worker")
+    parser.add_argument("--uuid", type=str, required=False, help="UUID of the worker")
+    parser.add_argument(
+        "--pool-member",
+        type=str,
+        required=False,
+        help="Pool member id, starts a warm worker of the manager's pool",
+    )
+    parser.add_argument("--checkpoint-path", type=str, required=False)
+    parser.add_argument("--config-path", type=str, required=False)
+    parser.add_argument("--max-tasks", type=int, required=False, default=20)
+    parser.add_argument("--max-sessions", type=int, required=False, default=1)
+    parser.add_argument(
+        "--pre-encode",
+        action="store_true",
+        help="Fill the image feature cache of the task's video and exit",
+    )
     args = parser.parse_args()
 
-    main(log_level="TRACE", uuid=args.uuid)
+    if args.pool_member is not None:
+        main_pool_member(
+            log_level="TRACE",
+            member_id=args.pool_member,
+            checkpoint_path=args.checkpoint_path,
+            config_path=args.config_path,
+            max_tasks=args.max_tasks,
+            max_sessions=args.max_sessions,
+        )
+    elif args.uuid is not None and args.pre_encode:
+        pre_encode_video(
+            logger=CustomLogger(level="TRACE").get_logger(), task_uuid=args.uuid
+        )
+    elif args.uuid is not None:
+        main(log_level="TRACE", uuid=args.uuid)
+    else:
+        parser.error("--uuid or --pool-member is required")